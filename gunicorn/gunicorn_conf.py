@@ -54,3 +54,56 @@ worker_tmp_dir = "/dev/shm"
 
 # Set the log configuration file to "/src/logging_production.ini"
 logconfig = os.getenv("LOG_CONFIG", "/src/logging_production.ini")
+
+# Load the NLP models once in the master process before forking the workers, so the workers share
+# the model memory copy-on-write instead of each loading its own copy, default to false
+preload_models = os.getenv("PRELOAD_MODELS", "false").lower() in ("1", "true", "yes")
+preload_app = preload_models
+
+# Get the number of PyTorch threads per worker, if not set, split the cores between the workers
+torch_num_threads_str = os.getenv("TORCH_NUM_THREADS", None)
+
+# Get the private memory of a worker in megabytes on top of its caches, default to 256
+worker_memory_overhead_mb = int(os.getenv("WORKER_MEMORY_OVERHEAD_MB", "256"))
+
+
+def on_starting(server):
+    """
+    Preload the NLP models in the master process, and fit the number of workers to the memory limit
+    from the measured footprint of the models, unless WEB_CONCURRENCY is set.
+    """
+    if not preload_models:
+        return
+
+    from src.nlp.config import nlp_config
+    from src.nlp.memory import container_memory_limit, recommend_worker_count
+    from src.nlp.pipeline import preload_components
+
+    report = preload_components(nlp_config)
+    model_bytes = sum(component["bytes"] for component in report.values())
+    worker_bytes = nlp_config.EMBEDDING_CACHE_MAX_BYTES + nlp_config.RESULT_CACHE_MAX_BYTES + worker_memory_overhead_mb * 2**20
+    memory_limit = container_memory_limit()
+    if memory_limit is None:
+        return
+    recommended = recommend_worker_count(memory_limit, model_bytes, worker_bytes, server.num_workers)
+    server.log.info(
+        "Preloaded models use %d MB, workers need %d MB each, %d workers fit in %d MB",
+        model_bytes // 2**20,
+        worker_bytes // 2**20,
+        recommended,
+        memory_limit // 2**20,
+    )
+    if not web_concurrency_str and recommended < server.num_workers:
+        server.num_workers = recommended
+
+
+def post_fork(server, worker):
+    """
+    Size the PyTorch thread pool of each worker, so the workers do not oversubscribe the cores.
+    """
+    import torch
+
+    if torch_num_threads_str:
+        torch.set_num_threads(int(torch_num_threads_str))
+    else:
+        torch.set_num_threads(max(1, multiprocessing.cpu_count() // server.num_workers))
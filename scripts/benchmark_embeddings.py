@@ -0,0 +1,63 @@
+"""
+Benchmark the latency of the embedding backends.
+
+Usage:
+    python -m scripts.benchmark_embeddings [--backends torch onnx onnx-int8] [--batch-sizes 1 8 32 128]
+"""
+
+import argparse
+import time
+
+from src.nlp.backends import load_embedding_backend
+from src.nlp.constants import EmbeddingBackendKind
+
+SAMPLE_TEXTS = [
+    "I want to build a web application with React and a Node.js backend.",
+    "We need a relational database such as PostgreSQL or MySQL for the orders.",
+    "The mobile app should work offline and sync with the server later.",
+    "Deploy the services on Kubernetes with a CI/CD pipeline.",
+    "A machine learning model classifies the support tickets.",
+]
+
+
+def benchmark(backend, batch_size, repeats):
+    """
+    Measure the latency of encoding a batch of texts.
+
+    Args:
+        backend (TorchEmbeddingBackend | OnnxEmbeddingBackend): The backend to benchmark.
+        batch_size (int): The number of texts in the batch.
+        repeats (int): The number of timed runs.
+
+    Returns:
+        float: The median latency in milliseconds.
+    """
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(batch_size)]
+    # Warm up the backend before timing it
+    backend.encode(texts, batch_size)
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend.encode(texts, batch_size)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)[len(latencies) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=[kind.value for kind in EmbeddingBackendKind], choices=[kind.value for kind in EmbeddingBackendKind])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32, 128])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--onnx-model-dir", default="models/onnx")
+    args = parser.parse_args()
+
+    print(f"{'backend':<12}{'batch size':>12}{'median ms':>12}{'texts/s':>12}")
+    for kind in args.backends:
+        backend = load_embedding_backend(kind, args.onnx_model_dir)
+        for batch_size in args.batch_sizes:
+            latency = benchmark(backend, batch_size, args.repeats)
+            print(f"{kind:<12}{batch_size:>12}{latency:>12.1f}{batch_size / latency * 1000:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Export the serving parts of the BERTopic model to a memory-mapped artifact, loaded by setting TOPIC_MODEL_ARTIFACT_DIR.
+
+Usage:
+    python -m scripts.export_topic_model [--model-name MaartenGr/BERTopic_Wikipedia] [--output-dir models/topic_model]
+"""
+
+import argparse
+import time
+
+from src.nlp.config import nlp_config
+from src.nlp.models import load_bertopic_model
+from src.nlp.topic_artifact import export_topic_artifact, load_topic_artifact
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-name", default=nlp_config.MODEL_NAME)
+    parser.add_argument("--output-dir", default=nlp_config.TOPIC_MODEL_ARTIFACT_DIR or "models/topic_model")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    topic_model = load_bertopic_model(args.model_name)
+    print(f"Loaded {args.model_name} in {time.perf_counter() - start:.1f}s.")
+
+    version = export_topic_artifact(topic_model, args.output_dir)
+    start = time.perf_counter()
+    artifact = load_topic_artifact(args.output_dir)
+    print(f"Exported {len(artifact.topics)} topics to {args.output_dir}, version {version}.")
+    print(f"Loaded the artifact in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
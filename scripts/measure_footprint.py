@@ -0,0 +1,44 @@
+"""
+Measure the memory footprint of the NLP models and recommend a number of web workers.
+
+Usage:
+    python -m scripts.measure_footprint [--memory-limit-mb 4096] [--worker-overhead-mb 256]
+"""
+
+import argparse
+import multiprocessing
+
+from src.nlp.config import nlp_config
+from src.nlp.memory import container_memory_limit, current_rss, recommend_worker_count
+from src.nlp.pipeline import preload_components
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memory-limit-mb", type=int, default=None, help="Defaults to the memory limit of the container.")
+    parser.add_argument("--worker-overhead-mb", type=int, default=256, help="Private memory of a worker on top of its caches.")
+    parser.add_argument("--workers-per-core", type=int, default=1)
+    args = parser.parse_args()
+
+    baseline = current_rss()
+    report = preload_components(nlp_config)
+    model_bytes = sum(component["bytes"] for component in report.values())
+    worker_bytes = nlp_config.EMBEDDING_CACHE_MAX_BYTES + nlp_config.RESULT_CACHE_MAX_BYTES + args.worker_overhead_mb * 2**20
+    memory_limit = args.memory_limit_mb * 2**20 if args.memory_limit_mb else container_memory_limit()
+    max_workers = args.workers_per_core * multiprocessing.cpu_count() + 1
+
+    print(f"{'component':<16}{'seconds':>10}{'MB':>10}")
+    for name, component in report.items():
+        print(f"{name:<16}{component['seconds']:>10.1f}{component['bytes'] / 2**20:>10.0f}")
+    print(f"{'total':<16}{'':>10}{model_bytes / 2**20:>10.0f}")
+    print(f"Interpreter and imports: {baseline / 2**20:.0f} MB, private memory per worker: {worker_bytes / 2**20:.0f} MB")
+    if memory_limit is None:
+        print("The memory limit is unknown, pass --memory-limit-mb.")
+        return
+    for preload in (False, True):
+        workers = recommend_worker_count(memory_limit, model_bytes, worker_bytes, max_workers, preload=preload)
+        print(f"Workers fitting in {memory_limit / 2**20:.0f} MB {'with' if preload else 'without'} PRELOAD_MODELS: {workers}")
+
+
+if __name__ == "__main__":
+    main()
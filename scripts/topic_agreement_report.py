@@ -0,0 +1,126 @@
+"""
+Compare the nearest-centroid topic classifier, and the transform method reusing the input embeddings, with the
+transform method of the topic model embedding the texts itself, on a sample of texts.
+
+The sample is a JSON lines file with a "text" per line, and optionally the expected "topic", as a topic ID or name.
+
+Usage:
+    python -m scripts.topic_agreement_report sample.jsonl [--output report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+from src.nlp.constants import TopicClassifierMode
+from src.nlp.pipeline import NlpPipeline
+from src.nlp.services.entity_extraction import extract_tech_entities_batch
+from src.nlp.services.topic_centroids import build_topic_centroids
+
+
+def read_sample(path):
+    """
+    Read the texts and expected topics of a labeled sample.
+
+    Args:
+        path (str): The path of the JSON lines file.
+
+    Returns:
+        tuple: The texts, and the expected topic of each text, None if it is not labeled.
+    """
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            texts.append(record["text"])
+            labels.append(record.get("topic"))
+    return texts, labels
+
+
+def matches_label(topic, label):
+    """
+    Check whether a predicted topic matches the expected topic, given as an ID or a name.
+    """
+    topic_id, topic_name, _ = topic
+    return str(label) in (str(topic_id), topic_name)
+
+
+def topic_agreement_report(pipeline, texts, labels):
+    """
+    Classify the texts in every mode and measure how often they agree with the transform method, and how often each matches the labels.
+
+    Args:
+        pipeline (NlpPipeline): The loaded pipeline.
+        texts (list): The texts of the sample.
+        labels (list): The expected topic of each text, None if it is not labeled.
+
+    Returns:
+        dict: The size of the sample, and for each mode its agreement rate with the transform method, its accuracy, its time
+        per text and its most frequent disagreements.
+    """
+    if pipeline.topic_centroids is None:
+        pipeline.topic_centroids = build_topic_centroids(pipeline.bertopic_model)
+    catalog = pipeline.entity_catalog
+    extracted_entities_batch = extract_tech_entities_batch(texts, catalog.tech_entities, catalog.matcher, pipeline.nlp)
+    input_embeddings = pipeline.embed(texts)
+
+    # The reference is the transform method embedding the texts followed by their entity categories
+    variants = {
+        "transform": (TopicClassifierMode.TRANSFORM, False),
+        "transform-reused": (TopicClassifierMode.TRANSFORM, True),
+        "centroid": (TopicClassifierMode.CENTROID, None),
+    }
+    topics, seconds = {}, {}
+    for name, (mode, reuse_input_embeddings) in variants.items():
+        start = time.perf_counter()
+        topics[name] = pipeline.classify_topics(texts, extracted_entities_batch, input_embeddings, mode, reuse_input_embeddings)
+        seconds[name] = time.perf_counter() - start
+
+    labeled = [index for index, label in enumerate(labels) if label is not None]
+    report = {"texts": len(texts), "labeled": len(labeled), "modes": {}}
+    for name in variants:
+        pairs = list(zip(topics["transform"], topics[name]))
+        disagreements = Counter((reference[1], topic[1]) for reference, topic in pairs if reference[0] != topic[0])
+        report["modes"][name] = {
+            "agreement": sum(reference[0] == topic[0] for reference, topic in pairs) / len(texts) if texts else None,
+            "accuracy": sum(matches_label(topics[name][index], labels[index]) for index in labeled) / len(labeled) if labeled else None,
+            "ms_per_text": seconds[name] / len(texts) * 1000 if texts else None,
+            "top_disagreements": [{"transform": reference, name: topic, "count": count} for (reference, topic), count in disagreements.most_common(10)],
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sample")
+    parser.add_argument("--output", default=None, help="Optional path of the JSON report.")
+    args = parser.parse_args()
+
+    texts, labels = read_sample(args.sample)
+    pipeline = asyncio.run(NlpPipeline.load())
+    try:
+        report = topic_agreement_report(pipeline, texts, labels)
+    finally:
+        pipeline.close()
+
+    print(f"Texts: {report['texts']}, labeled: {report['labeled']}")
+    print(f"{'mode':<18}{'agreement':>10}{'accuracy':>10}{'ms/text':>10}")
+    for name, stats in report["modes"].items():
+        agreement = f"{stats['agreement']:.1%}" if stats["agreement"] is not None else "n/a"
+        accuracy = f"{stats['accuracy']:.1%}" if stats["accuracy"] is not None else "n/a"
+        ms_per_text = f"{stats['ms_per_text']:.2f}" if stats["ms_per_text"] is not None else "n/a"
+        print(f"{name:<18}{agreement:>10}{accuracy:>10}{ms_per_text:>10}")
+    for name, stats in report["modes"].items():
+        for disagreement in stats["top_disagreements"]:
+            print(f"{name:<18}{disagreement['count']:>5}  {disagreement['transform']} -> {disagreement[name]}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Command-line batch processor running the NLP pipeline over JSON lines files, outside of the web application.
+
+Usage:
+    python -m src.cli process INPUT_PATH OUTPUT_PATH [--workers 4] [--chunk-size 256] [--no-blueprints] [--top-k 1]
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import typer
+
+from src.jobs.exceptions import InvalidJobPayload
+from src.jobs.service import parse_job_line
+
+cli = typer.Typer(help="Run the NLP pipeline over files, without the web application.")
+
+# The pipeline of the current worker process, loaded by init_cli_worker, whether its results are matched with blueprints, and how many per category
+_pipeline = None
+_with_blueprints = False
+_top_k = 1
+
+
+def read_items(path, plain_text):
+    """
+    Read the items to process from a file, one per line, skipping blank lines.
+
+    Args:
+        path (str): The path of the input file.
+        plain_text (bool): Whether each line is a raw text rather than a JSON line.
+
+    Yields:
+        dict: The items, each a dictionary with its `id` and `text`.
+    """
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if plain_text:
+                if line.strip():
+                    yield {"id": None, "text": line.rstrip("\r\n")}
+                continue
+            try:
+                item = parse_job_line(line)
+            except InvalidJobPayload as e:
+                if isinstance(e.__cause__, json.JSONDecodeError):
+                    raise typer.BadParameter(f"Line {line_number} of {path} is not valid JSON: {e.__cause__}")
+                raise typer.BadParameter(f"Line {line_number} of {path} has no `text` or `body` field.")
+            if item is not None:
+                yield item
+
+
+def read_chunks(items, chunk_size):
+    """
+    Group items into chunks.
+
+    Args:
+        items (iterable): The items to group.
+        chunk_size (int): The number of items per chunk.
+
+    Yields:
+        list: The chunks of items.
+    """
+    items = iter(items)
+    while chunk := list(islice(items, chunk_size)):
+        yield chunk
+
+
+def init_cli_worker(with_blueprints, num_threads, top_k=1):
+    """
+    Load the pipeline, with its blueprint catalog, once in a worker process.
+
+    Args:
+        with_blueprints (bool): Whether the results are matched with the blueprints corpus.
+        num_threads (int): The number of threads PyTorch uses in the worker, so the workers do not oversubscribe the cores.
+        top_k (int): The number of blueprints kept per category.
+    """
+    global _pipeline, _with_blueprints, _top_k
+
+    import asyncio
+
+    import torch
+
+    from src.nlp.pipeline import NlpPipeline
+
+    torch.set_num_threads(num_threads)
+    _pipeline = asyncio.run(NlpPipeline.load())
+    _with_blueprints = with_blueprints
+    _top_k = top_k
+
+
+def process_chunk(items):
+    """
+    Run the pipeline over a chunk of items, and match each result with the blueprints corpus.
+
+    Args:
+        items (list): The items of the chunk.
+
+    Returns:
+        list: The output records of the items, in the same order.
+    """
+    from src.nlp.services.blueprint_matching import rank_blueprints_batch, recommendation_weights
+
+    results = _pipeline.run([item["text"] for item in items])
+    records = [{"id": item["id"], **result} for item, result in zip(items, results)]
+    if _with_blueprints:
+        # Rank the blueprints for the whole chunk in a single pass
+        weight_sets = [recommendation_weights(result["recommendations"], result["extracted_entities"]) for result in results]
+        for record, matched_blueprints in zip(records, rank_blueprints_batch(weight_sets, _pipeline.blueprint_catalog.index, _top_k)):
+            record["matched_blueprints"] = matched_blueprints
+    return records
+
+
+@cli.command()
+def process(
+    input_path: str = typer.Argument(..., help="JSON lines file with a `text` or `body` field per line, or a text file with --plain-text."),
+    output_path: str = typer.Argument(..., help="JSON lines file the results are written to, in input order."),
+    workers: int = typer.Option(os.cpu_count() or 1, help="Number of worker processes, each loading its own copy of the models."),
+    chunk_size: int = typer.Option(256, help="Number of texts processed together by a worker."),
+    plain_text: bool = typer.Option(False, help="Treat each line of the input as a raw text."),
+    blueprints: bool = typer.Option(True, help="Match each result with the blueprints corpus."),
+    top_k: int = typer.Option(1, min=1, help="Number of blueprints kept per category, by descending score."),
+):
+    """
+    Process a file through entity extraction, topic classification, scoring, recommendation and blueprint matching.
+    """
+    workers = max(1, workers)
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    # At most two chunks per worker are in flight, so memory stays flat whatever the size of the input
+    max_pending = 2 * workers
+
+    start = time.perf_counter()
+    processed = 0
+    context = multiprocessing.get_context("spawn")
+    with (
+        ProcessPoolExecutor(workers, mp_context=context, initializer=init_cli_worker, initargs=(blueprints, num_threads, top_k)) as pool,
+        open(output_path, "w", encoding="utf-8") as output,
+    ):
+        chunks = read_chunks(read_items(input_path, plain_text), chunk_size)
+        pending = []
+
+        def write_oldest_chunks():
+            nonlocal processed
+            # Wait for the oldest chunk, then write it and the following ones already done, in input order
+            while True:
+                records = pending.pop(0).result()
+                for record in records:
+                    output.write(json.dumps(record) + "\n")
+                processed += len(records)
+                if not pending or not pending[0].done():
+                    break
+            elapsed = time.perf_counter() - start
+            typer.echo(f"{processed} texts processed in {elapsed:.1f}s ({processed / elapsed:.1f} texts/s)", err=True)
+
+        for chunk in chunks:
+            pending.append(pool.submit(process_chunk, chunk))
+            if len(pending) >= max_pending:
+                write_oldest_chunks()
+        while pending:
+            write_oldest_chunks()
+
+    elapsed = time.perf_counter() - start
+    typer.echo(f"Done: {processed} texts in {elapsed:.1f}s, {processed / elapsed if elapsed else 0:.1f} texts/s with {workers} workers.", err=True)
+
+
+if __name__ == "__main__":
+    cli()
@@ -60,3 +60,12 @@ class NotAuthenticated(DetailedHTTPException):
         Initializes the NotAuthenticated object.
         """
         super().__init__(headers={"WWW-Authenticate": "Bearer"})
+
+
+class ServiceUnavailable(DetailedHTTPException):
+    """
+    Exception class for service unavailable errors.
+    """
+
+    STATUS_CODE = status.HTTP_503_SERVICE_UNAVAILABLE
+    DETAIL = "Service unavailable"
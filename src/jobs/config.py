@@ -0,0 +1,29 @@
+from pydantic_settings import BaseSettings
+
+
+class JobsConfig(BaseSettings):
+    """
+    Configuration class for the bulk jobs module.
+    """
+
+    # Maximum number of texts in the payload of a job
+    JOB_MAX_ITEMS: int = 100_000
+    # Maximum size in bytes of a text and its ID in the payload of a job
+    JOB_MAX_ITEM_BYTES: int = 1_000_000
+    # Number of texts processed together by a job worker
+    JOB_CHUNK_SIZE: int = 256
+    # Maximum size in bytes of the texts of a chunk, well under the 16MB limit of a MongoDB document
+    JOB_MAX_CHUNK_BYTES: int = 4_000_000
+    # Number of job workers started by each application process, 0 disables them
+    JOB_WORKERS: int = 1
+    # Seconds an idle job worker waits before looking for a new chunk
+    JOB_POLL_INTERVAL: float = 1.0
+    # Seconds after which a chunk claimed by a worker that stopped is handed to another worker
+    JOB_LEASE_SECONDS: float = 300
+    # Number of times a chunk is attempted before its texts are reported as failed
+    JOB_MAX_ATTEMPTS: int = 3
+    # Maximum number of results returned by a single page
+    JOB_RESULTS_PAGE_SIZE: int = 100
+
+
+jobs_config = JobsConfig()
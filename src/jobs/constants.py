@@ -0,0 +1,31 @@
+from enum import Enum
+
+
+class ErrorCode:
+    JOB_NOT_FOUND = "Job not found."
+    INVALID_JOB_PAYLOAD = "The payload must be JSON lines, each with a non-empty `text` or `body` field."
+    EMPTY_JOB_PAYLOAD = "The payload has no texts to process."
+    JOB_PAYLOAD_TOO_LARGE = "The payload has more texts than a job accepts."
+    JOB_ITEM_TOO_LARGE = "A text of the payload is larger than a job accepts."
+
+
+class JobStatus(str, Enum):
+    """
+    Enum class representing the states of a bulk job.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ChunkStatus(str, Enum):
+    """
+    Enum class representing the states of a chunk of a bulk job.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
@@ -0,0 +1,36 @@
+from fastapi import status
+
+from src.exceptions import BadRequest, DetailedHTTPException, NotFound
+from src.jobs.constants import ErrorCode
+
+
+class JobNotFound(NotFound):
+    """Exception raised when a job does not exist or belongs to another user."""
+
+    DETAIL = ErrorCode.JOB_NOT_FOUND
+
+
+class InvalidJobPayload(BadRequest):
+    """Exception raised when a job payload is not valid JSON lines."""
+
+    DETAIL = ErrorCode.INVALID_JOB_PAYLOAD
+
+
+class EmptyJobPayload(BadRequest):
+    """Exception raised when a job payload has no texts."""
+
+    DETAIL = ErrorCode.EMPTY_JOB_PAYLOAD
+
+
+class JobPayloadTooLarge(DetailedHTTPException):
+    """Exception raised when a job payload has more texts than a job accepts."""
+
+    STATUS_CODE = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    DETAIL = ErrorCode.JOB_PAYLOAD_TOO_LARGE
+
+
+class JobItemTooLarge(DetailedHTTPException):
+    """Exception raised when a text of a job payload is larger than a job accepts."""
+
+    STATUS_CODE = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    DETAIL = ErrorCode.JOB_ITEM_TOO_LARGE
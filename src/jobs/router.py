@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, Query, Request, status
+
+from src.auth.jwt import parse_jwt_user_data
+from src.auth.schemas import JWTData
+from src.jobs import service
+from src.jobs.config import jobs_config
+from src.jobs.exceptions import JobNotFound
+from src.jobs.schemas import JobInfo, JobResult, JobResults
+
+router = APIRouter()
+
+
+def build_job_info(job: dict) -> JobInfo:
+    """
+    Build the response describing a job from its database document.
+
+    Args:
+      job: The job data.
+
+    Returns:
+      The JobInfo object of the job.
+    """
+    return JobInfo(
+        id=str(job["_id"]),
+        status=job["status"],
+        total=job["total"],
+        processed=job["processed"],
+        failed=job["failed"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+    )
+
+
+async def valid_job(job_id: str, jwt_data: JWTData = Depends(parse_jwt_user_data)) -> dict:
+    """
+    Retrieve a job the authenticated user has access to.
+
+    Args:
+      job_id: The ID of the job.
+      jwt_data: JWT data of the authenticated user.
+
+    Returns:
+      The job data.
+
+    Raises:
+      JobNotFound: If the job does not exist, or belongs to another user and the user is not an admin.
+    """
+    job = await service.get_job(job_id)
+    if job is None or (job["user_id"] != jwt_data.user_id and not jwt_data.is_admin):
+        raise JobNotFound()
+    return job
+
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED, response_model=JobInfo)
+async def create_job(request: Request, jwt_data: JWTData = Depends(parse_jwt_user_data)) -> JobInfo:
+    """
+    Submit a bulk job processing a JSON lines payload through the NLP pipeline.
+
+    Each line of the request body is either a JSON string, or a JSON object with a `text` or `body` field and
+    an optional `id` or `request_id` field. The job is processed in the background by the job workers.
+
+    Parameters:
+    - jwt_data: JWT data of the authenticated user.
+
+    Returns:
+    - A JobInfo object with the ID used to poll the job and page its results.
+
+    Raises:
+    - InvalidJobPayload: If a line is not valid JSON or has no text (400).
+    - EmptyJobPayload: If the payload has no texts (400).
+    - JobPayloadTooLarge: If the payload has more texts than JOB_MAX_ITEMS (413).
+    - JobItemTooLarge: If a text and its ID are larger than JOB_MAX_ITEM_BYTES (413).
+    """
+    items = service.parse_job_payload(await request.body(), jobs_config.JOB_MAX_ITEMS, jobs_config.JOB_MAX_ITEM_BYTES)
+    job = await service.create_job(jwt_data.user_id, items, jobs_config.JOB_CHUNK_SIZE, jobs_config.JOB_MAX_CHUNK_BYTES)
+
+    return build_job_info(job)
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def get_job(job: dict = Depends(valid_job)) -> JobInfo:
+    """
+    Get the status and progress of a bulk job.
+
+    Parameters:
+    - job_id: The ID of the job.
+
+    Returns:
+    - A JobInfo object describing the job.
+    """
+    return build_job_info(job)
+
+
+@router.get("/{job_id}/results", response_model=JobResults)
+async def get_job_results(
+    job: dict = Depends(valid_job),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(jobs_config.JOB_RESULTS_PAGE_SIZE, ge=1, le=jobs_config.JOB_RESULTS_PAGE_SIZE),
+) -> JobResults:
+    """
+    Get a page of the results of a bulk job, ordered by position in the payload.
+
+    Results are available as soon as their chunk is processed, before the whole job completes. A page ends
+    at the first result that is not available yet, clients resume from `next_offset`.
+
+    Parameters:
+    - job_id: The ID of the job.
+    - offset: The position of the first result of the page.
+    - limit: The maximum number of results of the page.
+
+    Returns:
+    - A JobResults object with the results and the offset of the next page, None once the last result was returned.
+    """
+    documents = await service.get_job_results(job["_id"], offset, limit)
+
+    # Stop at the first position whose chunk is not processed yet, so pages never skip results
+    results = []
+    for document in documents:
+        if document["position"] != offset + len(results):
+            break
+        results.append(JobResult(position=document["position"], item_id=document["item_id"], result=document["result"], error=document["error"]))
+
+    next_offset = offset + len(results)
+    if next_offset >= job["total"]:
+        next_offset = None
+
+    return JobResults(job=build_job_info(job), results=results, next_offset=next_offset)
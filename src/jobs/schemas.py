@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from src.jobs.constants import JobStatus
+
+
+class JobInfo(BaseModel):
+    """Represents the status and progress of a bulk job."""
+
+    id: str = Field(..., json_schema_extra={"example": "6630c1f2a4b5c6d7e8f90123"})
+    status: JobStatus
+    total: int = Field(..., json_schema_extra={"example": 20000})
+    processed: int = Field(..., json_schema_extra={"example": 5120})
+    failed: int = Field(..., json_schema_extra={"example": 0})
+    created_at: datetime
+    updated_at: datetime
+
+
+class JobResult(BaseModel):
+    """Represents the result of one item of a bulk job."""
+
+    position: int = Field(..., json_schema_extra={"example": 0})
+    item_id: Optional[str] = Field(None, json_schema_extra={"example": "user-001"})
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+
+class JobResults(BaseModel):
+    """Represents a page of the results of a bulk job, ordered by position in the payload."""
+
+    job: JobInfo
+    results: List[JobResult]
+    next_offset: Optional[int] = Field(None, json_schema_extra={"example": 100})
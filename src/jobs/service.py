@@ -0,0 +1,382 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from src.database import Database
+from src.jobs.constants import ChunkStatus, JobStatus
+from src.jobs.exceptions import EmptyJobPayload, InvalidJobPayload, JobItemTooLarge, JobPayloadTooLarge
+
+JOBS_COLLECTION = "nlp_jobs"
+CHUNKS_COLLECTION = "nlp_job_chunks"
+RESULTS_COLLECTION = "nlp_job_results"
+
+
+def parse_job_line(line: str) -> Optional[dict[str, Any]]:
+    """
+    Parse a line of a JSON lines payload into an item of a job.
+
+    The line is either a JSON string, or a JSON object with a `text` or `body` field and an optional
+    `id` or `request_id` field.
+
+    Args:
+      line: The line to parse.
+
+    Returns:
+      The item, a dictionary with its `id` and `text`, or None if the line is blank.
+
+    Raises:
+      InvalidJobPayload: If the line is not valid JSON or has no text.
+    """
+    if not line.strip():
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise InvalidJobPayload() from e
+
+    if isinstance(record, str):
+        item_id, text = None, record
+    elif isinstance(record, dict):
+        item_id, text = record.get("id", record.get("request_id")), record.get("text", record.get("body"))
+    else:
+        raise InvalidJobPayload()
+    if not isinstance(text, str) or not text.strip():
+        raise InvalidJobPayload()
+
+    return {"id": str(item_id) if item_id is not None else None, "text": text}
+
+
+def item_size(item: dict[str, Any]) -> int:
+    """
+    Measure the size of an item of a job, once stored in a chunk.
+
+    Args:
+      item: The item, as returned by `parse_job_line`.
+
+    Returns:
+      The size in bytes of the text and ID of the item.
+    """
+    return len(item["text"].encode("utf-8")) + len((item["id"] or "").encode("utf-8"))
+
+
+def parse_job_payload(payload: bytes, max_items: Optional[int] = None, max_item_bytes: Optional[int] = None) -> list[dict[str, Any]]:
+    """
+    Parse a JSON lines payload into the items of a job, skipping blank lines.
+
+    Args:
+      payload: The JSON lines payload.
+      max_items: The maximum number of items of the job, None for no limit.
+      max_item_bytes: The maximum size in bytes of an item of the job, None for no limit.
+
+    Returns:
+      The items of the job, each a dictionary with its `id` and `text`.
+
+    Raises:
+      InvalidJobPayload: If a line is not valid JSON or has no text.
+      EmptyJobPayload: If the payload has no lines.
+      JobPayloadTooLarge: If the payload has more than `max_items` items.
+      JobItemTooLarge: If an item is larger than `max_item_bytes`.
+    """
+    try:
+        lines = payload.decode("utf-8").splitlines()
+    except UnicodeDecodeError:
+        raise InvalidJobPayload()
+
+    items = []
+    for item in map(parse_job_line, lines):
+        if item is None:
+            continue
+        # Stop parsing as soon as the payload is known to be too large
+        if max_items is not None and len(items) >= max_items:
+            raise JobPayloadTooLarge()
+        if max_item_bytes is not None and item_size(item) > max_item_bytes:
+            raise JobItemTooLarge()
+        items.append(item)
+    if not items:
+        raise EmptyJobPayload()
+    return items
+
+
+def split_chunks(items: list[dict[str, Any]], chunk_size: int, max_chunk_bytes: Optional[int] = None) -> list[tuple[int, int]]:
+    """
+    Split the items of a job into chunks of at most `chunk_size` items and `max_chunk_bytes` bytes.
+
+    A chunk always holds at least one item, so an item larger than `max_chunk_bytes` gets a chunk of its own.
+
+    Args:
+      items: The items of the job.
+      chunk_size: The maximum number of items per chunk.
+      max_chunk_bytes: The maximum size in bytes of the items of a chunk, None for no limit.
+
+    Returns:
+      The start and end positions of the items of each chunk.
+    """
+    bounds = []
+    start, size = 0, 0
+    for position, item in enumerate(items):
+        item_bytes = item_size(item)
+        if position > start and (position - start >= chunk_size or (max_chunk_bytes is not None and size + item_bytes > max_chunk_bytes)):
+            bounds.append((start, position))
+            start, size = position, 0
+        size += item_bytes
+    if items:
+        bounds.append((start, len(items)))
+    return bounds
+
+
+async def create_indexes() -> None:
+    """
+    Create the indexes used to claim chunks and page results.
+    """
+    await Database.db[CHUNKS_COLLECTION].create_index([("status", 1), ("job_id", 1), ("index", 1)])
+    await Database.db[RESULTS_COLLECTION].create_index([("job_id", 1), ("position", 1)])
+
+
+async def create_job(user_id: str, items: list[dict[str, Any]], chunk_size: int, max_chunk_bytes: Optional[int] = None) -> dict[str, Any]:
+    """
+    Create a job and split its items into chunks for the workers.
+
+    Args:
+      user_id: The ID of the user submitting the job.
+      items: The items of the job, as returned by `parse_job_payload`.
+      chunk_size: The maximum number of items per chunk.
+      max_chunk_bytes: The maximum size in bytes of the items of a chunk, None for no limit.
+
+    Returns:
+      The created job data.
+    """
+    now = datetime.now(timezone.utc)
+    job = {
+        "user_id": user_id,
+        "status": JobStatus.QUEUED.value,
+        "total": len(items),
+        "processed": 0,
+        "failed": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+    result = await Database.db[JOBS_COLLECTION].insert_one(job)
+    job["_id"] = result.inserted_id
+
+    chunks = [
+        {
+            "job_id": job["_id"],
+            "index": index,
+            "start": start,
+            "items": items[start:end],
+            "status": ChunkStatus.PENDING.value,
+            "attempts": 0,
+            "worker_id": None,
+            "lease_expires_at": None,
+            "error": None,
+        }
+        for index, (start, end) in enumerate(split_chunks(items, chunk_size, max_chunk_bytes))
+    ]
+    try:
+        await Database.db[CHUNKS_COLLECTION].insert_many(chunks)
+    except Exception:
+        # Remove the job and the chunks inserted before the failure, so no job is left queued without its chunks
+        await Database.db[CHUNKS_COLLECTION].delete_many({"job_id": job["_id"]})
+        await Database.db[RESULTS_COLLECTION].delete_many({"job_id": job["_id"]})
+        await Database.db[JOBS_COLLECTION].delete_one({"_id": job["_id"]})
+        raise
+    return job
+
+
+async def get_job(job_id: str) -> Optional[dict[str, Any]]:
+    """
+    Retrieve a job from the database by ID.
+
+    Args:
+      job_id: The ID of the job.
+
+    Returns:
+      The job data if found, None otherwise.
+    """
+    try:
+        object_id = ObjectId(job_id)
+    except InvalidId:
+        return None
+    return await Database.db[JOBS_COLLECTION].find_one({"_id": object_id})
+
+
+async def get_job_results(job_id: ObjectId, offset: int, limit: int) -> list[dict[str, Any]]:
+    """
+    Retrieve a page of the results of a job, ordered by position in the payload.
+
+    Args:
+      job_id: The ID of the job.
+      offset: The position of the first result of the page.
+      limit: The maximum number of results of the page.
+
+    Returns:
+      The results at or after the offset that are already processed.
+    """
+    cursor = Database.db[RESULTS_COLLECTION].find({"job_id": job_id, "position": {"$gte": offset}}).sort("position", 1).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def claim_next_chunk(worker_id: str, lease_seconds: float) -> Optional[dict[str, Any]]:
+    """
+    Claim the next pending chunk, or a chunk whose worker stopped before its lease expired.
+
+    Chunks are claimed atomically, so any number of workers, in any number of processes, can poll concurrently.
+
+    Args:
+      worker_id: The ID of the claiming worker.
+      lease_seconds: The number of seconds after which the chunk can be claimed by another worker.
+
+    Returns:
+      The claimed chunk data, with its attempts counter incremented, or None if there is nothing to process.
+    """
+    now = datetime.now(timezone.utc)
+    chunk = await Database.db[CHUNKS_COLLECTION].find_one_and_update(
+        {"$or": [{"status": ChunkStatus.PENDING.value}, {"status": ChunkStatus.RUNNING.value, "lease_expires_at": {"$lt": now}}]},
+        {
+            "$set": {"status": ChunkStatus.RUNNING.value, "worker_id": worker_id, "lease_expires_at": now + timedelta(seconds=lease_seconds)},
+            "$inc": {"attempts": 1},
+        },
+        sort=[("job_id", 1), ("index", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+    if chunk is not None:
+        await Database.db[JOBS_COLLECTION].update_one(
+            {"_id": chunk["job_id"], "status": JobStatus.QUEUED.value},
+            {"$set": {"status": JobStatus.RUNNING.value, "updated_at": now}},
+        )
+    return chunk
+
+
+async def renew_chunk_lease(chunk: dict[str, Any], worker_id: str, lease_seconds: float) -> bool:
+    """
+    Extend the lease of a chunk still held by the given worker.
+
+    Args:
+      chunk: The chunk data.
+      worker_id: The ID of the worker holding the chunk.
+      lease_seconds: The number of seconds from now after which the chunk can be claimed by another worker.
+
+    Returns:
+      True if the lease was renewed, False if it expired or the chunk was claimed by another worker.
+    """
+    now = datetime.now(timezone.utc)
+    lease_expires_at = now + timedelta(seconds=lease_seconds)
+    update = await Database.db[CHUNKS_COLLECTION].update_one(
+        {"_id": chunk["_id"], "status": ChunkStatus.RUNNING.value, "worker_id": worker_id, "lease_expires_at": {"$gte": now}},
+        {"$set": {"lease_expires_at": lease_expires_at}},
+    )
+    if update.modified_count:
+        chunk["lease_expires_at"] = lease_expires_at
+    return bool(update.modified_count)
+
+
+async def _insert_results(documents: list[dict[str, Any]]) -> None:
+    """
+    Insert result documents, ignoring the ones already inserted by a previous attempt of the chunk.
+
+    Args:
+      documents: The result documents.
+    """
+    try:
+        await Database.db[RESULTS_COLLECTION].insert_many(documents, ordered=False)
+    except BulkWriteError:
+        pass
+
+
+async def _record_progress(job_id: ObjectId, processed: int = 0, failed: int = 0) -> None:
+    """
+    Add processed or failed items to the progress of a job, and complete it once every item is accounted for.
+
+    A job is marked as failed if none of its items could be processed, and as completed otherwise, with the number
+    of failed items in its progress.
+
+    Args:
+      job_id: The ID of the job.
+      processed: The number of newly processed items.
+      failed: The number of newly failed items.
+    """
+    now = datetime.now(timezone.utc)
+    job = await Database.db[JOBS_COLLECTION].find_one_and_update(
+        {"_id": job_id},
+        {"$inc": {"processed": processed, "failed": failed}, "$set": {"updated_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if job is not None and job["processed"] + job["failed"] >= job["total"]:
+        job_status = JobStatus.FAILED if job["failed"] >= job["total"] else JobStatus.COMPLETED
+        await Database.db[JOBS_COLLECTION].update_one({"_id": job_id}, {"$set": {"status": job_status.value, "updated_at": now}})
+
+
+async def complete_chunk(chunk: dict[str, Any], results: list[dict[str, Any]], worker_id: str) -> None:
+    """
+    Store the results of a chunk and mark it as done.
+
+    Progress is only recorded by the worker that still holds the chunk, so a chunk processed twice
+    after its lease expired is not counted twice.
+
+    Args:
+      chunk: The chunk data.
+      results: The results of the items of the chunk, in the same order.
+      worker_id: The ID of the worker that processed the chunk.
+    """
+    documents = [
+        {
+            "_id": f"{chunk['job_id']}:{chunk['start'] + offset}",
+            "job_id": chunk["job_id"],
+            "position": chunk["start"] + offset,
+            "item_id": item["id"],
+            "result": result,
+            "error": None,
+        }
+        for offset, (item, result) in enumerate(zip(chunk["items"], results))
+    ]
+    await _insert_results(documents)
+
+    update = await Database.db[CHUNKS_COLLECTION].update_one(
+        {"_id": chunk["_id"], "status": ChunkStatus.RUNNING.value, "worker_id": worker_id},
+        {"$set": {"status": ChunkStatus.DONE.value, "lease_expires_at": None, "error": None}},
+    )
+    if update.modified_count:
+        await _record_progress(chunk["job_id"], processed=len(chunk["items"]))
+
+
+async def fail_chunk(chunk: dict[str, Any], error: str, worker_id: str, max_attempts: int) -> None:
+    """
+    Hand a chunk that failed back to the workers, or mark its items as failed once it ran out of attempts.
+
+    Args:
+      chunk: The chunk data.
+      error: The error message.
+      worker_id: The ID of the worker that processed the chunk.
+      max_attempts: The number of times a chunk is attempted.
+    """
+    if chunk["attempts"] < max_attempts:
+        await Database.db[CHUNKS_COLLECTION].update_one(
+            {"_id": chunk["_id"], "status": ChunkStatus.RUNNING.value, "worker_id": worker_id},
+            {"$set": {"status": ChunkStatus.PENDING.value, "lease_expires_at": None, "error": error}},
+        )
+        return
+
+    documents = [
+        {
+            "_id": f"{chunk['job_id']}:{chunk['start'] + offset}",
+            "job_id": chunk["job_id"],
+            "position": chunk["start"] + offset,
+            "item_id": item["id"],
+            "result": None,
+            "error": error,
+        }
+        for offset, item in enumerate(chunk["items"])
+    ]
+    await _insert_results(documents)
+
+    update = await Database.db[CHUNKS_COLLECTION].update_one(
+        {"_id": chunk["_id"], "status": ChunkStatus.RUNNING.value, "worker_id": worker_id},
+        {"$set": {"status": ChunkStatus.FAILED.value, "lease_expires_at": None, "error": error}},
+    )
+    if update.modified_count:
+        await _record_progress(chunk["job_id"], failed=len(chunk["items"]))
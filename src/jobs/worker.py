@@ -0,0 +1,116 @@
+import asyncio
+import os
+import socket
+
+from src.jobs import service
+from src.nlp.exceptions import InferenceQueueFull
+
+
+async def keep_chunk_lease(chunk, worker_id, lease_seconds):
+    """
+    Renew the lease of a chunk every third of the lease, until cancelled or the lease is lost.
+
+    Args:
+        chunk (dict): The claimed chunk.
+        worker_id (str): The ID of the worker holding the chunk.
+        lease_seconds (float): Seconds the lease of the chunk is extended by at each renewal.
+    """
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        try:
+            if not await service.renew_chunk_lease(chunk, worker_id, lease_seconds):
+                return
+        except Exception as e:
+            # Keep the lease alive if the database is briefly unavailable, the next renewal may still be in time
+            print(f"Failed to renew the lease of chunk {chunk['index']} of job {chunk['job_id']}: {e}")
+
+
+async def process_chunk(pipeline, chunk, worker_id, max_attempts, retry_interval, lease_seconds):
+    """
+    Run the pipeline over the items of a chunk and store their results.
+
+    The lease of the chunk is renewed in the background while the chunk waits for the inference executor and is
+    processed, so a slow chunk is not claimed by another worker. If the lease is lost, the chunk is left to the
+    worker that claimed it next.
+
+    Args:
+        pipeline (NlpPipeline): The NLP pipeline the chunks are processed with.
+        chunk (dict): The claimed chunk.
+        worker_id (str): The ID of the worker.
+        max_attempts (int): The number of times a chunk is attempted.
+        retry_interval (float): Seconds to wait before resubmitting the chunk when the inference executor is saturated.
+        lease_seconds (float): Seconds the lease of the chunk is extended by while it is held.
+    """
+    # The previous worker of the chunk stopped while processing it, give up on it once it ran out of attempts
+    if chunk["attempts"] > max_attempts:
+        await service.fail_chunk(chunk, "The chunk was abandoned by its workers.", worker_id, max_attempts)
+        return
+
+    texts = [item["text"] for item in chunk["items"]]
+    heartbeat = asyncio.create_task(keep_chunk_lease(chunk, worker_id, lease_seconds))
+    try:
+        while True:
+            try:
+                results = await pipeline.process(texts)
+                break
+            except InferenceQueueFull:
+                # Interactive requests take precedence, wait for a free slot while holding on to the chunk
+                await asyncio.sleep(retry_interval)
+                if heartbeat.done():
+                    print(f"Lost the lease of chunk {chunk['index']} of job {chunk['job_id']} while waiting for the inference executor.")
+                    return
+            except Exception as e:
+                print(f"Failed to process chunk {chunk['index']} of job {chunk['job_id']}: {e}")
+                await service.fail_chunk(chunk, str(e), worker_id, max_attempts)
+                return
+
+        if heartbeat.done():
+            # The lease expired and the chunk may already be processed by another worker, leave it to them
+            print(f"Lost the lease of chunk {chunk['index']} of job {chunk['job_id']} while processing it.")
+            return
+        await service.complete_chunk(chunk, results, worker_id)
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+
+
+async def run_job_worker(pipeline, worker_id, poll_interval, lease_seconds, max_attempts):
+    """
+    Claim and process chunks of the bulk jobs until cancelled.
+
+    Args:
+        pipeline (NlpPipeline): The NLP pipeline the chunks are processed with.
+        worker_id (str): The ID of the worker, unique across the processes sharing the database.
+        poll_interval (float): Seconds to wait before looking for a new chunk when there is none.
+        lease_seconds (float): Seconds after which a chunk claimed by this worker can be claimed by another one.
+        max_attempts (int): The number of times a chunk is attempted.
+    """
+    while True:
+        try:
+            chunk = await service.claim_next_chunk(worker_id, lease_seconds)
+            if chunk is None:
+                await asyncio.sleep(poll_interval)
+                continue
+            await process_chunk(pipeline, chunk, worker_id, max_attempts, poll_interval, lease_seconds)
+        except Exception as e:
+            # Keep the worker alive if the database is briefly unavailable
+            print(f"Job worker {worker_id} failed: {e}")
+            await asyncio.sleep(poll_interval)
+
+
+def start_job_workers(pipeline, count, poll_interval, lease_seconds, max_attempts):
+    """
+    Start the job workers of the current process.
+
+    Args:
+        pipeline (NlpPipeline): The NLP pipeline the chunks are processed with.
+        count (int): The number of workers to start.
+        poll_interval (float): Seconds to wait before looking for a new chunk when there is none.
+        lease_seconds (float): Seconds after which a claimed chunk can be claimed by another worker.
+        max_attempts (int): The number of times a chunk is attempted.
+
+    Returns:
+        list: The tasks of the workers.
+    """
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    return [asyncio.create_task(run_job_worker(pipeline, f"{prefix}:{number}", poll_interval, lease_seconds, max_attempts)) for number in range(count)]
@@ -1,16 +1,59 @@
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 import sentry_sdk
 from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from src.auth.router import router as auth_router
 from src.config import app_configs, settings
 from src.database import Database
+from src.jobs import service as jobs_service
+from src.jobs.config import jobs_config
+from src.jobs.router import router as jobs_router
+from src.jobs.worker import start_job_workers
 from src.nlp.config import nlp_config
-from src.nlp.models import load_bertopic_model, load_embeddings_model
+from src.nlp.pipeline import PIPELINE_COMPONENTS, NlpPipeline, cancel_tasks
+from src.nlp.readiness import LoadTracker
 from src.nlp.router import router as nlp_router
+from src.nlp.services.blueprint_catalog import watch_blueprint_catalog
+from src.nlp.services.entity_catalog import watch_entity_catalog
+
+
+async def start_nlp_pipeline(app: FastAPI) -> None:
+    """
+    Load the NLP pipeline, then start the services depending on it.
+
+    Args:
+        app (FastAPI): The application the pipeline is attached to once loaded.
+    """
+    try:
+        pipeline = await NlpPipeline.load(nlp_config, app.state.nlp_loader)
+        if pipeline.result_cache is not None:
+            await pipeline.result_cache.create_indexes()
+        # Process workers load their own copy of the models
+        pipeline.start_inference_executor(nlp_config.INFERENCE_EXECUTOR, nlp_config.INFERENCE_WORKERS, nlp_config.INFERENCE_QUEUE_SIZE)
+        print("Inference executor started.")
+        app.state.nlp_pipeline = pipeline
+        # Reload the entity and blueprint catalogs when their files change
+        if nlp_config.CATALOG_WATCH_INTERVAL > 0:
+            app.state.entity_catalog_watcher = asyncio.create_task(watch_entity_catalog(pipeline, nlp_config.CATALOG_WATCH_INTERVAL))
+            app.state.blueprint_catalog_watcher = asyncio.create_task(watch_blueprint_catalog(pipeline, nlp_config.CATALOG_WATCH_INTERVAL))
+        # Process the chunks of the bulk jobs in the background
+        if Database.db is not None and jobs_config.JOB_WORKERS > 0:
+            await jobs_service.create_indexes()
+            app.state.job_workers = start_job_workers(
+                pipeline, jobs_config.JOB_WORKERS, jobs_config.JOB_POLL_INTERVAL, jobs_config.JOB_LEASE_SECONDS, jobs_config.JOB_MAX_ATTEMPTS
+            )
+            print("Job workers started.")
+    except Exception as e:
+        print(f"Failed to load the NLP pipeline: {e}")
+        import traceback
+
+        traceback.print_exc()
 
 
 # Define an async context manager for the lifespan of the FastAPI application
@@ -19,11 +62,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     try:
         # Startup
         await Database.connect(settings.DATABASE_URL, settings.DATABASE_NAME)
-        model_object_name = nlp_config.MODEL_NAME
-        app.state.bertopic_model = await load_bertopic_model(model_object_name)
-        print("BERTopic model loaded successfully. ")
-        app.state.tokenizer, app.state.model = await load_embeddings_model()
-        print("Embeddings model loaded successfully.")
+        # Load the NLP pipeline in the background, the readiness endpoint reports its progress
+        app.state.nlp_pipeline = None
+        app.state.nlp_loader = LoadTracker(PIPELINE_COMPONENTS)
+        app.state.nlp_startup = asyncio.create_task(start_nlp_pipeline(app))
         yield
     except Exception as e:
         print(f"Failed to start the application: {e}")
@@ -31,7 +73,18 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
 
         traceback.print_exc()
     finally:
-        # Shutdown
+        # Shutdown: stop the loader, workers and watchers, and wait for them before closing the pipeline they use
+        tasks = [
+            getattr(app.state, "nlp_startup", None),
+            *getattr(app.state, "job_workers", []),
+            getattr(app.state, "entity_catalog_watcher", None),
+            getattr(app.state, "blueprint_catalog_watcher", None),
+        ]
+        await cancel_tasks([task for task in tasks if task is not None])
+        if getattr(app.state, "nlp_pipeline", None) is not None:
+            # Shutting down the executor and joining the embedding thread block, keep the event loop responsive
+            await asyncio.to_thread(app.state.nlp_pipeline.close)
+            print("NLP pipeline stopped.")
         try:
             Database.close()
             print("Database connection closed.")
@@ -83,8 +136,29 @@ async def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
+# Define the readiness endpoint
+@app.get("/readiness", include_in_schema=False)
+async def readiness() -> JSONResponse:
+    """
+    Readiness endpoint of the FastAPI application.
+    Returns 200 once the NLP pipeline is loaded, 503 while it is loading or if its startup failed,
+    with the load state and time of each of its components.
+    """
+    loader = app.state.nlp_loader
+    if app.state.nlp_pipeline is not None:
+        status, status_code = "ready", 200
+    elif loader.failed or app.state.nlp_startup.done():
+        status, status_code = "failed", 503
+    else:
+        status, status_code = "loading", 503
+    return JSONResponse({"status": status, "components": jsonable_encoder(loader.report())}, status_code=status_code)
+
+
 # Include the auth router with the specified prefix and tags
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 
 # Include the NLP router with the specified prefix and tags
 app.include_router(nlp_router, prefix="/nlp", tags=["NLP"])
+
+# Include the bulk jobs router with the specified prefix and tags
+app.include_router(jobs_router, prefix="/jobs", tags=["Jobs"])
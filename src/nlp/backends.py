@@ -0,0 +1,215 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from src.nlp.constants import EmbeddingBackendKind
+from src.nlp.models import EMBEDDINGS_MODEL_NAME, load_embeddings_model, load_embeddings_tokenizer
+from src.nlp.utils import encode_in_batches, encode_texts, mean_pooling
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model-int8.onnx"
+
+
+class TorchEmbeddingBackend:
+    """
+    Encodes texts with the full-precision PyTorch embeddings model.
+    """
+
+    kind = EmbeddingBackendKind.TORCH
+
+    def __init__(self, tokenizer, model):
+        """
+        Initializes the TorchEmbeddingBackend object.
+
+        Args:
+            tokenizer (AutoTokenizer): The tokenizer for the embeddings model.
+            model (AutoModel): The embeddings model.
+        """
+        self.tokenizer = tokenizer
+        self.model = model
+
+    def encode(self, texts, batch_size):
+        """
+        Encode a list of texts, in batches.
+
+        Args:
+            texts (list): The input texts to be embedded.
+            batch_size (int): The maximum number of texts passed to the model in a single forward pass.
+
+        Returns:
+            torch.Tensor: A matrix with one normalized embedding per row, in the same order as the texts.
+        """
+        return encode_texts(self.tokenizer, self.model, texts, batch_size)
+
+
+class OnnxEmbeddingBackend:
+    """
+    Encodes texts with an ONNX export of the embeddings model, run by ONNX Runtime.
+    """
+
+    def __init__(self, tokenizer, model_path, kind=EmbeddingBackendKind.ONNX, num_threads=None):
+        """
+        Initializes the OnnxEmbeddingBackend object.
+
+        Args:
+            tokenizer (AutoTokenizer): The tokenizer for the embeddings model.
+            model_path (str): The path of the ONNX graph.
+            kind (EmbeddingBackendKind): Whether the graph is the full-precision or the quantized export.
+            num_threads (int): Optional number of threads ONNX Runtime uses per forward pass.
+
+        Raises:
+            ImportError: If ONNX Runtime is not installed.
+        """
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.tokenizer = tokenizer
+        self.model = None
+        self.kind = EmbeddingBackendKind(kind)
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def encode(self, texts, batch_size):
+        """
+        Encode a list of texts, in batches.
+
+        Args:
+            texts (list): The input texts to be embedded.
+            batch_size (int): The maximum number of texts passed to the model in a single forward pass.
+
+        Returns:
+            torch.Tensor: A matrix with one normalized embedding per row, in the same order as the texts.
+        """
+
+        def embed_batch(batch):
+            # Tokenize the batch, padding every text to the longest one in the batch
+            inputs = self.tokenizer(batch, return_tensors="np", padding=True, truncation=True, max_length=512)
+            feeds = {name: inputs[name].astype(np.int64) for name in self.input_names}
+            last_hidden_state = self.session.run(["last_hidden_state"], feeds)[0]
+            # Mean pool and normalize the embeddings exactly like the PyTorch backend
+            embeddings = mean_pooling((torch.from_numpy(last_hidden_state),), torch.from_numpy(inputs["attention_mask"]))
+            return F.normalize(embeddings, p=2, dim=1)
+
+        return encode_in_batches(texts, batch_size, embed_batch)
+
+
+def export_onnx_model(tokenizer, model, model_path):
+    """
+    Export the PyTorch embeddings model to an ONNX graph with dynamic batch and sequence axes.
+
+    Args:
+        tokenizer (AutoTokenizer): The tokenizer for the embeddings model.
+        model (AutoModel): The embeddings model.
+        model_path (str): The path of the ONNX graph to write.
+    """
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    inputs = tokenizer(["An example sentence to trace the model."], return_tensors="pt")
+    input_names = list(inputs.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    model.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(inputs[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+
+
+def quantize_onnx_model(model_path, quantized_model_path):
+    """
+    Quantize the weights of an ONNX graph to int8 with dynamic quantization.
+
+    Args:
+        model_path (str): The path of the full-precision ONNX graph.
+        quantized_model_path (str): The path of the quantized ONNX graph to write.
+
+    Raises:
+        ImportError: If ONNX Runtime is not installed.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(model_path, quantized_model_path, weight_type=QuantType.QInt8)
+
+
+def write_model_atomically(write, model_path):
+    """
+    Write a model file into a temporary directory next to its path, then move it into place.
+
+    The workers starting at the same time may all export the same graph: each one writes its own copy,
+    and the others only ever load a complete file.
+
+    Args:
+        write (callable): Function writing the model to the path it is given.
+        model_path (str): The path of the model file.
+    """
+    directory = os.path.dirname(os.path.abspath(model_path))
+    os.makedirs(directory, exist_ok=True)
+    temporary_dir = tempfile.mkdtemp(dir=directory, prefix=".export-")
+    try:
+        temporary_path = os.path.join(temporary_dir, os.path.basename(model_path))
+        write(temporary_path)
+        os.replace(temporary_path, model_path)
+    finally:
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+
+
+def embedding_model_id(kind):
+    """
+    Identify the embeddings model and the runtime it runs on, quantization included.
+
+    The embeddings of different models or runtimes are not comparable, so the indexes of precomputed
+    embeddings are only reused with the model and runtime they were built with.
+
+    Args:
+        kind (EmbeddingBackendKind): The backend the embeddings model runs on.
+
+    Returns:
+        str: The name of the embeddings model and the backend, like "sentence-transformers/all-MiniLM-L6-v2:onnx-int8".
+    """
+    return f"{EMBEDDINGS_MODEL_NAME}:{EmbeddingBackendKind(kind).value}"
+
+
+def load_embedding_backend(kind=EmbeddingBackendKind.TORCH, onnx_model_dir=None, num_threads=None):
+    """
+    Load the embeddings model with the selected backend.
+
+    The ONNX graphs are exported, and quantized, from the PyTorch model the first time they are needed,
+    and moved into place once complete.
+    Once they exist, the PyTorch model is not loaded at all in the ONNX modes.
+
+    Args:
+        kind (EmbeddingBackendKind): The backend to load.
+        onnx_model_dir (str): The directory of the ONNX graphs.
+        num_threads (int): Optional number of threads ONNX Runtime uses per forward pass.
+
+    Returns:
+        TorchEmbeddingBackend | OnnxEmbeddingBackend: The loaded backend.
+    """
+    kind = EmbeddingBackendKind(kind)
+    if kind == EmbeddingBackendKind.TORCH:
+        tokenizer, model = load_embeddings_model()
+        return TorchEmbeddingBackend(tokenizer, model)
+
+    tokenizer = load_embeddings_tokenizer()
+    model_path = os.path.join(onnx_model_dir, ONNX_MODEL_FILE)
+    if not os.path.exists(model_path):
+        _, model = load_embeddings_model()
+        write_model_atomically(lambda path: export_onnx_model(tokenizer, model, path), model_path)
+    if kind == EmbeddingBackendKind.ONNX_INT8:
+        quantized_model_path = os.path.join(onnx_model_dir, ONNX_INT8_MODEL_FILE)
+        if not os.path.exists(quantized_model_path):
+            write_model_atomically(lambda path: quantize_onnx_model(model_path, path), quantized_model_path)
+        model_path = quantized_model_path
+
+    return OnnxEmbeddingBackend(tokenizer, model_path, kind, num_threads)
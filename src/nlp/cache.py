@@ -0,0 +1,146 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """
+    Normalize a text for caching: Unicode NFC form, whitespace runs collapsed to a single space and stripped.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_cache_key(text):
+    """
+    Compute the content-addressed cache key of a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The SHA-256 hex digest of the normalized text.
+    """
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    A thread-safe least-recently-used cache bounded by the total size of its values, with a time to live.
+    """
+
+    def __init__(self, max_bytes, ttl=None, sizeof=None):
+        """
+        Initializes the LRUCache object.
+
+        Args:
+            max_bytes (int): The maximum total size of the cached values. Older entries are evicted beyond it.
+            ttl (float): Optional number of seconds after which an entry expires.
+            sizeof (callable): Function returning the size in bytes of a value. Defaults to counting each entry as one byte.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof or (lambda value: 1)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Get a value from the cache and mark it as recently used.
+
+        Args:
+            key (str): The key of the value.
+
+        Returns:
+            The cached value, or None if the key is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Add a value to the cache, evicting the least recently used entries if it is full.
+
+        Args:
+            key (str): The key of the value.
+            value: The value to cache.
+        """
+        size = self.sizeof(value)
+        # Values larger than the whole cache are not cached
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: The number of hits, misses, evictions, expirations and entries, and the size of the cached values.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key):
+        """
+        Remove an entry, the lock must be held.
+
+        Args:
+            key (str): The key of the entry.
+        """
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
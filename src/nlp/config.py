@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
 
+from src.nlp.constants import EmbeddingBackendKind, ExecutorKind, TopicClassifierMode
+
 
 class NlpConfig(BaseSettings):
     """
@@ -10,5 +12,53 @@ class NlpConfig(BaseSettings):
     CORPUS_DIR: str
     BLUEPRINTS_DIR: str
 
+    # Optional directory of the memory-mapped topic model artifact exported from MODEL_NAME by
+    # scripts/export_topic_model.py, loaded instead of the full BERTopic model
+    TOPIC_MODEL_ARTIFACT_DIR: str | None = None
+
+    # How texts are classified into topics: the transform method of the topic model, or the nearest
+    # topic centroid to the input embedding, which reuses the embedding computed for scoring
+    TOPIC_CLASSIFIER_MODE: TopicClassifierMode = TopicClassifierMode.TRANSFORM
+    # Whether the transform method reuses the input embedding computed for scoring, instead of embedding
+    # the text followed by the categories of its entities a second time
+    TOPIC_REUSE_INPUT_EMBEDDING: bool = True
+
+    # Runtime of the embeddings model: PyTorch, or its ONNX export in full precision or quantized to int8
+    EMBEDDING_BACKEND: EmbeddingBackendKind = EmbeddingBackendKind.TORCH
+    # Directory where the ONNX exports of the embeddings model are written and loaded from
+    ONNX_MODEL_DIR: str = "models/onnx"
+    # Maximum number of texts encoded by the embeddings model in a single forward pass
+    EMBEDDING_BATCH_SIZE: int = 256
+    # Milliseconds an embedding request waits for concurrent requests to join its batch
+    EMBEDDING_MAX_WAIT_MS: float = 5.0
+    # Size bound of the embedding cache in bytes, 0 disables the cache
+    EMBEDDING_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Seconds after which a cached embedding expires
+    EMBEDDING_CACHE_TTL: float = 3600
+
+    # Pool the blocking model inference runs on, off the event loop
+    INFERENCE_EXECUTOR: ExecutorKind = ExecutorKind.THREAD
+    INFERENCE_WORKERS: int = 2
+    # Number of requests that may wait for a free inference worker before new ones are rejected with a 503
+    INFERENCE_QUEUE_SIZE: int = 16
+
+    # Number of texts processed together by /nlp/process/stream/ before their results are streamed
+    STREAM_CHUNK_SIZE: int = 32
+
+    # Size bound of the in-memory result cache of /nlp/process/ in bytes, 0 disables the cache
+    RESULT_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Seconds after which a cached result expires from the database tier
+    RESULT_CACHE_TTL: float = 24 * 3600
+    # Whether results are also cached in MongoDB, shared between the workers
+    RESULT_CACHE_DATABASE: bool = False
+
+    # Seconds between two checks of the entity catalog file for changes, 0 disables the hot reload
+    CATALOG_WATCH_INTERVAL: float = 5.0
+
+    # Optional path where the entity embedding index is cached between restarts
+    ENTITY_INDEX_PATH: str | None = None
+    # Optional path where the topic keyword embedding index is cached between restarts
+    TOPIC_INDEX_PATH: str | None = None
+
 
 nlp_config = NlpConfig()
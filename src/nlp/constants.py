@@ -0,0 +1,50 @@
+from enum import Enum
+
+
+class ErrorCode:
+    INFERENCE_QUEUE_FULL = "The inference queue is full. Please retry later."
+    PIPELINE_NOT_READY = "The NLP models are still loading. Please retry later."
+    INVALID_ENTITY_CATALOG = "The tech entities file is invalid, the previous entity catalog is kept."
+    INVALID_BLUEPRINT_CATALOG = "The blueprints file is invalid, the previous blueprint catalog is kept."
+    BLUEPRINT_CATALOG_NOT_FOUND = "The blueprints file does not exist, the previous blueprint catalog is kept."
+
+
+class ExecutorKind(str, Enum):
+    """
+    Enum class representing the kinds of pools the inference executor can run on.
+    """
+
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class EmbeddingBackendKind(str, Enum):
+    """
+    Enum class representing the runtimes the embeddings model can run on.
+    """
+
+    TORCH = "torch"
+    ONNX = "onnx"
+    ONNX_INT8 = "onnx-int8"
+
+
+class TopicClassifierMode(str, Enum):
+    """
+    Enum class representing the ways texts are classified into topics.
+    """
+
+    # The transform method of the topic model
+    TRANSFORM = "transform"
+    # The topic with the nearest centroid to the input embedding
+    CENTROID = "centroid"
+
+
+class LoadStatus(str, Enum):
+    """
+    Enum class representing the load states of a component of the NLP pipeline.
+    """
+
+    PENDING = "pending"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
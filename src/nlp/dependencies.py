@@ -0,0 +1,16 @@
+from fastapi import Request
+
+from src.nlp.exceptions import PipelineNotReady
+from src.nlp.pipeline import NlpPipeline
+
+
+# Gets the NLP pipeline loaded by the application
+def get_nlp_pipeline(request: Request) -> NlpPipeline:
+    """
+    Gets the NLP pipeline loaded by the application at startup.
+    Raises PipelineNotReady while the pipeline is still loading.
+    """
+    pipeline = request.app.state.nlp_pipeline
+    if pipeline is None:
+        raise PipelineNotReady()
+    return pipeline
@@ -0,0 +1,203 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+
+from src.nlp.cache import text_cache_key
+
+
+def tensor_nbytes(tensor):
+    """
+    Get the size in bytes of the data of a tensor.
+
+    Args:
+        tensor (torch.Tensor): The tensor.
+
+    Returns:
+        int: The number of bytes of the tensor elements.
+    """
+    return tensor.element_size() * tensor.nelement()
+
+
+class EmbeddingService:
+    """
+    Encodes texts with the embeddings model, coalescing concurrent requests into shared batches.
+
+    Callers enqueue their texts and wait on a future. A background thread collects the pending
+    requests until it has `max_batch_size` texts or `max_wait_ms` milliseconds have passed since the
+    first one arrived, runs a single padded forward pass over all of them, and resolves each future
+    with the rows of its own texts.
+
+    When a cache is given, texts whose normalized content was already encoded are served from it
+    and only the missing ones are enqueued.
+    """
+
+    def __init__(self, backend, max_batch_size=64, max_wait_ms=5.0, cache=None):
+        """
+        Initializes the EmbeddingService object and starts its batching thread.
+
+        Args:
+            backend (TorchEmbeddingBackend | OnnxEmbeddingBackend): The runtime of the embeddings model.
+            max_batch_size (int): The maximum number of texts encoded in a single forward pass.
+            max_wait_ms (float): How long the first request of a batch waits for other requests to join it.
+            cache (LRUCache): Optional cache of the embeddings, keyed on the hash of the normalized texts.
+        """
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cache = cache
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        """
+        Enqueue texts to be encoded.
+
+        Args:
+            texts (list): The texts to encode.
+
+        Returns:
+            concurrent.futures.Future: A future resolved with a matrix of one normalized embedding per text.
+        """
+        future = Future()
+        if not texts:
+            future.set_result(torch.empty(0))
+        elif self.cache is None:
+            self._requests.put((list(texts), future))
+        else:
+            self._submit_cached(list(texts), future)
+        return future
+
+    def _submit_cached(self, texts, future):
+        """
+        Serve texts from the cache and enqueue the missing ones, each distinct text once.
+
+        Args:
+            texts (list): The texts to encode.
+            future (concurrent.futures.Future): The future to resolve with the embeddings of the texts.
+        """
+        keys = [text_cache_key(text) for text in texts]
+        embeddings = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in embeddings or key in missing:
+                continue
+            embedding = self.cache.get(key)
+            if embedding is None:
+                missing[key] = text
+            else:
+                embeddings[key] = embedding
+
+        def resolve(encoded=None):
+            # Skip the request if its caller gave up waiting
+            if not future.set_running_or_notify_cancel():
+                return
+            # Cache the newly encoded texts, then assemble the rows in the order of the texts
+            if encoded is not None:
+                if encoded.exception() is not None:
+                    future.set_exception(encoded.exception())
+                    return
+                for key, embedding in zip(missing, encoded.result()):
+                    # Copy the row so the cache does not keep the whole batch alive
+                    embeddings[key] = embedding.clone()
+                    self.cache.set(key, embeddings[key])
+            future.set_result(torch.stack([embeddings[key] for key in keys]))
+
+        if not missing:
+            resolve()
+            return
+
+        encoded = Future()
+        encoded.add_done_callback(resolve)
+        self._requests.put((list(missing.values()), encoded))
+
+    def encode(self, texts):
+        """
+        Encode texts, blocking until their batch has been processed.
+
+        Args:
+            texts (list): The texts to encode.
+
+        Returns:
+            torch.Tensor: A matrix with one normalized embedding per row, in the same order as the texts.
+        """
+        return self.submit(texts).result()
+
+    async def aencode(self, texts):
+        """
+        Encode texts without blocking the event loop.
+
+        Args:
+            texts (list): The texts to encode.
+
+        Returns:
+            torch.Tensor: A matrix with one normalized embedding per row, in the same order as the texts.
+        """
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def close(self):
+        """
+        Stop the batching thread once the pending requests are processed.
+        """
+        self._requests.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        """
+        Collect the requests that join the batch of the first request.
+
+        Args:
+            first (tuple): The texts and future of the first request of the batch.
+
+        Returns:
+            tuple: The requests of the batch, and whether the service was closed while collecting them.
+        """
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            size += len(request[0])
+        return batch, False
+
+    def _run(self):
+        """
+        Process batches of requests until the service is closed.
+        """
+        closed = False
+        while not closed:
+            first = self._requests.get()
+            if first is None:
+                break
+            batch, closed = self._collect(first)
+
+            # Skip the requests whose caller gave up waiting
+            batch = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                embeddings = self.backend.encode([text for texts, _ in batch for text in texts], self.max_batch_size)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            # Hand each request the rows of its own texts
+            start = 0
+            for texts, future in batch:
+                future.set_result(embeddings[start : start + len(texts)])
+                start += len(texts)
@@ -0,0 +1,32 @@
+from src.exceptions import BadRequest, NotFound, ServiceUnavailable
+from src.nlp.constants import ErrorCode
+
+
+class InferenceQueueFull(ServiceUnavailable):
+    """Exception raised when the inference executor has no free slot for a new task."""
+
+    DETAIL = ErrorCode.INFERENCE_QUEUE_FULL
+
+
+class PipelineNotReady(ServiceUnavailable):
+    """Exception raised when the NLP pipeline is not loaded yet."""
+
+    DETAIL = ErrorCode.PIPELINE_NOT_READY
+
+
+class InvalidEntityCatalog(BadRequest):
+    """Exception raised when the tech entities file to reload is missing or not a valid entity catalog."""
+
+    DETAIL = ErrorCode.INVALID_ENTITY_CATALOG
+
+
+class InvalidBlueprintCatalog(BadRequest):
+    """Exception raised when the blueprints file to reload is unreadable or not a valid blueprints corpus."""
+
+    DETAIL = ErrorCode.INVALID_BLUEPRINT_CATALOG
+
+
+class BlueprintCatalogNotFound(NotFound):
+    """Exception raised when the blueprints file to reload does not exist."""
+
+    DETAIL = ErrorCode.BLUEPRINT_CATALOG_NOT_FOUND
@@ -0,0 +1,97 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from src.nlp.constants import ExecutorKind
+from src.nlp.exceptions import InferenceQueueFull
+
+
+class InferenceExecutor:
+    """
+    Runs blocking model inference on a worker pool, off the event loop.
+
+    The executor admits at most `max_workers + max_queue_size` tasks at a time. Tasks submitted
+    beyond that are rejected with an InferenceQueueFull exception instead of queueing unboundedly.
+    """
+
+    def __init__(self, kind=ExecutorKind.THREAD, max_workers=2, max_queue_size=16, initializer=None, initargs=()):
+        """
+        Initializes the InferenceExecutor object.
+
+        Args:
+            kind (ExecutorKind): Whether the tasks run on a thread pool or a process pool.
+            max_workers (int): The number of workers of the pool.
+            max_queue_size (int): The number of tasks that may wait for a free worker.
+            initializer (callable): Optional function run once in each worker process, used to load the models.
+            initargs (tuple): The arguments of the initializer.
+        """
+        self.kind = ExecutorKind(kind)
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        if self.kind == ExecutorKind.PROCESS:
+            # Spawn the workers, forking a process that already runs torch threads can deadlock
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs,
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue_size)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self):
+        """
+        The number of tasks running or waiting for a free worker.
+        """
+        return self._pending
+
+    async def run(self, func, *args):
+        """
+        Run a blocking function on the pool and wait for its result.
+
+        In process mode, the function and its arguments must be picklable.
+
+        Args:
+            func (callable): The function to run.
+            *args: The arguments of the function.
+
+        Returns:
+            The return value of the function.
+
+        Raises:
+            InferenceQueueFull: If all the workers are busy and the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise InferenceQueueFull()
+
+        with self._pending_lock:
+            self._pending += 1
+        try:
+            future = self._pool.submit(partial(func, *args))
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the task itself is done, not until the request stops waiting for it,
+        # so cancelled requests do not let more tasks run than the executor admits
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        """
+        Free the slot of a finished task.
+        """
+        with self._pending_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def shutdown(self):
+        """
+        Shut the pool down, waiting for the running tasks to finish.
+        """
+        self._pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,66 @@
+import os
+
+
+def current_rss():
+    """
+    Get the resident set size of the current process.
+
+    Returns:
+        int: The resident memory of the process in bytes.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except FileNotFoundError:
+        # Outside Linux, fall back to the peak resident memory, reported in kilobytes
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def container_memory_limit():
+    """
+    Get the memory available to the container, from its cgroup limit or the physical memory.
+
+    Returns:
+        int: The memory limit in bytes, or None if it cannot be determined.
+    """
+    physical = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else None
+    # cgroup v2, then cgroup v1
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as file:
+                value = file.read().strip()
+        except (FileNotFoundError, PermissionError):
+            continue
+        if value.isdigit():
+            # An unlimited cgroup v1 reports a huge number rather than "max"
+            return min(int(value), physical) if physical else int(value)
+    return physical
+
+
+def recommend_worker_count(memory_limit, model_bytes, worker_bytes, max_workers, preload=True, headroom=0.1):
+    """
+    Recommend a number of web workers fitting in the memory limit.
+
+    With preloading, the models are loaded once in the master process and shared by the workers, so only
+    the private memory of each worker scales with their number. Without it, every worker holds its own copy.
+
+    Args:
+        memory_limit (int): The memory available to the workers in bytes.
+        model_bytes (int): The memory of the loaded models, catalog and indexes in bytes.
+        worker_bytes (int): The private memory of a worker in bytes: caches, activations and request buffers.
+        max_workers (int): The highest number of workers to recommend, usually derived from the number of cores.
+        preload (bool): Whether the models are preloaded and shared by the workers.
+        headroom (float): The fraction of the memory limit kept free.
+
+    Returns:
+        int: The recommended number of workers, at least 1.
+    """
+    budget = memory_limit * (1 - headroom)
+    if preload:
+        budget -= model_bytes
+        per_worker = worker_bytes
+    else:
+        per_worker = model_bytes + worker_bytes
+    return max(1, min(max_workers, int(budget // max(per_worker, 1))))
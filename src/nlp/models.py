@@ -2,8 +2,20 @@ import spacy
 from bertopic import BERTopic
 from transformers import AutoModel, AutoTokenizer
 
+EMBEDDINGS_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
-async def load_embeddings_model():
+
+def load_embeddings_tokenizer():
+    """
+    Loads the tokenizer of the embeddings model.
+
+    Returns:
+      tokenizer (AutoTokenizer): The tokenizer for the embeddings model.
+    """
+    return AutoTokenizer.from_pretrained(EMBEDDINGS_MODEL_NAME)
+
+
+def load_embeddings_model():
     """
     Loads the embeddings model for sentence transformation.
 
@@ -11,12 +23,12 @@ async def load_embeddings_model():
       tokenizer (AutoTokenizer): The tokenizer for the embeddings model.
       model (AutoModel): The embeddings model.
     """
-    tokenizer = AutoTokenizer.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
-    model = AutoModel.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
+    tokenizer = load_embeddings_tokenizer()
+    model = AutoModel.from_pretrained(EMBEDDINGS_MODEL_NAME)
     return tokenizer, model
 
 
-async def load_bertopic_model(model_object_name):
+def load_bertopic_model(model_object_name):
     """
     Load a BERTopic model from a given object name.
 
@@ -0,0 +1,554 @@
+import asyncio
+import gc
+import hashlib
+import time
+
+from src.nlp.backends import embedding_model_id, load_embedding_backend
+from src.nlp.cache import LRUCache
+from src.nlp.config import nlp_config
+from src.nlp.constants import EmbeddingBackendKind, ExecutorKind, TopicClassifierMode
+from src.nlp.embeddings import EmbeddingService, tensor_nbytes
+from src.nlp.executor import InferenceExecutor
+from src.nlp.memory import current_rss
+from src.nlp.models import EMBEDDINGS_MODEL_NAME, load_bertopic_model, load_spacy_model
+from src.nlp.readiness import LoadTracker
+from src.nlp.result_cache import ResultCache, result_nbytes
+from src.nlp.services.blueprint_catalog import load_blueprint_catalog
+from src.nlp.services.entity_catalog import load_entity_catalog, reload_entity_catalog_if_stale
+from src.nlp.services.entity_extraction import extract_tech_entities_batch
+from src.nlp.services.recommendation_generation import dynamic_score_entities, recommend_technologies
+from src.nlp.services.topic_centroids import build_topic_centroids
+from src.nlp.services.topic_classification import classify_embeddings, classify_texts
+from src.nlp.services.topic_index import load_topic_index
+from src.nlp.services.topic_registry import build_topic_registry
+from src.nlp.topic_artifact import ServingTopicModel, load_topic_artifact
+
+# The components loaded by NlpPipeline.load, in the order they are reported
+PIPELINE_COMPONENTS = ("spacy", "bertopic", "embeddings", "entity_catalog", "topic_index", "blueprint_catalog")
+
+
+def load_topic_model(model_name, artifact_dir=None):
+    """
+    Load the topic model and the registry of its topics.
+
+    Args:
+        model_name (str): The name of the BERTopic model to load.
+        artifact_dir (str): Optional directory of the memory-mapped artifact exported from the model, loaded instead of it.
+
+    Returns:
+        tuple: The BERTopic model, or its ServingTopicModel, and its TopicRegistry.
+    """
+    bertopic_model = load_topic_artifact(artifact_dir) if artifact_dir else load_bertopic_model(model_name)
+    return bertopic_model, build_topic_registry(bertopic_model)
+
+
+# The components loaded by preload_components, before the web workers are forked
+_preloaded_components = {}
+
+
+def load_component(name, func, *args):
+    """
+    Get a component preloaded in this process, or load it.
+
+    Args:
+        name (str): The name of the component.
+        func (callable): The function loading the component if it was not preloaded.
+
+    Returns:
+        The component.
+    """
+    component = _preloaded_components.get(name)
+    return component if component is not None else func(*args)
+
+
+def preload_components(config=nlp_config):
+    """
+    Load the models, entity catalog and topic index in the gunicorn master, before the workers are forked.
+
+    The workers inherit the loaded components and share their memory pages copy-on-write, instead of each
+    loading its own copy. PyTorch stays single-threaded here so no OpenMP thread pool exists at fork time,
+    and the loaded objects are frozen out of the garbage collector, whose collections in the workers would
+    otherwise write to their pages and unshare them.
+
+    ONNX Runtime sessions do not survive a fork, so with an ONNX embeddings backend only the spaCy and
+    BERTopic models are preloaded, and the workers load the rest.
+
+    Args:
+        config (NlpConfig): The settings of the pipeline.
+
+    Returns:
+        dict: The load time in seconds and the resident memory in bytes of each preloaded component.
+    """
+    import torch
+
+    torch.set_num_threads(1)
+    report = {}
+
+    def preload(name, func, *args):
+        start, rss = time.perf_counter(), current_rss()
+        component = _preloaded_components[name] = func(*args)
+        report[name] = {"seconds": round(time.perf_counter() - start, 3), "bytes": max(current_rss() - rss, 0)}
+        print(f"Preloaded {name} in {report[name]['seconds']:.1f}s, {report[name]['bytes'] / 2**20:.0f} MB.")
+        return component
+
+    nlp = preload("spacy", load_spacy_model)
+    _, topic_registry = preload("bertopic", load_topic_model, config.MODEL_NAME, config.TOPIC_MODEL_ARTIFACT_DIR)
+    if EmbeddingBackendKind(config.EMBEDDING_BACKEND) == EmbeddingBackendKind.TORCH:
+        embedding_backend = preload("embeddings", load_embedding_backend, config.EMBEDDING_BACKEND)
+
+        def embed(texts):
+            return embedding_backend.encode(texts, config.EMBEDDING_BATCH_SIZE)
+
+        model_id = embedding_model_id(embedding_backend.kind)
+        preload("entity_catalog", load_entity_catalog, nlp, embed, model_id, config.CORPUS_DIR, config.ENTITY_INDEX_PATH)
+        preload("topic_index", load_topic_index, topic_registry, embed, model_id, config.TOPIC_INDEX_PATH)
+
+    gc.collect()
+    gc.freeze()
+    return report
+
+
+def build_text_to_classify(text, extracted_entities):
+    """
+    Build the text passed to the topic model, made of the text and the categories of its entities.
+
+    Args:
+        text (str): The input text.
+        extracted_entities (list): The entities extracted from the text.
+
+    Returns:
+        str: The text followed by the comma-separated categories of the extracted entities.
+    """
+    entity_string = ", ".join(entity["category"] for entity in extracted_entities)
+    return text + ". " + entity_string
+
+
+async def cancel_tasks(tasks):
+    """
+    Cancel the tasks that are not done, and wait for all of them to finish.
+
+    Args:
+        tasks (list): The tasks to cancel.
+    """
+    for task in tasks:
+        task.cancel()
+    # Retrieve the exceptions of the tasks, so they are not reported as never retrieved
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class NlpPipeline:
+    """
+    Owns the models, entity catalog, indexes and caches used to process texts, and runs the
+    extraction, classification, scoring and recommendation stages over them.
+
+    A pipeline is loaded once and passed explicitly to the routes, job workers and command-line
+    runner, so several pipelines can live in the same process.
+    """
+
+    def __init__(
+        self,
+        nlp,
+        bertopic_model,
+        topic_registry,
+        embedding_backend,
+        embedding_service,
+        entity_catalog,
+        topic_index,
+        result_cache=None,
+        config=nlp_config,
+        topic_centroids=None,
+        blueprint_catalog=None,
+    ):
+        """
+        Initializes the NlpPipeline object.
+
+        Args:
+            nlp (spacy.Language): The spaCy model the entity matcher runs on.
+            bertopic_model (BERTopic | ServingTopicModel): The topic model used for classification.
+            topic_registry (TopicRegistry): The registry of the topics of the topic model.
+            embedding_backend (TorchEmbeddingBackend | OnnxEmbeddingBackend): The runtime of the embeddings model.
+            embedding_service (EmbeddingService): The service batching the embedding requests.
+            entity_catalog (EntityCatalog): The technology entities, their matcher and embedding index.
+            topic_index (TopicKeywordIndex): The precomputed topic keyword embeddings.
+            result_cache (ResultCache): Optional cache of the results of the texts.
+            config (NlpConfig): The settings the pipeline was loaded with.
+            topic_centroids (TopicCentroids): The topic centroid embeddings, to classify texts by their nearest centroid instead of with the topic model.
+            blueprint_catalog (BlueprintCatalog): The blueprints corpus and its index, to match the recommendations with.
+        """
+        self.nlp = nlp
+        self.bertopic_model = bertopic_model
+        self.topic_registry = topic_registry
+        self.embedding_backend = embedding_backend
+        self.embedding_service = embedding_service
+        self.entity_catalog = entity_catalog
+        self.topic_index = topic_index
+        self.result_cache = result_cache
+        self.config = config
+        self.topic_centroids = topic_centroids
+        self.blueprint_catalog = blueprint_catalog
+        self.entity_catalog_lock = asyncio.Lock()
+        self.blueprint_catalog_lock = asyncio.Lock()
+        self.inference_executor = None
+
+    @classmethod
+    async def load(cls, config=nlp_config, tracker=None):
+        """
+        Load the models, catalog, indexes and caches of a pipeline.
+
+        The spaCy, BERTopic and embeddings models and the blueprint catalog are loaded concurrently in background
+        threads, then the entity catalog and topic keyword index are built as soon as the models they depend on
+        are ready.
+        Components preloaded by `preload_components` are reused instead of loaded again.
+
+        Args:
+            config (NlpConfig): The settings of the pipeline.
+            tracker (LoadTracker): Optional tracker recording the load state and time of each component.
+
+        Returns:
+            NlpPipeline: The loaded pipeline.
+        """
+        tracker = tracker or LoadTracker(PIPELINE_COMPONENTS)
+        nlp_task = asyncio.ensure_future(tracker.run("spacy", load_component, "spacy", load_spacy_model))
+        blueprint_catalog_task = asyncio.ensure_future(tracker.run("blueprint_catalog", load_blueprint_catalog, config.BLUEPRINTS_DIR))
+        topic_model_task = asyncio.ensure_future(
+            tracker.run("bertopic", load_component, "bertopic", load_topic_model, config.MODEL_NAME, config.TOPIC_MODEL_ARTIFACT_DIR)
+        )
+        tasks = [nlp_task, blueprint_catalog_task, topic_model_task]
+        try:
+            embedding_backend = await tracker.run(
+                "embeddings", load_component, "embeddings", load_embedding_backend, config.EMBEDDING_BACKEND, config.ONNX_MODEL_DIR
+            )
+        except BaseException:
+            await cancel_tasks(tasks)
+            raise
+        embedding_service = EmbeddingService(
+            embedding_backend,
+            max_batch_size=config.EMBEDDING_BATCH_SIZE,
+            max_wait_ms=config.EMBEDDING_MAX_WAIT_MS,
+            cache=LRUCache(config.EMBEDDING_CACHE_MAX_BYTES, config.EMBEDDING_CACHE_TTL, tensor_nbytes) if config.EMBEDDING_CACHE_MAX_BYTES else None,
+        )
+
+        async def load_catalog():
+            nlp = await nlp_task
+            return await tracker.run(
+                "entity_catalog",
+                load_component,
+                "entity_catalog",
+                load_entity_catalog,
+                nlp,
+                embedding_service.encode,
+                embedding_model_id(embedding_backend.kind),
+                config.CORPUS_DIR,
+                config.ENTITY_INDEX_PATH,
+            )
+
+        async def load_topics():
+            bertopic_model, topic_registry = await topic_model_task
+            topic_index = await tracker.run(
+                "topic_index",
+                load_component,
+                "topic_index",
+                load_topic_index,
+                topic_registry,
+                embedding_service.encode,
+                embedding_model_id(embedding_backend.kind),
+                config.TOPIC_INDEX_PATH,
+            )
+            topic_centroids = build_topic_centroids(bertopic_model) if config.TOPIC_CLASSIFIER_MODE == TopicClassifierMode.CENTROID else None
+            return bertopic_model, topic_registry, topic_index, topic_centroids
+
+        catalog_task, topics_task = asyncio.ensure_future(load_catalog()), asyncio.ensure_future(load_topics())
+        tasks += [catalog_task, topics_task]
+        try:
+            entity_catalog, (bertopic_model, topic_registry, topic_index, topic_centroids), blueprint_catalog = await asyncio.gather(
+                catalog_task, topics_task, blueprint_catalog_task
+            )
+        except BaseException:
+            # Stop the other components, and wait for the ones encoding through the embedding service before closing it
+            await cancel_tasks(tasks)
+            embedding_service.close()
+            raise
+
+        result_cache = (
+            ResultCache(
+                LRUCache(config.RESULT_CACHE_MAX_BYTES, config.RESULT_CACHE_TTL, result_nbytes),
+                use_database=config.RESULT_CACHE_DATABASE,
+                ttl=config.RESULT_CACHE_TTL,
+            )
+            if config.RESULT_CACHE_MAX_BYTES
+            else None
+        )
+        nlp = await nlp_task
+        return cls(
+            nlp,
+            bertopic_model,
+            topic_registry,
+            embedding_backend,
+            embedding_service,
+            entity_catalog,
+            topic_index,
+            result_cache,
+            config,
+            topic_centroids,
+            blueprint_catalog,
+        )
+
+    def embed(self, texts):
+        """
+        Get the embedding representations of a list of texts.
+
+        The texts are encoded by the embedding service, which batches them together with the texts of
+        concurrent requests.
+
+        Args:
+            texts (list): The input texts to be embedded.
+
+        Returns:
+            torch.Tensor: A matrix with one normalized embedding per row, in the same order as the texts.
+        """
+        return self.embedding_service.encode(texts)
+
+    @property
+    def embedding_model_id(self):
+        """
+        The embeddings model and the runtime it runs on, which the entity and topic indexes are built with.
+        """
+        return embedding_model_id(self.embedding_backend.kind)
+
+    def fingerprint(self):
+        """
+        Compute a fingerprint of everything the result of a text depends on: the topic model, the way texts
+        are classified, its topics, the embeddings model and its runtime, and the entity catalog.
+
+        Returns:
+            str: A SHA-256 hex digest identifying the loaded models and catalog.
+        """
+        topic_model_version = self.bertopic_model.version if isinstance(self.bertopic_model, ServingTopicModel) else self.config.MODEL_NAME
+        parts = [
+            topic_model_version,
+            self.classifier_mode.value,
+            str(self.config.TOPIC_REUSE_INPUT_EMBEDDING),
+            self.topic_index.fingerprint,
+            EMBEDDINGS_MODEL_NAME,
+            self.embedding_backend.kind.value,
+            self.entity_catalog.version,
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    @property
+    def classifier_mode(self):
+        """
+        How the pipeline classifies texts into topics, by nearest centroid when the centroids are loaded.
+        """
+        return TopicClassifierMode.CENTROID if self.topic_centroids is not None else TopicClassifierMode.TRANSFORM
+
+    def classify_topics(self, texts, extracted_entities_batch, input_embeddings, mode=None, reuse_input_embeddings=None):
+        """
+        Classify a batch of texts into topics.
+
+        In transform mode, the topic model classifies each text followed by the categories of its entities.
+        By default, the topic model is given the input embeddings computed for scoring rather than embedding
+        the texts a second time. The embedding then no longer includes the entity categories, so the topic of
+        a text can differ from the one of its categories-suffixed embedding; the agreement between both is
+        measured by scripts/topic_agreement_report.py. The scores are not affected.
+
+        In centroid mode, each text gets the topic with the nearest centroid to its input embedding, which
+        skips the topic model and reuses the embedding computed for scoring.
+
+        Args:
+            texts (list): The input texts.
+            extracted_entities_batch (list): The entities extracted from each text.
+            input_embeddings (torch.Tensor): A matrix with the normalized embedding of each text.
+            mode (TopicClassifierMode): The classification mode, defaults to the mode of the pipeline.
+            reuse_input_embeddings (bool): Whether the transform mode reuses the input embeddings, defaults to the TOPIC_REUSE_INPUT_EMBEDDING setting.
+
+        Returns:
+            list: A list with a tuple of the predicted topic ID, topic name and keywords for each text, in the same order as the texts.
+        """
+        if (mode or self.classifier_mode) == TopicClassifierMode.CENTROID:
+            return classify_embeddings(input_embeddings, self.topic_centroids, self.topic_registry)
+
+        texts_to_classify = [build_text_to_classify(text, extracted_entities) for text, extracted_entities in zip(texts, extracted_entities_batch)]
+        if reuse_input_embeddings is None:
+            reuse_input_embeddings = self.config.TOPIC_REUSE_INPUT_EMBEDDING
+        if reuse_input_embeddings:
+            # The topic model was fitted with the same embeddings model the input embeddings are computed with
+            embeddings = input_embeddings.numpy()
+        elif isinstance(self.bertopic_model, ServingTopicModel):
+            # The topic model artifact keeps no embeddings model, the texts are embedded with the shared one
+            embeddings = self.embed(texts_to_classify).numpy()
+        else:
+            embeddings = None
+        return classify_texts(texts_to_classify, self.bertopic_model, self.topic_registry, embeddings)
+
+    def run(self, texts):
+        """
+        Run entity extraction, topic classification, scoring and recommendation over a batch of texts.
+
+        Each stage processes all the texts at once: spaCy pipes the texts, the topic model transforms
+        them in a single call and the input embeddings are computed with padded batches. The results
+        are then fanned back out per text.
+
+        Args:
+            texts (list): The input texts to process.
+
+        Returns:
+            list: A list of dictionaries with the input text, predicted topic name, extracted entities and
+            recommendations of each text, in the same order as the texts.
+        """
+        if not texts:
+            return []
+
+        # Use the same catalog for the whole batch, even if it is reloaded meanwhile
+        catalog = self.entity_catalog
+        tech_entities = catalog.tech_entities
+
+        # Extract the technology entities from all the texts
+        extracted_entities_batch = extract_tech_entities_batch(texts, tech_entities, catalog.matcher, self.nlp)
+
+        # Embed all the input texts at once
+        input_embeddings = self.embed(texts)
+
+        # Classify all the texts into topics
+        topics = self.classify_topics(texts, extracted_entities_batch, input_embeddings)
+
+        results = []
+        for text, extracted_entities, (topic_id, topic_name, topic_keywords), input_embedding in zip(texts, extracted_entities_batch, topics, input_embeddings):
+            # Look up the precomputed mean embedding of the topic keywords
+            topic_embedding = self.topic_index.get_mean_embedding(topic_id)
+            # Score the entities based on their relevance to the text and topic keywords
+            sorted_entities = dynamic_score_entities(
+                extracted_entities, topic_keywords, text, tech_entities, self.embed, catalog.entity_index, topic_embedding, input_embedding
+            )
+            recommendations = recommend_technologies(sorted_entities)
+
+            results.append({"input_text": text, "predicted_topic_name": topic_name, "extracted_entities": sorted_entities, "recommendations": recommendations})
+
+        return results
+
+    def start_inference_executor(self, kind=ExecutorKind.THREAD, max_workers=2, max_queue_size=16):
+        """
+        Start the pool the pipeline runs on, off the event loop.
+
+        Thread workers share the models of the pipeline, process workers load their own copy.
+
+        Args:
+            kind (ExecutorKind): Whether the pipeline runs on a thread pool or a process pool.
+            max_workers (int): The number of workers of the pool.
+            max_queue_size (int): The number of batches that may wait for a free worker.
+        """
+        use_processes = ExecutorKind(kind) == ExecutorKind.PROCESS
+        self.inference_executor = InferenceExecutor(
+            kind=kind,
+            max_workers=max_workers,
+            max_queue_size=max_queue_size,
+            initializer=init_inference_worker if use_processes else None,
+            initargs=(self.config,) if use_processes else (),
+        )
+
+    async def process(self, texts):
+        """
+        Process texts on the inference executor, serving the texts already processed from the result cache.
+
+        Args:
+            texts (list): The input texts to process.
+
+        Returns:
+            list: The results of `run`, in the same order as the texts.
+
+        Raises:
+            InferenceQueueFull: If the inference executor is saturated.
+        """
+        if self.inference_executor.kind == ExecutorKind.PROCESS:
+            run = process_texts_in_worker
+        else:
+            run = self.run
+
+        if self.result_cache is None:
+            return await self.inference_executor.run(run, texts)
+
+        fingerprint = self.fingerprint()
+        results = await self.result_cache.get_many(texts, fingerprint)
+
+        # Process each distinct text missing from the cache once
+        missing = [text for text in dict.fromkeys(texts) if text not in results]
+        if missing:
+            processed = dict(zip(missing, await self.inference_executor.run(run, missing)))
+            await self.result_cache.set_many(processed, fingerprint)
+            results.update(processed)
+
+        return [results[text] for text in texts]
+
+    async def stream(self, texts, chunk_size):
+        """
+        Process texts chunk by chunk, yielding the result of each text as soon as its chunk is done.
+
+        The next chunk is processed while the results of the current one are consumed, so at most two
+        chunks of results are held in memory whatever the number of texts.
+
+        Args:
+            texts (list): The input texts to process.
+            chunk_size (int): The number of texts processed together on the inference executor.
+
+        Yields:
+            tuple: The position of the text in the input, and its result from `run`, in input order.
+        """
+        chunks = [texts[start : start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        if not chunks:
+            return
+
+        next_chunk = asyncio.ensure_future(self.process(chunks[0]))
+        index = 0
+        try:
+            for position in range(len(chunks)):
+                results = await next_chunk
+                next_chunk = asyncio.ensure_future(self.process(chunks[position + 1])) if position + 1 < len(chunks) else None
+                for result in results:
+                    yield index, result
+                    index += 1
+        finally:
+            # Stop processing ahead if the client disconnected or a chunk failed
+            if next_chunk is not None:
+                next_chunk.cancel()
+
+    def close(self):
+        """
+        Stop the inference executor and the embedding service.
+        """
+        if self.inference_executor is not None:
+            self.inference_executor.shutdown()
+            self.inference_executor = None
+        self.embedding_service.close()
+
+
+# The pipeline of the current inference worker process, loaded by init_inference_worker
+_worker_pipeline = None
+
+
+def init_inference_worker(config=nlp_config):
+    """
+    Load a pipeline in an inference worker process.
+
+    Args:
+        config (NlpConfig): The settings of the pipeline of the application, so the workers load the same models and files.
+    """
+    global _worker_pipeline
+
+    _worker_pipeline = asyncio.run(NlpPipeline.load(config))
+
+
+def process_texts_in_worker(texts):
+    """
+    Run the pipeline of the current inference worker process over a batch of texts.
+
+    The worker reloads its catalog when the catalog file changes, since the reloads of the application
+    only swap the catalog of its own pipeline.
+
+    Args:
+        texts (list): The input texts to process.
+
+    Returns:
+        list: The results of `NlpPipeline.run`.
+    """
+    reload_entity_catalog_if_stale(_worker_pipeline)
+    return _worker_pipeline.run(texts)
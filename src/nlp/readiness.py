@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.nlp.constants import LoadStatus
+
+
+class LoadTracker:
+    """
+    Tracks the load state and timings of the components of the NLP pipeline, to report readiness.
+    """
+
+    def __init__(self, components=()):
+        """
+        Initializes the LoadTracker object.
+
+        Args:
+            components (iterable): The names of the components expected to load, reported as pending until they start.
+        """
+        self._lock = threading.Lock()
+        self.components = {name: {"status": LoadStatus.PENDING, "started_at": None, "seconds": None, "error": None} for name in components}
+
+    @property
+    def ready(self):
+        """
+        Whether every tracked component is loaded.
+        """
+        with self._lock:
+            return bool(self.components) and all(component["status"] == LoadStatus.READY for component in self.components.values())
+
+    @property
+    def failed(self):
+        """
+        Whether a tracked component failed to load.
+        """
+        with self._lock:
+            return any(component["status"] == LoadStatus.FAILED for component in self.components.values())
+
+    async def run(self, name, func, *args):
+        """
+        Load a component in a background thread, recording its state and load time.
+
+        If the load is cancelled, the thread is waited for before the cancellation is propagated.
+
+        Args:
+            name (str): The name of the component.
+            func (callable): The blocking function loading the component.
+
+        Returns:
+            The loaded component.
+        """
+        with self._lock:
+            self.components[name] = {"status": LoadStatus.LOADING, "started_at": datetime.now(timezone.utc), "seconds": None, "error": None}
+        start = time.perf_counter()
+        thread = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        try:
+            result = await asyncio.shield(thread)
+        except asyncio.CancelledError:
+            # A running thread cannot be interrupted, wait for it so the resources it uses are not released under it
+            await asyncio.wait([thread])
+            self._finish(name, LoadStatus.FAILED, time.perf_counter() - start, "Cancelled.")
+            raise
+        except Exception as e:
+            self._finish(name, LoadStatus.FAILED, time.perf_counter() - start, str(e))
+            raise
+        seconds = time.perf_counter() - start
+        self._finish(name, LoadStatus.READY, seconds)
+        print(f"Loaded {name} in {seconds:.1f}s.")
+        return result
+
+    def _finish(self, name, status, seconds, error=None):
+        """
+        Record the end of the load of a component.
+
+        Args:
+            name (str): The name of the component.
+            status (LoadStatus): The final state of the component.
+            seconds (float): The load time of the component.
+            error (str): The error message if the component failed to load.
+        """
+        with self._lock:
+            self.components[name].update(status=status, seconds=round(seconds, 3), error=error)
+
+    def report(self):
+        """
+        Get the load state of every component.
+
+        Returns:
+            dict: A dictionary mapping the name of each component to its status, start time, load time in seconds and error.
+        """
+        with self._lock:
+            return {name: dict(component) for name, component in self.components.items()}
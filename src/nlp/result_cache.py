@@ -0,0 +1,145 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from pymongo.errors import BulkWriteError
+
+from src.database import Database
+
+
+def result_cache_key(text, fingerprint):
+    """
+    Compute the cache key of the result of a text.
+
+    The text is hashed as is, without normalization, since whitespace can change the entities spaCy extracts.
+
+    Args:
+        text (str): The input text.
+        fingerprint (str): The fingerprint of the models and catalog that produce the result.
+
+    Returns:
+        str: The SHA-256 hex digest of the fingerprint and the text.
+    """
+    return hashlib.sha256(f"{fingerprint}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+def result_nbytes(result):
+    """
+    Approximate the size in bytes of a result by the length of its JSON encoding.
+
+    Args:
+        result (dict): The result of a text.
+
+    Returns:
+        int: The length of the JSON encoding of the result.
+    """
+    return len(json.dumps(result))
+
+
+class ResultCache:
+    """
+    Caches the result of the pipeline for each text, in memory and optionally in MongoDB.
+
+    Keys include the fingerprint of the models and catalog, so results computed by a previous
+    version are never served: the in-memory tier is cleared as soon as a new fingerprint is seen,
+    and stale MongoDB documents expire through a TTL index.
+    """
+
+    COLLECTION = "nlp_results"
+
+    def __init__(self, memory, use_database=False, ttl=None):
+        """
+        Initializes the ResultCache object.
+
+        Args:
+            memory (LRUCache): The in-memory tier of the cache.
+            use_database (bool): Whether results are also stored in MongoDB, shared between the workers.
+            ttl (float): Optional number of seconds after which a MongoDB document expires.
+        """
+        self.memory = memory
+        self.use_database = use_database
+        self.ttl = ttl
+        self.fingerprint = None
+
+    @property
+    def collection(self):
+        """
+        The MongoDB collection of the cached results, or None if the database tier is disabled or unavailable.
+        """
+        if not self.use_database or Database.db is None:
+            return None
+        return Database.db[self.COLLECTION]
+
+    async def create_indexes(self):
+        """
+        Create the TTL index that expires the MongoDB documents.
+        """
+        if self.collection is not None and self.ttl:
+            await self.collection.create_index("created_at", expireAfterSeconds=int(self.ttl))
+
+    def _check_fingerprint(self, fingerprint):
+        """
+        Clear the in-memory tier when the models or catalog changed.
+
+        Args:
+            fingerprint (str): The current fingerprint of the models and catalog.
+        """
+        if fingerprint != self.fingerprint:
+            self.memory.clear()
+            self.fingerprint = fingerprint
+
+    async def get_many(self, texts, fingerprint):
+        """
+        Get the cached results of texts.
+
+        Args:
+            texts (list): The input texts.
+            fingerprint (str): The current fingerprint of the models and catalog.
+
+        Returns:
+            dict: A dictionary mapping the texts found in the cache to their result.
+        """
+        self._check_fingerprint(fingerprint)
+
+        results = {}
+        missing = {}
+        for text in dict.fromkeys(texts):
+            key = result_cache_key(text, fingerprint)
+            result = self.memory.get(key)
+            if result is None:
+                missing[key] = text
+            else:
+                results[text] = result
+
+        # Look the texts missing from memory up in the database, and keep them in memory
+        if missing and self.collection is not None:
+            async for document in self.collection.find({"_id": {"$in": list(missing)}}):
+                self.memory.set(document["_id"], document["result"])
+                results[missing[document["_id"]]] = document["result"]
+
+        return results
+
+    async def set_many(self, results, fingerprint):
+        """
+        Cache the results of texts.
+
+        Args:
+            results (dict): A dictionary mapping the input texts to their result.
+            fingerprint (str): The fingerprint of the models and catalog that produced the results.
+        """
+        # Results computed before the models or catalog changed are not kept in memory
+        keep_in_memory = fingerprint == self.fingerprint
+
+        documents = []
+        for text, result in results.items():
+            key = result_cache_key(text, fingerprint)
+            if keep_in_memory:
+                self.memory.set(key, result)
+            documents.append({"_id": key, "fingerprint": fingerprint, "result": result, "created_at": datetime.now(timezone.utc)})
+
+        if documents and self.collection is not None:
+            try:
+                await self.collection.insert_many(documents, ordered=False)
+            except BulkWriteError:
+                # Other workers may have cached the same texts concurrently, duplicates are ignored
+                pass
@@ -1,35 +1,30 @@
-from typing import List
+import json
+from typing import Dict, List
 
-from fastapi import APIRouter, Depends, FastAPI
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 
-from src.auth.jwt import parse_jwt_user_data
+from src.auth.jwt import parse_jwt_admin_data, parse_jwt_user_data
 from src.auth.schemas import JWTData
-from src.nlp.schemas import BlueprintMatch, InputText, Recommendation
-from src.nlp.services.blueprint_matching import load_blueprints_corpus, match_blueprints
-from src.nlp.services.entity_extraction import (
-    extract_tech_entities,
-    initialize_matcher_with_patterns,
-    load_tech_entities,
-)
-from src.nlp.services.recommendation_generation import dynamic_score_entities, recommend_technologies
-from src.nlp.services.topic_classification import classify_text
+from src.exceptions import DetailedHTTPException
+from src.nlp.config import nlp_config
+from src.nlp.dependencies import get_nlp_pipeline
+from src.nlp.exceptions import BlueprintCatalogNotFound, InvalidBlueprintCatalog, InvalidEntityCatalog
+from src.nlp.pipeline import NlpPipeline
+from src.nlp.schemas import BlueprintCatalogInfo, BlueprintMatch, CacheStats, CatalogInfo, InputText, ProcessedMatch, Recommendation
+from src.nlp.services.blueprint_catalog import reload_blueprint_catalog
+from src.nlp.services.blueprint_matching import rank_blueprints_batch, recommendation_weights
+from src.nlp.services.entity_catalog import reload_entity_catalog
 
 router = APIRouter()
 
 
-# Function to access the global FastAPI application instance
-def get_application() -> FastAPI:
-    from src.main import app
-
-    return app
-
-
 # Define a route to process input texts and return recommendations
 @router.post("/process/", response_model=List[Recommendation])
-async def process_texts(
+async def process_texts_endpoint(
     input_text: InputText,
     jwt_data: JWTData = Depends(parse_jwt_user_data),
-    app: FastAPI = Depends(get_application),
+    pipeline: NlpPipeline = Depends(get_nlp_pipeline),
 ):
     """
     Process a list of input texts and generate recommendations based on extracted entities and topic classification.
@@ -41,67 +36,233 @@ async def process_texts(
     Parameters:
     - input_text : The input texts to process.
     - jwt_data: JWT data of the authenticated user.
-    - app: The FastAPI application instance.
+    - pipeline: The NLP pipeline of the application.
 
     Returns:
     - A list of Recommendation objects containing the processed results for each input text.
     Each Recommendation object includes the input text, predicted topic name, extracted entities, and generated recommendations.
+
+    Raises:
+    - InferenceQueueFull: If the inference executor is saturated (503).
     """
 
-    tech_entities = await load_tech_entities()  # Load technology entities from a JSON file
+    # Process all the input texts as a single batch on the inference executor, off the event loop,
+    # skipping the texts whose results are cached
+    return await pipeline.process(input_text.texts)
 
-    matcher = initialize_matcher_with_patterns(tech_entities)  # Initialize a spaCy Matcher object with patterns for tech entities
 
-    # Access the preloaded BERTopic model from the app state
-    topic_model = app.state.bertopic_model
+# Define a route to process input texts and stream the recommendations as they are ready
+@router.post("/process/stream/", response_class=StreamingResponse)
+async def process_texts_stream_endpoint(
+    input_text: InputText,
+    jwt_data: JWTData = Depends(parse_jwt_user_data),
+    pipeline: NlpPipeline = Depends(get_nlp_pipeline),
+):
+    """
+    Process a list of input texts and stream their recommendations as newline-delimited JSON.
 
-    topic_info = topic_model.get_topic_info()  # Get information about the topics in the BERTopic model
-    topic_name_mapping = dict(zip(topic_info["Topic"], topic_info["Name"]))  # Create a mapping of topic IDs to topic names
-    results = []  # Initialize an empty list to store the results
+    The texts are processed in chunks, and each line is written as soon as the chunk of its text is done,
+    so the memory held by the request stays flat however many texts are sent. Lines are written in input
+    order, each one is a Recommendation object with the `index` of its text in the input.
 
-    # Iterate over each input text
-    for text in input_text.texts:
-        extracted_entities = extract_tech_entities(text, tech_entities, matcher)  # Extract technology entities from the text
-        entity_names = [entity["category"] for entity in extracted_entities]  # Get the names of the extracted entities
-        entity_string = ", ".join(entity_names)  # Create a string representation of the extracted entities
-        text_to_classify = text + ". " + entity_string  # Concatenate the text and the entity string
-        topic_name, topic_keywords = classify_text(text_to_classify, topic_model, topic_name_mapping)  # Classify the text into a topic using the BERTopic model
-        sorted_entities = dynamic_score_entities(
-            extracted_entities, topic_keywords, text, tech_entities
-        )  # Score the entities based on their relevance to the text and topic keywords
-        # After generating recommendations
-        recommendations = recommend_technologies(sorted_entities)
+    If processing fails after the response started, a last line with the `index` of the first missing text
+    and an `error` message is written instead.
 
-        # Append the processed results to the list
-        results.append({"input_text": text, "predicted_topic_name": topic_name, "extracted_entities": sorted_entities, "recommendations": recommendations})
+    Parameters:
+    - input_text : The input texts to process.
+    - jwt_data: JWT data of the authenticated user.
+    - pipeline: The NLP pipeline of the application.
+
+    Returns:
+    - A stream of JSON lines, one Recommendation object with its index per input text.
+
+    Raises:
+    - InferenceQueueFull: If the inference executor is saturated when the first chunk is submitted (503).
+    """
 
-    # After processing all input texts
-    return results
+    results = pipeline.stream(input_text.texts, nlp_config.STREAM_CHUNK_SIZE)
+
+    # Wait for the first chunk before the response starts, so its errors are reported with their status code
+    first = await anext(results, None)
+
+    async def generate_lines():
+        if first is None:
+            return
+        index, result = first
+        yield json.dumps({"index": index, **result}) + "\n"
+        try:
+            async for index, result in results:
+                yield json.dumps({"index": index, **result}) + "\n"
+        except DetailedHTTPException as e:
+            yield json.dumps({"index": index + 1, "error": e.detail}) + "\n"
+        except Exception as e:
+            # The response already started with a 200, so any other failure is also reported as the last line
+            print(f"Failed to stream the recommendations from text {index + 1}: {e!r}")
+            yield json.dumps({"index": index + 1, "error": DetailedHTTPException.DETAIL}) + "\n"
+        finally:
+            await results.aclose()
+
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson")
 
 
 # Define a route to match recommendations with blueprints
 @router.post("/match-blueprints/", response_model=List[BlueprintMatch])
-async def match_blueprint_endpoint(recommendations: List[Recommendation], jwt_data: JWTData = Depends(parse_jwt_user_data)):
+async def match_blueprint_endpoint(
+    recommendations: List[Recommendation],
+    top_k: int = Query(1, ge=1, le=20, description="Number of blueprints returned per category, by descending score."),
+    jwt_data: JWTData = Depends(parse_jwt_user_data),
+    pipeline: NlpPipeline = Depends(get_nlp_pipeline),
+):
     """
     Match the provided recommendations with blueprints in the blueprints corpus.
 
     This endpoint takes a list of recommendations and matches them with relevant blueprints from the blueprints corpus.
     It returns a list of BlueprintMatch objects containing the matched blueprints for each recommendation.
 
+    The blueprints are ranked by their tags matching the recommended and extracted technologies, weighted by the
+    entity scores and by the rarity of the tags across the corpus, and the top k of each category are returned.
+
     Parameters:
     - A list of Recommendation objects to match with blueprints.
+    - top_k: The number of blueprints returned per category.
     - jwt_data: JWT data of the authenticated user.
+    - pipeline: The NLP pipeline of the application, holding the blueprint catalog.
 
     Returns:
     - A list of BlueprintMatch objects containing the matched blueprints for each recommendation.
     """
 
-    blueprints_corpus = await load_blueprints_corpus()
-    all_matched_blueprints = []
+    # The blueprint catalog is loaded and indexed once, and swapped when its file changes
+    blueprint_index = pipeline.blueprint_catalog.index
 
-    for recommendation in recommendations:
-        matched_blueprints = match_blueprints([recommendation.model_dump()], blueprints_corpus)
-        if matched_blueprints:
-            all_matched_blueprints.extend(matched_blueprints)
+    # Rank the blueprints for the weighted technologies of every text in a single pass
+    weight_sets = [recommendation_weights(recommendation.recommendations, recommendation.extracted_entities) for recommendation in recommendations]
+    matches = rank_blueprints_batch(weight_sets, blueprint_index, top_k)
+    all_matched_blueprints = [blueprint for matched_blueprints in matches for blueprint in matched_blueprints]
 
     return [BlueprintMatch(matched_blueprints=all_matched_blueprints)]
+
+
+# Define a route to process input texts and match their recommendations with blueprints in a single request
+@router.post("/process-and-match/", response_model=List[ProcessedMatch])
+async def process_and_match_endpoint(
+    input_text: InputText,
+    top_k: int = Query(1, ge=1, le=20, description="Number of blueprints returned per category, by descending score."),
+    jwt_data: JWTData = Depends(parse_jwt_user_data),
+    pipeline: NlpPipeline = Depends(get_nlp_pipeline),
+):
+    """
+    Process a list of input texts, and match the recommendations of each text with the blueprints corpus.
+
+    This endpoint is the same as calling `/nlp/process/` then `/nlp/match-blueprints/` with its response, in a single
+    round-trip: the results of the pipeline are matched as they are, without being serialized and validated again.
+
+    Parameters:
+    - input_text : The input texts to process.
+    - top_k: The number of blueprints returned per category.
+    - jwt_data: JWT data of the authenticated user.
+    - pipeline: The NLP pipeline of the application, holding the blueprint catalog.
+
+    Returns:
+    - A list of ProcessedMatch objects, one per input text, with the recommendation of the text and its matched blueprints.
+
+    Raises:
+    - InferenceQueueFull: If the inference executor is saturated (503).
+    """
+
+    results = await pipeline.process(input_text.texts)
+
+    # Rank the blueprints for the weighted technologies of every text in a single pass
+    weight_sets = [recommendation_weights(result["recommendations"], result["extracted_entities"]) for result in results]
+    matches = rank_blueprints_batch(weight_sets, pipeline.blueprint_catalog.index, top_k)
+
+    # The results may be shared with the result cache, so they are copied rather than updated
+    return [{**result, "matched_blueprints": matched_blueprints} for result, matched_blueprints in zip(results, matches)]
+
+
+# Define a route to reload the entity catalog from disk
+@router.post("/catalog/reload/", response_model=CatalogInfo)
+async def reload_catalog_endpoint(
+    jwt_data: JWTData = Depends(parse_jwt_admin_data),
+    pipeline: NlpPipeline = Depends(get_nlp_pipeline),
+):
+    """
+    Reload the technology entity catalog from disk, without restarting the application.
+
+    The catalog is rebuilt off the event loop and swapped in once ready, requests in flight keep using the previous one.
+    If the file is invalid, the previous catalog is kept.
+
+    Parameters:
+    - jwt_data: JWT data of the authenticated admin user.
+    - pipeline: The NLP pipeline of the application.
+
+    Returns:
+    - A CatalogInfo object describing the reloaded catalog.
+
+    Raises:
+    - InvalidEntityCatalog: If the tech entities file is missing or invalid, the previous catalog is kept (400).
+    """
+
+    try:
+        catalog = await reload_entity_catalog(pipeline)
+    except (OSError, ValueError):
+        raise InvalidEntityCatalog()
+
+    return CatalogInfo(version=catalog.version, entities=len(catalog), loaded_at=catalog.loaded_at)
+
+
+# Define a route to reload the blueprint catalog from disk
+@router.post("/blueprints/reload/", response_model=BlueprintCatalogInfo)
+async def reload_blueprints_endpoint(
+    jwt_data: JWTData = Depends(parse_jwt_admin_data),
+    pipeline: NlpPipeline = Depends(get_nlp_pipeline),
+):
+    """
+    Reload the blueprints corpus from disk, without restarting the application.
+
+    The file is validated and indexed off the event loop, and the catalog is swapped in once ready. If the file is
+    invalid, the previous catalog is kept.
+
+    Parameters:
+    - jwt_data: JWT data of the authenticated admin user.
+    - pipeline: The NLP pipeline of the application.
+
+    Returns:
+    - A BlueprintCatalogInfo object describing the reloaded catalog.
+
+    Raises:
+    - BlueprintCatalogNotFound: If the blueprints file does not exist, the previous catalog is kept (404).
+    - InvalidBlueprintCatalog: If the blueprints file is unreadable or invalid, the previous catalog is kept (400).
+    """
+
+    try:
+        catalog = await reload_blueprint_catalog(pipeline)
+    except FileNotFoundError:
+        raise BlueprintCatalogNotFound()
+    except (OSError, ValueError):
+        raise InvalidBlueprintCatalog()
+
+    return BlueprintCatalogInfo(version=catalog.version, blueprints=len(catalog), loaded_at=catalog.loaded_at)
+
+
+# Define a route to report the cache counters
+@router.get("/cache/stats/", response_model=Dict[str, CacheStats])
+async def cache_stats_endpoint(
+    jwt_data: JWTData = Depends(parse_jwt_admin_data),
+    pipeline: NlpPipeline = Depends(get_nlp_pipeline),
+):
+    """
+    Report the hit, miss and eviction counters of the caches.
+
+    Parameters:
+    - jwt_data: JWT data of the authenticated admin user.
+    - pipeline: The NLP pipeline of the application.
+
+    Returns:
+    - A dictionary mapping the name of each enabled cache to its counters.
+    """
+
+    result_cache = pipeline.result_cache
+    caches = {"embeddings": pipeline.embedding_service.cache, "results": result_cache.memory if result_cache else None}
+
+    return {name: cache.stats() for name, cache in caches.items() if cache is not None}
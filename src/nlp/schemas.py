@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Dict, List
 
 from pydantic import BaseModel, Field
@@ -22,3 +23,37 @@ class BlueprintMatch(BaseModel):
     """Represents the blueprint match for the input text."""
 
     matched_blueprints: List[Dict] = Field(..., json_schema_extra={"example": [{"blueprint_name": "Example Blueprint"}]})
+
+
+class ProcessedMatch(Recommendation):
+    """Represents the recommendation for the input text, with its matched blueprints."""
+
+    matched_blueprints: List[Dict] = Field(..., json_schema_extra={"example": [{"name": "Example Blueprint", "matched_tags": ["Example"], "score": 1.0}]})
+
+
+class CatalogInfo(BaseModel):
+    """Represents the version of the loaded entity catalog."""
+
+    version: str = Field(..., json_schema_extra={"example": "3f2a9c..."})
+    entities: int = Field(..., json_schema_extra={"example": 68})
+    loaded_at: datetime
+
+
+class BlueprintCatalogInfo(BaseModel):
+    """Represents the version of the loaded blueprint catalog."""
+
+    version: str = Field(..., json_schema_extra={"example": "9b1c4e..."})
+    blueprints: int = Field(..., json_schema_extra={"example": 9})
+    loaded_at: datetime
+
+
+class CacheStats(BaseModel):
+    """Represents the counters of a cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    entries: int
+    bytes: int
+    max_bytes: int
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from src.nlp.services.blueprint_matching import BlueprintIndex
+
+# The fields every blueprint must have, and their types
+BLUEPRINT_FIELDS = {"name": str, "path": str, "description": str, "tags": list}
+
+
+class BlueprintCatalog:
+    """
+    The blueprints corpus, validated and indexed for matching.
+    """
+
+    def __init__(self, blueprints, version, path=None, mtime_ns=None):
+        """
+        Initializes the BlueprintCatalog object.
+
+        Args:
+            blueprints (list): The validated blueprints.
+            version (str): A fingerprint of the catalog contents.
+            path (str): The path of the file the catalog was loaded from.
+            mtime_ns (int): The modification time of the file when it was loaded.
+        """
+        self.blueprints = blueprints
+        self.version = version
+        self.path = path
+        self.mtime_ns = mtime_ns
+        # The modification time of the last version of the file that failed to load, so it is not parsed again
+        self.failed_mtime_ns = None
+        self.index = BlueprintIndex(blueprints)
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def __len__(self):
+        return len(self.blueprints)
+
+    def is_stale(self):
+        """
+        Check whether the catalog file was modified since the catalog was loaded, or since it last failed to load.
+
+        Returns:
+            bool: True if the file modification time changed, False otherwise.
+        """
+        if self.path is None:
+            return False
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            return mtime_ns != self.mtime_ns and mtime_ns != self.failed_mtime_ns
+        except FileNotFoundError:
+            # Keep serving the loaded catalog while the file is being replaced
+            return False
+
+
+def validate_blueprints(blueprints):
+    """
+    Check that the blueprints corpus is a list of blueprints with a name, path, description and string tags.
+
+    Args:
+        blueprints (list): The parsed blueprints corpus.
+
+    Raises:
+        ValueError: If the corpus or one of its blueprints is malformed.
+    """
+    if not isinstance(blueprints, list):
+        raise ValueError("The blueprints corpus must be a list of blueprints.")
+    for position, blueprint in enumerate(blueprints):
+        if not isinstance(blueprint, dict):
+            raise ValueError(f"Blueprint {position} must be an object.")
+        for field, field_type in BLUEPRINT_FIELDS.items():
+            if not isinstance(blueprint.get(field), field_type):
+                raise ValueError(f"Blueprint {position} must have a {field_type.__name__} {field!r}.")
+        if not all(isinstance(tag, str) for tag in blueprint["tags"]):
+            raise ValueError(f"The tags of blueprint {position} must be strings.")
+        if not isinstance(blueprint.get("type", "Other"), str):
+            raise ValueError(f"The type of blueprint {position} must be a string.")
+
+
+def load_blueprint_catalog(path):
+    """
+    Load and validate the blueprints corpus from a JSON file, and index it.
+
+    Args:
+        path (str): The path of the blueprints file, the BLUEPRINTS_DIR setting of the pipeline.
+
+    Returns:
+        BlueprintCatalog: The loaded catalog.
+
+    Raises:
+        ValueError: If the file is not valid JSON or the corpus is malformed.
+    """
+    # Read the file once, so the version always matches the parsed contents
+    mtime_ns = os.stat(path).st_mtime_ns
+    with open(path, "rb") as file:
+        contents = file.read()
+    blueprints = json.loads(contents)
+    validate_blueprints(blueprints)
+
+    return BlueprintCatalog(blueprints, version=hashlib.sha256(contents).hexdigest(), path=path, mtime_ns=mtime_ns)
+
+
+def rebuild_blueprint_catalog(pipeline):
+    """
+    Load a new blueprint catalog from the file of the catalog of the given pipeline.
+
+    If the file fails to load, its modification time is recorded on the current catalog, so the file is not
+    loaded again until it is modified again.
+
+    Args:
+        pipeline (NlpPipeline): The pipeline holding the catalog.
+
+    Returns:
+        BlueprintCatalog: The new catalog.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not valid JSON or the corpus is malformed.
+    """
+    catalog = pipeline.blueprint_catalog
+    mtime_ns = os.stat(catalog.path).st_mtime_ns
+    try:
+        return load_blueprint_catalog(catalog.path)
+    except (OSError, ValueError):
+        catalog.failed_mtime_ns = mtime_ns
+        raise
+
+
+async def reload_blueprint_catalog(pipeline):
+    """
+    Reload the blueprint catalog of the given pipeline, building it off the event loop.
+
+    If the file fails to load, the previous catalog is kept, and the file is not loaded again by the watcher
+    until it is modified again.
+
+    Args:
+        pipeline (NlpPipeline): The pipeline holding the catalog and the lock preventing concurrent reloads.
+
+    Returns:
+        BlueprintCatalog: The reloaded catalog.
+    """
+    async with pipeline.blueprint_catalog_lock:
+        catalog = await asyncio.to_thread(rebuild_blueprint_catalog, pipeline)
+        # Swap the whole catalog at once, in-flight requests keep the catalog they started with
+        pipeline.blueprint_catalog = catalog
+        print(f"Blueprint catalog reloaded, version {catalog.version}.")
+        return catalog
+
+
+async def watch_blueprint_catalog(pipeline, interval):
+    """
+    Reload the blueprint catalog whenever its file is modified.
+
+    Args:
+        pipeline (NlpPipeline): The pipeline holding the catalog.
+        interval (float): The number of seconds between two checks of the file.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if not pipeline.blueprint_catalog.is_stale():
+            continue
+        try:
+            await reload_blueprint_catalog(pipeline)
+        except Exception as e:
+            # Keep serving the previous catalog if the new file is invalid
+            print(f"Failed to reload the blueprint catalog: {e}")
@@ -1,5 +1,9 @@
+import heapq
 from collections import defaultdict
 
+import numpy as np
+from scipy import sparse
+
 from src.nlp.config import nlp_config
 from src.nlp.utils import load_json_file
 
@@ -13,103 +17,138 @@ def load_blueprints_corpus():
     return load_json_file(blueprints_corpus)
 
 
-def calculate_match_score(blueprint_tags, all_matching_criteria):
-    """
-    Calculates the match score between the blueprint tags and all matching criteria.
-    Parameters:
-    - blueprint_tags (set): A set of tags from the blueprint.
-    - all_matching_criteria (set): A set of all matching criteria.
-    Returns:
-    - match_score (int): The number of tags that match between the blueprint tags and all matching criteria.
+class BlueprintIndex:
     """
-    return len(blueprint_tags.intersection(all_matching_criteria))
+    The blueprints corpus, indexed by tag and by category for matching.
 
+    Each tag keeps the postings of the blueprints tagged with it, also held as a sparse tag × blueprint
+    matrix, so matching only visits the blueprints sharing at least one tag with the recommendations,
+    instead of scanning the whole corpus.
+    """
 
-def find_best_match(blueprints, all_matching_criteria):
+    def __init__(self, blueprints_corpus):
+        """
+        Initializes the BlueprintIndex object.
+
+        Args:
+            blueprints_corpus (list): List of dictionaries representing the blueprints corpus.
+        """
+        self.blueprints = list(blueprints_corpus)
+        # The tags of each blueprint, without duplicates but in their original order, and their number
+        self.tags = [list(dict.fromkeys(blueprint["tags"])) for blueprint in self.blueprints]
+        self.tag_counts = [len(tags) for tags in self.tags]
+        # The category of each blueprint, and the position of each category in the corpus
+        self.categories = [blueprint.get("type", "Other") for blueprint in self.blueprints]
+        self.category_order = {category: position for position, category in enumerate(dict.fromkeys(self.categories))}
+        # The blueprints of each category, and the blueprints of each tag
+        self.blueprints_by_category = defaultdict(list)
+        self.postings = defaultdict(list)
+        for position, (category, tags) in enumerate(zip(self.categories, self.tags)):
+            self.blueprints_by_category[category].append(position)
+            for tag in tags:
+                self.postings[tag].append(position)
+        # The column of each tag, and the sparse matrix with a row per tag and a column per blueprint tagged with it
+        self.tag_ids = {tag: tag_id for tag_id, tag in enumerate(self.postings)}
+        rows = [tag_id for tag, tag_id in self.tag_ids.items() for _ in self.postings[tag]]
+        columns = [position for tag in self.tag_ids for position in self.postings[tag]]
+        self.tag_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, columns)), shape=(len(self.tag_ids), len(self.blueprints)), dtype=np.int32
+        )
+        # The smoothed inverse document frequency of each tag across the corpus, so rare tags weigh more than common ones
+        document_frequencies = np.array([len(self.postings[tag]) for tag in self.tag_ids], dtype=np.float64)
+        self.tag_idf = np.log((1 + len(self.blueprints)) / (1 + document_frequencies)) + 1
+        self.category_ids = np.array([self.category_order[category] for category in self.categories], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.blueprints)
+
+    def matched_blueprint(self, position, tags):
+        """
+        Build the match of a blueprint.
+
+        Args:
+            position (int): The position of the blueprint in the corpus.
+            tags (set): The matched tags.
+
+        Returns:
+            dict: The name, path, description and matched tags of the blueprint.
+        """
+        blueprint = self.blueprints[position]
+        return {
+            "name": blueprint["name"],
+            "path": blueprint["path"],
+            "description": blueprint["description"],
+            "matched_tags": [tag for tag in self.tags[position] if tag in tags],
+        }
+
+
+def recommendation_weights(recommendations, extracted_entities=()):
     """
-    Finds the best match from a list of blueprints based on the matching criteria.
+    Weigh the technologies of a text for blueprint ranking, by their entity scores.
+
+    The recommended technologies weigh at least 1, the highest normalized score, and the other scored entities
+    weigh their score, so blueprints also matching the runner-up technologies of a category rank higher.
+
     Args:
-    - blueprints (list): A list of blueprints.
-    - all_matching_criteria (set): A set of all matching criteria.
+        recommendations (list): The recommendations of the text, with a "recommendation" name each.
+        extracted_entities (list): The scored entities of the text, with an "entity_name" and a "score" each.
+
     Returns:
-    - dict: The best matching blueprint.
+        dict: A dictionary mapping each technology to its weight.
     """
-    best_match = None
-    highest_score = 0
-    for blueprint in blueprints:
-        match_score = calculate_match_score(set(blueprint["tags"]), all_matching_criteria)
-        if match_score == len(blueprint["tags"]) and match_score > highest_score:
-            best_match = blueprint
-            highest_score = match_score
-    return best_match
+    weights = {}
+    for entity in extracted_entities:
+        name, score = entity.get("entity_name"), entity.get("score")
+        if name is not None and isinstance(score, (int, float)) and score > 0:
+            weights[name] = max(weights.get(name, 0.0), float(score))
+    for recommendation in recommendations:
+        weights[recommendation["recommendation"]] = max(weights.get(recommendation["recommendation"], 0.0), 1.0)
+    return weights
 
 
-def match_blueprints(nlp_output, blueprints_corpus):
+def rank_blueprints_batch(weight_sets, blueprints_corpus, top_k=1):
     """
-    Matches the recommendations from NLP output with the blueprints in the blueprints_corpus.
+    Ranks the blueprints of each category for many weighted sets of technologies in one pass, and keeps the top k.
+
+    A blueprint scores the sum, over its tags in the set, of the weight of the technology times the inverse
+    document frequency of the tag across the corpus. The scores of every set are computed at once with a sparse
+    product, then the k best blueprints of each category are selected with a heap; ties go to the blueprint
+    with the fewest tags, then to the first in the corpus.
 
     Args:
-      - nlp_output (list): List of dictionaries containing NLP output, including recommendations and extracted entities.
-      - blueprints_corpus (list): List of dictionaries representing the blueprints corpus.
+      - weight_sets (list): The weight of each technology of each set, as returned by `recommendation_weights`.
+      - blueprints_corpus (BlueprintIndex | list): The index of the blueprints corpus, or the list of blueprints to index.
+      - top_k (int): The number of blueprints kept per category.
 
     Returns:
-      - list: A list of dictionaries representing the matched blueprints, with details such as name, path, description, and matched tags.
-      - None: If no blueprint matches the provided recommendations.
+      - list: The ranked blueprints of each set, in the order of the sets, as lists of dictionaries with the name, path,
+        description, matched tags and score of each blueprint, by category in corpus order, then by descending score.
     """
-
-    # Extract the recommendations from the NLP output
-    recommendations = set(rec["recommendation"] for rec in nlp_output[0]["recommendations"])
-
-    # If there are no recommendations, return None
-    if not recommendations:
-        return None
-
-    # Group the blueprints by category
-    blueprints_by_category = defaultdict(list)
-    for blueprint in blueprints_corpus:
-        category = blueprint.get("type", "Other")  # Use "Other" as the default category
-        blueprints_by_category[category].append(blueprint)
-
-    # Initialize the list of matched blueprints
-    matched_blueprints = []
-
-    # Iterate over each category of blueprints
-    for category, category_blueprints in blueprints_by_category.items():
-        # Initialize the best match to None
-        best_match = None
-        # Initialize the maximum number of matched tags to 0
-        max_matched_tags = 0
-        # Initialize the minimum number of total tags to infinity
-        min_total_tags = float("inf")
-
-        # Iterate over each blueprint in the category
-        for blueprint in category_blueprints:
-            # Get the set of tags for the blueprint
-            blueprint_tags = set(blueprint["tags"])
-            # Get the set of matched tags between the blueprint and the recommendations
-            matched_tags = blueprint_tags.intersection(recommendations)
-            # Get the number of matched tags
-            num_matched_tags = len(matched_tags)
-            # Get the total number of tags in the blueprint
-            num_total_tags = len(blueprint_tags)
-
-            # Update the best match if the number of matched tags is greater than the maximum number of matched tags,
-            # or if the number of matched tags is equal to the max number of matched tags and the total number of tags is less than the min number of total tags
-            if num_matched_tags > max_matched_tags or (num_matched_tags == max_matched_tags and num_total_tags < min_total_tags):
-                best_match = {
-                    "name": blueprint["name"],
-                    "path": blueprint["path"],
-                    "description": blueprint["description"],
-                    "matched_tags": list(matched_tags),
-                }
-                # Update the maximum number of matched tags
-                max_matched_tags = num_matched_tags
-                # Update the minimum number of total tags
-                min_total_tags = num_total_tags
-
-        # If there is a best match and the best match has at least one matched tag, add the best match to the list of matched blueprints
-        if best_match and best_match["matched_tags"]:
-            matched_blueprints.append(best_match)
-
-    # Return the list of matched blueprints, or None if there are no matched blueprints
-    return matched_blueprints if matched_blueprints else None
+    index = blueprints_corpus if isinstance(blueprints_corpus, BlueprintIndex) else BlueprintIndex(blueprints_corpus)
+    rankings = [[] for _ in weight_sets]
+
+    # Encode the weighted technologies as a sparse matrix, skipping the technologies no blueprint is tagged with
+    rows, columns, values = [], [], []
+    for row, weights in enumerate(weight_sets):
+        for technology, weight in weights.items():
+            tag_id = index.tag_ids.get(technology)
+            if tag_id is not None and weight > 0:
+                rows.append(row)
+                columns.append(tag_id)
+                values.append(weight * index.tag_idf[tag_id])
+    if not rows:
+        return rankings
+    queries = sparse.csr_matrix((values, (rows, columns)), shape=(len(weight_sets), len(index.tag_ids)))
+
+    # Score the blueprints sharing at least one tag with each set, and group the candidates by set and category
+    scores = (queries @ index.tag_matrix).tocoo()
+    candidates = defaultdict(list)
+    for set_id, position, score in zip(scores.row.tolist(), scores.col.tolist(), scores.data.tolist()):
+        candidates[(set_id, int(index.category_ids[position]))].append((score, -index.tag_counts[position], -position))
+
+    for set_id, category_id in sorted(candidates):
+        for score, _, position in heapq.nlargest(top_k, candidates[(set_id, category_id)]):
+            ranked_blueprint = index.matched_blueprint(-position, weight_sets[set_id])
+            ranked_blueprint["score"] = round(score, 6)
+            rankings[set_id].append(ranked_blueprint)
+    return rankings
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from src.nlp.services.entity_extraction import initialize_matcher_with_patterns
+from src.nlp.services.entity_index import load_entity_index
+
+# The fields every tech entity must have besides its patterns, and their types
+TECH_ENTITY_FIELDS = {"type": str, "category": str, "description": str, "score": (int, float)}
+
+
+class EntityCatalog:
+    """
+    The technology entities, together with the structures derived from them: the spaCy matcher
+    compiled with their patterns and the entity embedding index.
+    """
+
+    def __init__(self, tech_entities, version, vocab, path=None, mtime_ns=None, entity_index=None):
+        """
+        Initializes the EntityCatalog object.
+
+        Args:
+            tech_entities (dict): Dictionary of tech entities.
+            version (str): A fingerprint of the catalog contents.
+            vocab (spacy.vocab.Vocab): The vocabulary of the spaCy model the matcher runs on.
+            path (str): The path of the file the catalog was loaded from.
+            mtime_ns (int): The modification time of the file when it was loaded.
+            entity_index (EntityEmbeddingIndex): The precomputed entity embeddings.
+        """
+        self.tech_entities = tech_entities
+        self.version = version
+        self.path = path
+        self.mtime_ns = mtime_ns
+        # The modification time of the last version of the file that failed to load, so it is not parsed again
+        self.failed_mtime_ns = None
+        self.entity_index = entity_index
+        self.matcher = initialize_matcher_with_patterns(tech_entities, vocab)
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def __len__(self):
+        return len(self.tech_entities)
+
+    def is_stale(self):
+        """
+        Check whether the catalog file was modified since the catalog was loaded, or since it last failed to load.
+
+        Returns:
+            bool: True if the file modification time changed, False otherwise.
+        """
+        if self.path is None:
+            return False
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            return mtime_ns != self.mtime_ns and mtime_ns != self.failed_mtime_ns
+        except FileNotFoundError:
+            # Keep serving the loaded catalog while the file is being replaced
+            return False
+
+
+def validate_tech_entities(tech_entities):
+    """
+    Check that the tech entities are a mapping of entity names to entities with a list of patterns, a type, a category,
+    a description, a numeric score and, optionally, a list of related technologies.
+
+    Args:
+        tech_entities (dict): The parsed tech entities.
+
+    Raises:
+        ValueError: If the entities or one of them is malformed.
+    """
+    if not isinstance(tech_entities, dict):
+        raise ValueError("The tech entities must be an object mapping entity names to entities.")
+    for name, entity in tech_entities.items():
+        if not isinstance(entity, dict):
+            raise ValueError(f"Entity {name!r} must be an object.")
+        if not isinstance(entity.get("patterns"), list) or not all(isinstance(pattern, list) for pattern in entity["patterns"]):
+            raise ValueError(f"Entity {name!r} must have a list of patterns.")
+        for field, field_type in TECH_ENTITY_FIELDS.items():
+            if not isinstance(entity.get(field), field_type) or isinstance(entity[field], bool):
+                raise ValueError(f"Entity {name!r} must have a valid {field!r}.")
+        related_technologies = entity.get("relatedTechnologies", [])
+        if not isinstance(related_technologies, list) or not all(isinstance(technology, str) for technology in related_technologies):
+            raise ValueError(f"The related technologies of entity {name!r} must be a list of strings.")
+
+
+def load_entity_catalog(nlp, embed, embedding_model_id, path, index_path=None):
+    """
+    Load the entity catalog from a JSON file and build its matcher and embedding index.
+
+    Args:
+        nlp (spacy.Language): The spaCy model the matcher runs on.
+        embed (callable): Function returning a matrix with one normalized embedding per text.
+        embedding_model_id (str): The embeddings model and runtime `embed` runs on, as returned by `embedding_model_id`.
+        path (str): The path of the tech entities file, the CORPUS_DIR setting of the pipeline.
+        index_path (str): Optional path where the entity embedding index is cached, the ENTITY_INDEX_PATH setting of the pipeline.
+
+    Returns:
+        EntityCatalog: The loaded catalog.
+
+    Raises:
+        ValueError: If the file is not valid JSON or the entities are malformed.
+    """
+    # Read the file once, so the version always matches the parsed contents
+    mtime_ns = os.stat(path).st_mtime_ns
+    with open(path, "rb") as file:
+        contents = file.read()
+    tech_entities = json.loads(contents)
+    validate_tech_entities(tech_entities)
+
+    return EntityCatalog(
+        tech_entities,
+        version=hashlib.sha256(contents).hexdigest(),
+        vocab=nlp.vocab,
+        path=path,
+        mtime_ns=mtime_ns,
+        entity_index=load_entity_index(tech_entities, embed, embedding_model_id, index_path),
+    )
+
+
+def rebuild_entity_catalog(pipeline):
+    """
+    Load a new entity catalog from the file of the catalog of the given pipeline.
+
+    If the file fails to load, its modification time is recorded on the current catalog, so the file is not
+    loaded again until it is modified again.
+
+    Args:
+        pipeline (NlpPipeline): The pipeline holding the catalog, the models it is built with and its settings.
+
+    Returns:
+        EntityCatalog: The new catalog.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not valid JSON or the entities are malformed.
+    """
+    catalog = pipeline.entity_catalog
+    mtime_ns = os.stat(catalog.path).st_mtime_ns
+    try:
+        return load_entity_catalog(pipeline.nlp, pipeline.embed, pipeline.embedding_model_id, catalog.path, pipeline.config.ENTITY_INDEX_PATH)
+    except (OSError, ValueError):
+        catalog.failed_mtime_ns = mtime_ns
+        raise
+
+
+def reload_entity_catalog_if_stale(pipeline):
+    """
+    Reload the entity catalog of the given pipeline if its file was modified.
+
+    If the modified file fails to load, the previous catalog is kept, and the file is not loaded again
+    until it is modified again.
+
+    Args:
+        pipeline (NlpPipeline): The pipeline holding the catalog, the models it is built with and its settings.
+
+    Returns:
+        bool: True if the catalog was reloaded, False otherwise.
+    """
+    if not pipeline.entity_catalog.is_stale():
+        return False
+    try:
+        # Swap the whole catalog at once, in-flight requests keep the catalog they started with
+        pipeline.entity_catalog = rebuild_entity_catalog(pipeline)
+    except Exception as e:
+        # Keep serving the previous catalog if the new file is invalid or partially written
+        print(f"Failed to reload the entity catalog: {e}")
+        return False
+    return True
+
+
+async def reload_entity_catalog(pipeline):
+    """
+    Reload the entity catalog of the given pipeline, building it off the event loop.
+
+    If the file fails to load, the previous catalog is kept, and the file is not loaded again by the watcher
+    until it is modified again. If the reload is cancelled, the thread is waited for before the cancellation is
+    propagated, so the embedding service is not closed while the thread still encodes through it.
+
+    Args:
+        pipeline (NlpPipeline): The pipeline holding the catalog, the models it is built with, its settings and the lock preventing concurrent reloads.
+
+    Returns:
+        EntityCatalog: The reloaded catalog.
+    """
+    async with pipeline.entity_catalog_lock:
+        thread = asyncio.ensure_future(asyncio.to_thread(rebuild_entity_catalog, pipeline))
+        try:
+            catalog = await asyncio.shield(thread)
+        except asyncio.CancelledError:
+            # A running thread cannot be interrupted, wait for it so the resources it uses are not released under it
+            await asyncio.wait([thread])
+            raise
+        pipeline.entity_catalog = catalog
+        print(f"Entity catalog reloaded, version {catalog.version}.")
+        return catalog
+
+
+async def watch_entity_catalog(pipeline, interval):
+    """
+    Reload the entity catalog whenever its file is modified.
+
+    Args:
+        pipeline (NlpPipeline): The pipeline holding the catalog.
+        interval (float): The number of seconds between two checks of the file.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if not pipeline.entity_catalog.is_stale():
+            continue
+        try:
+            await reload_entity_catalog(pipeline)
+        except Exception as e:
+            # Keep serving the previous catalog if the new file is invalid
+            print(f"Failed to reload the entity catalog: {e}")
@@ -1,11 +1,8 @@
 from spacy.matcher import Matcher
 
 from src.nlp.config import nlp_config
-from src.nlp.models import load_spacy_model
 from src.nlp.utils import load_json_file
 
-nlp = load_spacy_model()
-
 
 def load_tech_entities():
     """
@@ -18,17 +15,18 @@ def load_tech_entities():
     return load_json_file(tech_entities)
 
 
-def initialize_matcher_with_patterns(tech_entities):
+def initialize_matcher_with_patterns(tech_entities, vocab):
     """
     Initialize a spaCy Matcher object with patterns for tech entities.
 
     Args:
         tech_entities (dict): A dictionary containing tech entity names as keys and their patterns as values.
+        vocab (spacy.vocab.Vocab): The vocabulary of the spaCy model the matcher runs on.
 
     Returns:
         Matcher: A spaCy Matcher object initialized with the provided patterns.
     """
-    matcher = Matcher(nlp.vocab)
+    matcher = Matcher(vocab)
     for name, entity in tech_entities.items():
         # Assuming entity["patterns"] is a list of pattern dictionaries
         patterns = entity["patterns"]
@@ -38,7 +36,7 @@ def initialize_matcher_with_patterns(tech_entities):
     return matcher
 
 
-def extract_tech_entities(text, tech_entities, matcher):
+def extract_tech_entities(text, tech_entities, matcher, nlp):
     """
     Extracts technology entities from the given text using a spaCy matcher.
 
@@ -46,6 +44,7 @@ def extract_tech_entities(text, tech_entities, matcher):
         text (str): The input text from which to extract entities.
         tech_entities (dict): A dictionary containing information about the technology entities.
         matcher (spacy.matcher.Matcher): The spaCy matcher object used for entity matching.
+        nlp (spacy.Language): The spaCy model the matcher was built with.
 
     Returns:
         list: A list of dictionaries containing information about the extracted entities.
@@ -53,6 +52,40 @@ def extract_tech_entities(text, tech_entities, matcher):
 
     # Process the text with the spaCy NLP pipeline to create a document object
     doc = nlp(text)
+    # Extract the entities matched in the document
+    return extract_tech_entities_from_doc(doc, tech_entities, matcher)
+
+
+def extract_tech_entities_batch(texts, tech_entities, matcher, nlp, batch_size=64):
+    """
+    Extracts technology entities from a list of texts, processing them with spaCy in batches.
+
+    Args:
+        texts (list): The input texts from which to extract entities.
+        tech_entities (dict): A dictionary containing information about the technology entities.
+        matcher (spacy.matcher.Matcher): The spaCy matcher object used for entity matching.
+        nlp (spacy.Language): The spaCy model the matcher was built with.
+        batch_size (int): The number of texts spaCy processes at a time.
+
+    Returns:
+        list: A list with the extracted entities of each text, in the same order as the texts.
+    """
+    return [extract_tech_entities_from_doc(doc, tech_entities, matcher) for doc in nlp.pipe(texts, batch_size=batch_size)]
+
+
+def extract_tech_entities_from_doc(doc, tech_entities, matcher):
+    """
+    Extracts technology entities from a spaCy document using a spaCy matcher.
+
+    Args:
+        doc (spacy.tokens.Doc): The document from which to extract entities.
+        tech_entities (dict): A dictionary containing information about the technology entities.
+        matcher (spacy.matcher.Matcher): The spaCy matcher object used for entity matching.
+
+    Returns:
+        list: A list of dictionaries containing information about the extracted entities.
+    """
+
     # Use the matcher to find all matches in the document
     matches = matcher(doc)
     # Initialize a list to store entities found in the text
@@ -60,7 +93,7 @@ def extract_tech_entities(text, tech_entities, matcher):
     # Iterate over each match to extract the entity details
     for match_id, start, end in matches:
         # Retrieve the string representation of the entity's match ID
-        entity_key = nlp.vocab.strings[match_id]
+        entity_key = doc.vocab.strings[match_id]
         # Access the entity's details from the tech_entities dictionary using the entity_key
         entity_details = tech_entities[entity_key]
         # Create a dictionary with the entity's details
@@ -0,0 +1,157 @@
+import hashlib
+import os
+import zipfile
+
+import numpy as np
+import torch
+
+from src.nlp.utils import atomic_write
+
+
+def build_entity_text(entity_info):
+    """
+    Build the text that represents an entity when it is embedded.
+
+    Args:
+        entity_info (dict): The entity details from the tech entities dictionary.
+
+    Returns:
+        str: The entity's description, category and type joined by spaces.
+    """
+    return f"{entity_info.get('description', '')} {entity_info.get('category', '')} {entity_info.get('type', '')}"
+
+
+def compute_entities_fingerprint(tech_entities, embedding_model_id):
+    """
+    Compute a fingerprint of the entity texts and of the model embedding them, used to detect a stale index on disk.
+
+    Args:
+        tech_entities (dict): Dictionary of tech entities.
+        embedding_model_id (str): The embeddings model and runtime the entities are embedded with, as returned by `embedding_model_id`.
+
+    Returns:
+        str: A SHA-256 hex digest of the embeddings model, and of the entity names and texts.
+    """
+    digest = hashlib.sha256()
+    digest.update(embedding_model_id.encode("utf-8"))
+    for name, entity_info in sorted(tech_entities.items()):
+        digest.update(name.encode("utf-8"))
+        digest.update(build_entity_text(entity_info).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EntityEmbeddingIndex:
+    """
+    A normalized embedding matrix of the tech entities, keyed by entity name.
+    """
+
+    def __init__(self, names, embeddings, fingerprint):
+        """
+        Initializes the EntityEmbeddingIndex object.
+
+        Args:
+            names (list): The entity names, in the same order as the rows of the embeddings matrix.
+            embeddings (torch.Tensor): A matrix with one normalized embedding per entity.
+            fingerprint (str): The fingerprint of the entities the index was built from.
+        """
+        self.names = list(names)
+        self.embeddings = embeddings
+        self.fingerprint = fingerprint
+        self.positions = {name: position for position, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, entity_name):
+        return entity_name in self.positions
+
+    def get(self, entity_name):
+        """
+        Get the embedding of an entity.
+
+        Args:
+            entity_name (str): The name of the entity.
+
+        Returns:
+            torch.Tensor: The normalized embedding of the entity, or None if it is not indexed.
+        """
+        position = self.positions.get(entity_name)
+        if position is None:
+            return None
+        return self.embeddings[position]
+
+    def save(self, path):
+        """
+        Save the index to disk as a NumPy archive.
+
+        The archive is written to a temporary file and moved into place, since the processes loading the
+        pipeline may build and save the index at the same time.
+
+        Args:
+            path (str): The path of the archive.
+        """
+        with atomic_write(path) as file:
+            np.savez(file, names=np.array(self.names), embeddings=self.embeddings.numpy(), fingerprint=np.array(self.fingerprint))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index saved with `save`.
+
+        Args:
+            path (str): The path of the archive.
+
+        Returns:
+            EntityEmbeddingIndex: The loaded index.
+        """
+        with np.load(path) as archive:
+            return cls(archive["names"].tolist(), torch.from_numpy(archive["embeddings"]), str(archive["fingerprint"]))
+
+
+def build_entity_index(tech_entities, embed, embedding_model_id):
+    """
+    Embed every tech entity and build the entity embedding index.
+
+    Args:
+        tech_entities (dict): Dictionary of tech entities.
+        embed (callable): Function returning a matrix with one normalized embedding per text.
+        embedding_model_id (str): The embeddings model and runtime `embed` runs on, as returned by `embedding_model_id`.
+
+    Returns:
+        EntityEmbeddingIndex: The index of the entity embeddings.
+    """
+    names = list(tech_entities.keys())
+    embeddings = embed([build_entity_text(tech_entities[name]) for name in names])
+    return EntityEmbeddingIndex(names, embeddings, compute_entities_fingerprint(tech_entities, embedding_model_id))
+
+
+def load_entity_index(tech_entities, embed, embedding_model_id, index_path=None):
+    """
+    Load the entity embedding index from disk, or build it if it is missing or stale.
+
+    Args:
+        tech_entities (dict): Dictionary of tech entities.
+        embed (callable): Function returning a matrix with one normalized embedding per text.
+        embedding_model_id (str): The embeddings model and runtime `embed` runs on, as returned by `embedding_model_id`.
+        index_path (str): Optional path where the index is cached between restarts.
+
+    Returns:
+        EntityEmbeddingIndex: The index of the entity embeddings.
+    """
+    fingerprint = compute_entities_fingerprint(tech_entities, embedding_model_id)
+
+    # Reuse the cached index if it was built from the same entities, with the same embeddings model and runtime
+    if index_path and os.path.exists(index_path):
+        try:
+            entity_index = EntityEmbeddingIndex.load(index_path)
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            # Rebuild an unreadable index, like a stale one
+            print(f"Failed to load the entity index from {index_path}, rebuilding it: {e}")
+        else:
+            if entity_index.fingerprint == fingerprint:
+                return entity_index
+
+    entity_index = build_entity_index(tech_entities, embed, embedding_model_id)
+    if index_path:
+        entity_index.save(index_path)
+    return entity_index
@@ -1,7 +1,42 @@
-from src.nlp.utils import cosine_similarity, get_embedding
+import torch
 
+from src.nlp.services.entity_index import build_entity_text
 
-def dynamic_score_entities(entities, topic_keywords, user_input, tech_entities):
+EXPLICIT_MENTION_BOOST = 0.2
+
+
+def score_entities(input_embedding, entity_embeddings, keyword_embeddings, boosts, category_ids):
+    """
+    Computes the combined, boosted and per-category normalized scores of the entities in one pass.
+
+    All embeddings are expected to be L2-normalized, so their dot products are cosine similarities.
+
+    Args:
+        input_embedding (torch.Tensor): The embedding of the user input.
+        entity_embeddings (torch.Tensor): A matrix with one embedding per entity.
+        keyword_embeddings (torch.Tensor): A matrix with one embedding per topic keyword.
+        boosts (torch.Tensor): The score boost of each entity.
+        category_ids (torch.Tensor): The index of the category of each entity.
+
+    Returns:
+        torch.Tensor: The score of each entity divided by the highest score in its category.
+    """
+    # Compare every entity against the input and every keyword with a single matrix product
+    queries = torch.cat([input_embedding.unsqueeze(0), keyword_embeddings.reshape(-1, input_embedding.shape[-1])])
+    similarities = entity_embeddings @ queries.T
+
+    # The similarity to the input is the first column, the relevance is the mean similarity to the keywords
+    similarity = similarities[:, 0]
+    relevance = similarities[:, 1:].mean(dim=1) if similarities.shape[1] > 1 else torch.zeros_like(similarity)
+    combined_scores = similarity + relevance + boosts
+
+    # Normalize the scores by the maximum score of each category
+    num_categories = int(category_ids.max()) + 1
+    max_scores = torch.zeros(num_categories, dtype=combined_scores.dtype).scatter_reduce(0, category_ids, combined_scores, reduce="amax", include_self=False)
+    return combined_scores / max_scores[category_ids]
+
+
+def dynamic_score_entities(entities, topic_keywords, user_input, tech_entities, embed, entity_index=None, topic_embedding=None, input_embedding=None):
     """
     Scores the entities based on their relevance to the user input and topic keywords.
 
@@ -10,75 +45,68 @@ def dynamic_score_entities(entities, topic_keywords, user_input, tech_entities):
         topic_keywords (list): List of topic keywords.
         user_input (str): User input text.
         tech_entities (dict): Dictionary of tech entities.
+        embed (callable): Function returning a matrix with one normalized embedding per text.
+        entity_index (EntityEmbeddingIndex): Optional precomputed entity embeddings. Entities missing from it are embedded on the fly.
+        topic_embedding (torch.Tensor): Optional precomputed mean embedding of the topic keywords. When given, the keywords are not embedded.
+        input_embedding (torch.Tensor): Optional precomputed embedding of the user input.
 
     Returns:
         dict: Sorted entities by category with their combined scores.
     """
 
-    # Get the embedding of the user input. This will be used to calculate the similarity
-    # between the user input and each entity.
-    input_embedding = get_embedding(user_input)
-    scores = {}
-
     # Identify explicit mentions of entities in the user input.
-    explicit_mentions = [entity_dict["entity"] for entity_dict in entities if entity_dict["entity"].lower() in user_input.lower()]
+    explicit_mentions = {entity_dict["entity"] for entity_dict in entities if entity_dict["entity"].lower() in user_input.lower()}
 
     # Prepare a list of entities to be scored. If an entity has related technologies,
-    # add those to the list instead of the entity itself.
-    updated_entities = []
+    # add those to the list instead of the entity itself. Each entity is scored once.
+    updated_entities = {}
     for entity_dict in entities:
         entity_name = entity_dict["entity"]
         if "relatedTechnologies" in tech_entities.get(entity_name, {}):
-            updated_entities.extend(tech_entities[entity_name]["relatedTechnologies"])
+            updated_entities.update(dict.fromkeys(tech_entities[entity_name]["relatedTechnologies"]))
         else:
-            updated_entities.append(entity_name)
-
-    # Score entities, applying a boost for explicit mentions
-    for entity_name in updated_entities:
-        # Get the information about the entity from the tech_entities dictionary.
-        entity_info = tech_entities.get(entity_name, {})
-        # Prepare the text that represents the entity. This includes the entity's description,
-        # category, and type.
-        entity_text = f"{entity_info.get('description', '')} {entity_info.get('category', '')} {entity_info.get('type', '')}"
-        # Get the embedding of the entity text.
-        entity_embedding = get_embedding(entity_text)
-        # Calculate the cosine similarity between the user input and the entity.
-        similarity = cosine_similarity(input_embedding, entity_embedding)
-        # Calculate the relevance score of the entity based on its similarity to the topic keywords.
-        relevance_score = sum(cosine_similarity(get_embedding(keyword), entity_embedding) for keyword in topic_keywords) / len(topic_keywords)
-
-        # The combined score is the sum of the similarity and the relevance score.
-        combined_score = similarity + relevance_score
-
-        # Apply a scoring boost for explicit mentions of the entity in the user input.
-        if entity_name in explicit_mentions:
-            combined_score += 0.2  # Adjust this boost value as needed
-
-        # Get the category of the entity. If the entity doesn't have a category, use "Uncategorized".
-        category = entity_info.get("category", "Uncategorized")
-        # If this is the first entity of this category, initialize a new dictionary for the category.
-        if category not in scores:
-            scores[category] = {}
-        # Add the entity and its score to the category's dictionary.
-        scores[category][entity_name] = combined_score
-
-    # Normalize and sort scores within each category
-    sorted_entities_by_category = {}
-    for category, entities_scores in scores.items():
-        # Get the maximum score in the category.
-        max_score = max(entities_scores.values(), default=1)
-        # Normalize the scores by dividing each score by the maximum score.
-        normalized_scores = {entity_name: score / max_score for entity_name, score in entities_scores.items()}
-        # Sort the entities by their normalized scores in descending order.
-        sorted_entities = sorted(normalized_scores.items(), key=lambda x: x[1], reverse=True)
-        # Add the sorted entities to the sorted_entities_by_category dictionary.
-        sorted_entities_by_category[category] = sorted_entities
-
-    return [
-        {"entity_name": entity_name, "score": score, "category": category}
-        for category, entities_scores in sorted_entities_by_category.items()
-        for entity_name, score in entities_scores
-    ]
+            updated_entities[entity_name] = None
+    entity_names = list(updated_entities)
+
+    if not entity_names:
+        return []
+
+    # Get the embedding of the user input and of the topic keywords. The mean similarity to the keywords
+    # is the similarity to their mean embedding, so a precomputed mean stands in for all the keywords.
+    if input_embedding is None:
+        input_embedding = embed([user_input])[0]
+    keyword_embeddings = topic_embedding.unsqueeze(0) if topic_embedding is not None else embed(topic_keywords)
+
+    # Look up the precomputed entity embeddings, and embed the missing entities in a single batch.
+    entity_embeddings = [entity_index.get(entity_name) if entity_index is not None else None for entity_name in entity_names]
+    missing = [position for position, embedding in enumerate(entity_embeddings) if embedding is None]
+    if missing:
+        missing_embeddings = embed([build_entity_text(tech_entities.get(entity_names[position], {})) for position in missing])
+        for position, embedding in zip(missing, missing_embeddings):
+            entity_embeddings[position] = embedding
+
+    # Get the category of each entity. If the entity doesn't have a category, use "Uncategorized".
+    categories = [tech_entities.get(entity_name, {}).get("category", "Uncategorized") for entity_name in entity_names]
+    category_positions = {category: position for position, category in enumerate(dict.fromkeys(categories))}
+
+    # Apply a scoring boost for explicit mentions of the entity in the user input.
+    boosts = torch.tensor([EXPLICIT_MENTION_BOOST if entity_name in explicit_mentions else 0.0 for entity_name in entity_names])
+
+    normalized_scores = score_entities(
+        input_embedding,
+        torch.stack(entity_embeddings),
+        keyword_embeddings,
+        boosts,
+        torch.tensor([category_positions[category] for category in categories]),
+    ).tolist()
+
+    # Group the entities by category, in order of first appearance, and sort them by score in descending order.
+    scored_entities = sorted(
+        zip(entity_names, normalized_scores, categories),
+        key=lambda entity: (category_positions[entity[2]], -entity[1]),
+    )
+
+    return [{"entity_name": entity_name, "score": score, "category": category} for entity_name, score, category in scored_entities]
 
 
 def recommend_technologies(entities):
@@ -0,0 +1,55 @@
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+class TopicCentroids:
+    """
+    The centroid embedding of every topic of the topic model, to assign topics by cosine similarity.
+    """
+
+    def __init__(self, topic_ids, embeddings):
+        """
+        Initializes the TopicCentroids object.
+
+        Args:
+            topic_ids (list): The topic IDs, in the same order as the rows of the embeddings matrix.
+            embeddings (torch.Tensor): A matrix with the centroid embedding of each topic.
+        """
+        self.topic_ids = torch.as_tensor(topic_ids, dtype=torch.long)
+        self.embeddings = F.normalize(embeddings.float(), p=2, dim=1)
+
+    def __len__(self):
+        return len(self.topic_ids)
+
+    def nearest(self, embeddings):
+        """
+        Find the topic with the most similar centroid to each embedding.
+
+        Args:
+            embeddings (torch.Tensor): A matrix with one normalized embedding per row.
+
+        Returns:
+            tuple: The ID of the nearest topic and its cosine similarity, for each embedding.
+        """
+        similarities = embeddings @ self.embeddings.T
+        scores, rows = similarities.max(dim=1)
+        return self.topic_ids[rows].tolist(), scores.tolist()
+
+
+def build_topic_centroids(topic_model):
+    """
+    Build the topic centroids from the topic embeddings of a topic model.
+
+    BERTopic computes the embedding of each topic as the mean embedding of its documents, with the
+    embeddings model of the pipeline, so the centroids live in the same space as the input embeddings.
+
+    Args:
+        topic_model (BERTopic | ServingTopicModel): The topic model.
+
+    Returns:
+        TopicCentroids: The centroids of the topics.
+    """
+    # The rows of the topic embeddings follow the sorted topic IDs, starting with the outlier topic -1
+    topic_ids = sorted(int(topic_id) for topic_id in topic_model.get_topic_info()["Topic"])
+    return TopicCentroids(topic_ids, torch.from_numpy(np.array(topic_model.topic_embeddings_, dtype=np.float32)))
@@ -1,26 +1,57 @@
-def classify_text(text, topic_model, topic_name_mapping):
+def classify_text(text, topic_model, topic_registry):
     """
     Classifies the given text into a topic using the provided topic model.
 
     Parameters:
         text (str): The text to be classified.
         topic_model (BERTopic): The topic model used for classification.
-        topic_name_mapping (dict): A dictionary mapping topic IDs to topic names.
+        topic_registry (TopicRegistry): The registry of the topics of the topic model.
 
     Returns:
-        tuple: A tuple containing the predicted topic name and a list of keywords associated with the predicted topic.
+        tuple: A tuple containing the predicted topic ID, the predicted topic name and a list of keywords associated with the predicted topic.
     """
-    # Use the topic model to predict the topic for the given text
+    return classify_texts([text], topic_model, topic_registry)[0]
+
+
+def classify_texts(texts, topic_model, topic_registry, embeddings=None):
+    """
+    Classifies a list of texts into topics with a single call to the topic model.
+
+    Parameters:
+        texts (list): The texts to be classified.
+        topic_model (BERTopic): The topic model used for classification.
+        topic_registry (TopicRegistry): The registry of the topics of the topic model.
+        embeddings (np.ndarray): Optional matrix with the embedding of each text, computed by the topic model otherwise.
+
+    Returns:
+        list: A list with a tuple of the predicted topic ID, topic name and keywords for each text, in the same order as the texts.
+    """
+    if not texts:
+        return []
+
+    # Use the topic model to predict the topics of all the texts at once
     # The transform method returns a tuple with the predicted topic(s) and their probabilities
-    predicted_topic, _ = topic_model.transform([text])
+    predicted_topics, _ = topic_model.transform(texts, embeddings=embeddings)
+
+    # Look the name and keywords of each predicted topic up in the registry. If the ID is not found,
+    # the name defaults to "Unknown Topic"
+    return [(int(topic_id), topic_registry.get_name(int(topic_id)), topic_registry.get_keywords(int(topic_id))) for topic_id in predicted_topics]
+
+
+def classify_embeddings(embeddings, topic_centroids, topic_registry):
+    """
+    Classifies texts into the topics with the nearest centroid to their embeddings.
 
-    # Retrieve the topic name using the predicted topic ID. If the ID is not found,
-    # default to "Unknown Topic"
-    topic_name = topic_name_mapping.get(predicted_topic[0], "Unknown Topic")
+    Parameters:
+        embeddings (torch.Tensor): A matrix with one normalized embedding per text.
+        topic_centroids (TopicCentroids): The centroid embeddings of the topics of the topic model.
+        topic_registry (TopicRegistry): The registry of the topics of the topic model.
 
-    # Get the list of keywords for the predicted topic. The get_topic method returns
-    # a list of tuples with keywords and their relevance scores, but we only need the keywords
-    keywords = [word for word, _ in topic_model.get_topic(predicted_topic[0])]
+    Returns:
+        list: A list with a tuple of the predicted topic ID, topic name and keywords for each text, in the same order as the embeddings.
+    """
+    if len(embeddings) == 0:
+        return []
 
-    # Return the predicted topic name and the associated keywords
-    return topic_name, keywords
+    topic_ids, _ = topic_centroids.nearest(embeddings)
+    return [(topic_id, topic_registry.get_name(topic_id), topic_registry.get_keywords(topic_id)) for topic_id in topic_ids]
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import zipfile
+
+import numpy as np
+import torch
+
+from src.nlp.utils import atomic_write
+
+
+def compute_topics_fingerprint(topic_keywords, embedding_model_id):
+    """
+    Compute a fingerprint of the topic keywords and of the model embedding them, used to detect a stale index on disk.
+
+    Args:
+        topic_keywords (dict): A dictionary mapping topic IDs to their list of keywords.
+        embedding_model_id (str): The embeddings model and runtime the keywords are embedded with, as returned by `embedding_model_id`.
+
+    Returns:
+        str: A SHA-256 hex digest of the embeddings model, and of the topic IDs and keywords.
+    """
+    digest = hashlib.sha256()
+    digest.update(embedding_model_id.encode("utf-8"))
+    for topic_id, keywords in sorted(topic_keywords.items()):
+        digest.update(str(topic_id).encode("utf-8"))
+        digest.update("\x1f".join(keywords).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class TopicKeywordIndex:
+    """
+    The keyword embeddings of every topic, and their mean vector, keyed by topic ID.
+
+    Keywords shared between topics are embedded once, each topic keeps the rows of its keywords.
+    """
+
+    def __init__(self, vocabulary, embeddings, topic_rows, fingerprint):
+        """
+        Initializes the TopicKeywordIndex object.
+
+        Args:
+            vocabulary (list): The unique keywords, in the same order as the rows of the embeddings matrix.
+            embeddings (torch.Tensor): A matrix with one normalized embedding per keyword.
+            topic_rows (dict): A dictionary mapping topic IDs to the rows of their keywords.
+            fingerprint (str): The fingerprint of the topic keywords the index was built from.
+        """
+        self.vocabulary = list(vocabulary)
+        self.embeddings = embeddings
+        self.topic_rows = {topic_id: torch.as_tensor(rows, dtype=torch.long) for topic_id, rows in topic_rows.items()}
+        self.fingerprint = fingerprint
+        # The mean keyword embedding of each topic. The mean similarity between an entity and the
+        # keywords of a topic is the dot product between the entity and this vector.
+        self.mean_embeddings = {topic_id: self.embeddings[rows].mean(dim=0) for topic_id, rows in self.topic_rows.items() if len(rows)}
+
+    def __len__(self):
+        return len(self.topic_rows)
+
+    def __contains__(self, topic_id):
+        return topic_id in self.topic_rows
+
+    def get_keyword_embeddings(self, topic_id):
+        """
+        Get the keyword embeddings of a topic.
+
+        Args:
+            topic_id (int): The ID of the topic.
+
+        Returns:
+            torch.Tensor: A matrix with one embedding per keyword of the topic, or None if the topic is not indexed.
+        """
+        rows = self.topic_rows.get(topic_id)
+        if rows is None:
+            return None
+        return self.embeddings[rows]
+
+    def get_mean_embedding(self, topic_id):
+        """
+        Get the mean keyword embedding of a topic.
+
+        Args:
+            topic_id (int): The ID of the topic.
+
+        Returns:
+            torch.Tensor: The mean keyword embedding, or None if the topic is not indexed or has no keywords.
+        """
+        return self.mean_embeddings.get(topic_id)
+
+    def save(self, path):
+        """
+        Save the index to disk as a NumPy archive.
+
+        The archive is written to a temporary file and moved into place, since the processes loading the
+        pipeline may build and save the index at the same time.
+
+        Args:
+            path (str): The path of the archive.
+        """
+        topic_ids = list(self.topic_rows)
+        offsets = np.cumsum([0] + [len(self.topic_rows[topic_id]) for topic_id in topic_ids])
+        rows = torch.cat(list(self.topic_rows.values())).numpy() if topic_ids else np.empty(0, dtype=np.int64)
+        with atomic_write(path) as file:
+            np.savez(
+                file,
+                vocabulary=np.array(self.vocabulary),
+                embeddings=self.embeddings.numpy(),
+                topic_ids=np.array(topic_ids),
+                offsets=offsets,
+                rows=rows,
+                fingerprint=np.array(self.fingerprint),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index saved with `save`.
+
+        Args:
+            path (str): The path of the archive.
+
+        Returns:
+            TopicKeywordIndex: The loaded index.
+        """
+        with np.load(path) as archive:
+            offsets = archive["offsets"]
+            topic_rows = {int(topic_id): archive["rows"][offsets[i] : offsets[i + 1]] for i, topic_id in enumerate(archive["topic_ids"])}
+            return cls(archive["vocabulary"].tolist(), torch.from_numpy(archive["embeddings"]), topic_rows, str(archive["fingerprint"]))
+
+
+def build_topic_index(topic_keywords, embed, embedding_model_id):
+    """
+    Embed the keywords of every topic and build the topic keyword index.
+
+    Args:
+        topic_keywords (dict): A dictionary mapping topic IDs to their list of keywords.
+        embed (callable): Function returning a matrix with one normalized embedding per text.
+        embedding_model_id (str): The embeddings model and runtime `embed` runs on, as returned by `embedding_model_id`.
+
+    Returns:
+        TopicKeywordIndex: The index of the topic keyword embeddings.
+    """
+    vocabulary = list(dict.fromkeys(keyword for keywords in topic_keywords.values() for keyword in keywords))
+    positions = {keyword: position for position, keyword in enumerate(vocabulary)}
+    topic_rows = {topic_id: [positions[keyword] for keyword in keywords] for topic_id, keywords in topic_keywords.items()}
+    return TopicKeywordIndex(vocabulary, embed(vocabulary), topic_rows, compute_topics_fingerprint(topic_keywords, embedding_model_id))
+
+
+def load_topic_index(topic_registry, embed, embedding_model_id, index_path=None):
+    """
+    Load the topic keyword index from disk, or build it if it is missing or stale.
+
+    Args:
+        topic_registry (TopicRegistry): The registry of the topics of the topic model.
+        embed (callable): Function returning a matrix with one normalized embedding per text.
+        embedding_model_id (str): The embeddings model and runtime `embed` runs on, as returned by `embedding_model_id`.
+        index_path (str): Optional path where the index is cached between restarts.
+
+    Returns:
+        TopicKeywordIndex: The index of the topic keyword embeddings.
+    """
+    topic_keywords = topic_registry.get_all_keywords()
+    fingerprint = compute_topics_fingerprint(topic_keywords, embedding_model_id)
+
+    # Reuse the cached index if it was built from the same topics, with the same embeddings model and runtime
+    if index_path and os.path.exists(index_path):
+        try:
+            topic_index = TopicKeywordIndex.load(index_path)
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            # Rebuild an unreadable index, like a stale one
+            print(f"Failed to load the topic index from {index_path}, rebuilding it: {e}")
+        else:
+            if topic_index.fingerprint == fingerprint:
+                return topic_index
+
+    topic_index = build_topic_index(topic_keywords, embed, embedding_model_id)
+    if index_path:
+        topic_index.save(index_path)
+    return topic_index
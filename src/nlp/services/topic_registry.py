@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+
+UNKNOWN_TOPIC_NAME = "Unknown Topic"
+
+
+@dataclass(frozen=True)
+class Topic:
+    """
+    The metadata of a topic of the topic model.
+    """
+
+    id: int
+    name: str
+    keywords: list[str] = field(default_factory=list)
+    count: int = 0
+
+
+class TopicRegistry:
+    """
+    The metadata of every topic of the topic model, keyed by topic ID.
+    """
+
+    def __init__(self, topics: list[Topic]) -> None:
+        """
+        Initializes the TopicRegistry object.
+
+        Args:
+          topics: The topics of the topic model.
+        """
+        self.topics: dict[int, Topic] = {topic.id: topic for topic in topics}
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def __contains__(self, topic_id: int) -> bool:
+        return topic_id in self.topics
+
+    def get(self, topic_id: int) -> Topic | None:
+        """
+        Get a topic by ID.
+
+        Args:
+          topic_id: The ID of the topic.
+
+        Returns:
+          The topic, or None if the topic model has no such topic.
+        """
+        return self.topics.get(topic_id)
+
+    def get_name(self, topic_id: int) -> str:
+        """
+        Get the name of a topic.
+
+        Args:
+          topic_id: The ID of the topic.
+
+        Returns:
+          The name of the topic, or "Unknown Topic" if the topic model has no such topic.
+        """
+        topic = self.topics.get(topic_id)
+        return topic.name if topic else UNKNOWN_TOPIC_NAME
+
+    def get_keywords(self, topic_id: int) -> list[str]:
+        """
+        Get the keywords of a topic.
+
+        Args:
+          topic_id: The ID of the topic.
+
+        Returns:
+          The keywords of the topic, or an empty list if the topic model has no such topic.
+        """
+        topic = self.topics.get(topic_id)
+        return topic.keywords if topic else []
+
+    def get_all_keywords(self) -> dict[int, list[str]]:
+        """
+        Get the keywords of every topic.
+
+        Returns:
+          A dictionary mapping topic IDs to their list of keywords.
+        """
+        return {topic_id: topic.keywords for topic_id, topic in self.topics.items()}
+
+
+def build_topic_registry(topic_model) -> TopicRegistry:
+    """
+    Materialize the metadata of every topic of a topic model.
+
+    Args:
+      topic_model: The BERTopic model.
+
+    Returns:
+      The registry of the topics of the model.
+    """
+    topic_info = topic_model.get_topic_info()
+    topic_keywords = topic_model.get_topics()
+
+    topics = [
+        Topic(
+            id=int(topic_id),
+            name=str(name),
+            keywords=[word for word, _ in topic_keywords.get(topic_id, [])],
+            count=int(count),
+        )
+        for topic_id, name, count in zip(topic_info["Topic"], topic_info["Name"], topic_info["Count"])
+    ]
+    return TopicRegistry(topics)
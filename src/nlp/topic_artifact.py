@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.nlp.models import EMBEDDINGS_MODEL_NAME
+from src.nlp.utils import atomic_write
+
+ARTIFACT_FORMAT_VERSION = 1
+METADATA_FILE = "metadata.json"
+TOPIC_EMBEDDINGS_FILE = "topic_embeddings.npy"
+C_TF_IDF_FILES = {"data": "c_tf_idf_data.npy", "indices": "c_tf_idf_indices.npy", "indptr": "c_tf_idf_indptr.npy"}
+REDUCTION_MODEL_FILE = "reduction.joblib"
+
+
+class ServingTopicModel:
+    """
+    The parts of a BERTopic model needed to assign topics to new texts, loaded from an artifact exported by
+    `export_topic_artifact`.
+
+    The arrays are memory-mapped read-only, so the processes serving the same artifact on a host share its
+    pages through the page cache, and loading it does not unpickle the full model. The texts are not embedded
+    by the artifact, which keeps no embedding model: `transform` takes the embeddings computed by the
+    pipeline with the same embeddings model the topic model was fitted with.
+    """
+
+    def __init__(self, topics, topic_embeddings, c_tf_idf=None, vocabulary=None, topic_mapping=None, reduction_model=None, version=None):
+        """
+        Initializes the ServingTopicModel object.
+
+        Args:
+            topics (list): The ID, name, count and weighted keywords of each topic, ordered by topic ID.
+            topic_embeddings (np.ndarray): A matrix with the embedding of each topic, in the order of the topics.
+            c_tf_idf (scipy.sparse.csr_matrix): The c-TF-IDF representation of each topic.
+            vocabulary (list): The words of the columns of the c-TF-IDF matrix.
+            topic_mapping (dict): Maps the cluster IDs of the clustering model to the topic IDs, clusters without a topic are outliers.
+            reduction_model (dict): The fitted "umap_model" and "hdbscan_model", or None to assign topics by cosine similarity.
+            version (str): A fingerprint of the artifact contents.
+        """
+        self.topics = topics
+        self.topic_embeddings_ = topic_embeddings
+        self.c_tf_idf_ = c_tf_idf
+        self.vocabulary = vocabulary or []
+        self.topic_mapping = topic_mapping or {}
+        self.reduction_model = reduction_model
+        self.version = version
+        # The outlier topic -1, when present, is the first row of the topic embeddings
+        self._outliers = 1 if any(topic["id"] == -1 for topic in topics) else 0
+        # Only the norms are computed, normalizing the embeddings would copy them out of the shared pages
+        self._topic_norms = np.linalg.norm(topic_embeddings, axis=1)
+
+    def transform(self, documents, embeddings=None):
+        """
+        Assign topics to texts, like `BERTopic.transform`.
+
+        Args:
+            documents (list): The texts to classify.
+            embeddings (np.ndarray): A matrix with the embedding of each text.
+
+        Returns:
+            tuple: The predicted topic ID of each text and the probability of each prediction.
+
+        Raises:
+            ValueError: If the embeddings of the texts are not given.
+        """
+        if embeddings is None:
+            raise ValueError("The serving topic model needs the embeddings of the documents.")
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        if self.reduction_model is None:
+            # Assign each text to the topic with the most similar embedding
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            similarities = (embeddings / np.where(norms == 0, 1, norms)) @ self.topic_embeddings_.T / np.where(self._topic_norms == 0, 1, self._topic_norms)
+            predictions = np.argmax(similarities, axis=1) - self._outliers
+            return predictions.tolist(), np.max(similarities, axis=1)
+
+        import hdbscan
+
+        # Reduce the embeddings and predict their cluster with the fitted models, then map the clusters to topics
+        reduced_embeddings = self.reduction_model["umap_model"].transform(embeddings)
+        predictions, probabilities = hdbscan.approximate_predict(self.reduction_model["hdbscan_model"], reduced_embeddings)
+        return [self.topic_mapping.get(int(prediction), -1) for prediction in predictions], probabilities
+
+    def get_topic_info(self):
+        """
+        Get the ID, name and size of each topic, like `BERTopic.get_topic_info`.
+
+        Returns:
+            pd.DataFrame: The "Topic", "Count" and "Name" of each topic.
+        """
+        return pd.DataFrame(
+            {
+                "Topic": [topic["id"] for topic in self.topics],
+                "Count": [topic["count"] for topic in self.topics],
+                "Name": [topic["name"] for topic in self.topics],
+            }
+        )
+
+    def get_topics(self):
+        """
+        Get the weighted keywords of each topic, like `BERTopic.get_topics`.
+
+        Returns:
+            dict: A dictionary mapping topic IDs to their list of (word, weight) tuples.
+        """
+        return {topic["id"]: [(word, weight) for word, weight in topic["words"]] for topic in self.topics}
+
+
+def export_topic_artifact(topic_model, path, embedding_model_name=EMBEDDINGS_MODEL_NAME):
+    """
+    Export the serving parts of a BERTopic model to a directory of memory-mappable files.
+
+    Each file is written next to its final path and moved into place, so the processes memory-mapping a previous
+    export of the same directory keep reading the previous files instead of files truncated under them.
+
+    Args:
+        topic_model (BERTopic): The fitted topic model.
+        path (str): The directory to write the artifact to.
+        embedding_model_name (str): The name of the embeddings model the topic model was fitted with.
+
+    Returns:
+        str: The version of the exported artifact.
+    """
+    os.makedirs(path, exist_ok=True)
+
+    topic_info = topic_model.get_topic_info().sort_values("Topic")
+    topic_keywords = topic_model.get_topics()
+    topics = [
+        {
+            "id": int(topic_id),
+            "name": str(name),
+            "count": int(count),
+            "words": [[str(word), float(weight)] for word, weight in topic_keywords.get(topic_id, [])],
+        }
+        for topic_id, name, count in zip(topic_info["Topic"], topic_info["Name"], topic_info["Count"])
+    ]
+
+    topic_embeddings = np.ascontiguousarray(topic_model.topic_embeddings_, dtype=np.float32)
+    with atomic_write(os.path.join(path, TOPIC_EMBEDDINGS_FILE)) as file:
+        np.save(file, topic_embeddings)
+
+    c_tf_idf_shape = None
+    if getattr(topic_model, "c_tf_idf_", None) is not None:
+        c_tf_idf = sparse.csr_matrix(topic_model.c_tf_idf_, dtype=np.float32)
+        c_tf_idf_shape = list(c_tf_idf.shape)
+        for name, file_name in C_TF_IDF_FILES.items():
+            with atomic_write(os.path.join(path, file_name)) as file:
+                np.save(file, getattr(c_tf_idf, name))
+    vocabulary = topic_model.vectorizer_model.get_feature_names_out().tolist() if c_tf_idf_shape else []
+
+    # The UMAP and HDBSCAN models only exist in pickled models, the safetensors ones assign topics by similarity
+    hdbscan_model = getattr(topic_model, "hdbscan_model", None)
+    has_reduction_model = hasattr(hdbscan_model, "prediction_data_")
+    if has_reduction_model:
+        import joblib
+
+        with atomic_write(os.path.join(path, REDUCTION_MODEL_FILE)) as file:
+            joblib.dump({"umap_model": topic_model.umap_model, "hdbscan_model": hdbscan_model}, file)
+    topic_mapper = getattr(topic_model, "topic_mapper_", None)
+    topic_mapping = {str(key): int(value) for key, value in topic_mapper.get_mappings().items()} if topic_mapper is not None else {}
+
+    version = hashlib.sha256(topic_embeddings.tobytes() + json.dumps(topics, sort_keys=True).encode("utf-8")).hexdigest()
+    metadata = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "version": version,
+        "embedding_model": embedding_model_name,
+        "topics": topics,
+        "c_tf_idf_shape": c_tf_idf_shape,
+        "vocabulary": vocabulary,
+        "topic_mapping": topic_mapping,
+        "reduction_model": has_reduction_model,
+    }
+    # Write the metadata last, so a partially written artifact is never loaded
+    with atomic_write(os.path.join(path, METADATA_FILE)) as file:
+        file.write(json.dumps(metadata).encode("utf-8"))
+    return version
+
+
+def load_topic_artifact(path):
+    """
+    Load a topic model artifact, memory-mapping its arrays.
+
+    Args:
+        path (str): The directory of the artifact.
+
+    Returns:
+        ServingTopicModel: The loaded topic model.
+
+    Raises:
+        ValueError: If the artifact has an unknown format or was fitted with another embeddings model.
+    """
+    with open(os.path.join(path, METADATA_FILE)) as file:
+        metadata = json.load(file)
+    if metadata["format_version"] != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported topic model artifact format {metadata['format_version']}.")
+    if metadata["embedding_model"] != EMBEDDINGS_MODEL_NAME:
+        raise ValueError(f"The topic model artifact was fitted with {metadata['embedding_model']}, not {EMBEDDINGS_MODEL_NAME}.")
+
+    c_tf_idf = None
+    if metadata["c_tf_idf_shape"]:
+        arrays = {name: np.load(os.path.join(path, file_name), mmap_mode="r") for name, file_name in C_TF_IDF_FILES.items()}
+        c_tf_idf = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(metadata["c_tf_idf_shape"]), copy=False)
+
+    reduction_model = None
+    if metadata["reduction_model"]:
+        import joblib
+
+        reduction_model = joblib.load(os.path.join(path, REDUCTION_MODEL_FILE), mmap_mode="r")
+
+    return ServingTopicModel(
+        metadata["topics"],
+        np.load(os.path.join(path, TOPIC_EMBEDDINGS_FILE), mmap_mode="r"),
+        c_tf_idf=c_tf_idf,
+        vocabulary=metadata["vocabulary"],
+        topic_mapping={int(key): value for key, value in metadata["topic_mapping"].items()},
+        reduction_model=reduction_model,
+        version=metadata["version"],
+    )
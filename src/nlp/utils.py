@@ -1,18 +1,11 @@
 import json
 import os
+import tempfile
+from contextlib import contextmanager
 
 import aiofiles
 import torch
 import torch.nn.functional as F
-from fastapi import FastAPI
-from scipy.spatial.distance import cosine
-
-
-# Function to access the global FastAPI application instance
-def get_application() -> FastAPI:
-    from src.main import app
-
-    return app
 
 
 async def load_json_file(file_path):
@@ -40,6 +33,35 @@ async def load_json_file(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
 
 
+@contextmanager
+def atomic_write(path):
+    """
+    Open a temporary file next to the given path for writing, and move it into place once written.
+
+    The processes sharing the path never read a partially written file: they see either the previous
+    file or the complete new one. If writing fails, the temporary file is removed and the path is left untouched.
+
+    Args:
+        path (str): The path of the file to write.
+
+    Yields:
+        file: The temporary file, opened in binary mode.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            yield file
+        # The temporary file is only readable by its owner, give it the permissions of a file created with open
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
 def mean_pooling(model_output, attention_mask):
     """
     Apply mean pooling to get the sentence embedding
@@ -58,45 +80,56 @@ def mean_pooling(model_output, attention_mask):
     return sum_embeddings / sum_mask
 
 
-def get_embedding(text):
+def encode_in_batches(texts, batch_size, embed_batch):
     """
-    Get the embedding representation of the given text.
+    Encode a list of texts in batches with the given batch embedding function.
+
+    Texts are sorted by length before batching so each batch pads to similar lengths.
 
     Parameters:
-        text (str): The input text to be embedded.
+        texts (list): The input texts to be embedded.
+        batch_size (int): The maximum number of texts passed to the model in a single forward pass.
+        embed_batch (callable): Function returning a matrix with the normalized embeddings of a batch of texts.
 
     Returns:
-        torch.Tensor: The embedding representation of the text.
+        torch.Tensor: A matrix with one normalized embedding per row, in the same order as the texts.
     """
-    app = get_application()
-    tokenizer = app.state.tokenizer
-    model = app.state.model
+    order = sorted(range(len(texts)), key=lambda position: len(texts[position]))
 
-    # Tokenize the input text and prepare it for the model
-    inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
-    # Generate the embeddings by passing the inputs to the model
-    with torch.no_grad():  # Disable gradient computation
-        outputs = model(**inputs)
-    # Extract the embeddings from the model's output, which is the mean of the last hidden state
-    embeddings = mean_pooling(outputs, inputs["attention_mask"])
+    batches = []
+    for start in range(0, len(texts), batch_size):
+        batches.append(embed_batch([texts[position] for position in order[start : start + batch_size]]))
 
-    # Normalize the embeddings
-    normalized_embeddings = F.normalize(embeddings, p=2, dim=1)
+    if not batches:
+        return torch.empty(0)
 
-    # Return the embeddings after removing the batch dimension
-    return normalized_embeddings.squeeze()
+    # Concatenate the batches into a single matrix and restore the order of the texts
+    sorted_embeddings = torch.cat(batches)
+    embeddings = torch.empty_like(sorted_embeddings)
+    embeddings[torch.tensor(order)] = sorted_embeddings
+    return embeddings
 
 
-def cosine_similarity(a, b):
+def encode_texts(tokenizer, model, texts, batch_size):
     """
-    Calculates the cosine similarity between two vectors.
+    Encode a list of texts with the embeddings model, in batches.
 
     Parameters:
-        a (numpy.ndarray): The first vector.
-        b (numpy.ndarray): The second vector.
+        tokenizer (AutoTokenizer): The tokenizer for the embeddings model.
+        model (AutoModel): The embeddings model.
+        texts (list): The input texts to be embedded.
+        batch_size (int): The maximum number of texts passed to the model in a single forward pass.
 
     Returns:
-        float: The cosine similarity between the two vectors.
+        torch.Tensor: A matrix with one normalized embedding per row, in the same order as the texts.
     """
-    # Calculate the cosine similarity, which is 1 minus the cosine distance
-    return 1 - cosine(a.detach().numpy(), b.detach().numpy())
+
+    def embed_batch(batch):
+        # Tokenize the batch, padding every text to the longest one in the batch
+        inputs = tokenizer(batch, return_tensors="pt", padding=True, truncation=True, max_length=512)
+        with torch.no_grad():  # Disable gradient computation
+            outputs = model(**inputs)
+        # Extract the embeddings from the model's output, which is the mean of the last hidden state, and normalize them
+        return F.normalize(mean_pooling(outputs, inputs["attention_mask"]), p=2, dim=1)
+
+    return encode_in_batches(texts, batch_size, embed_batch)
@@ -5,6 +5,7 @@ from async_asgi_testclient import TestClient
 
 from src.auth.service import delete_user_by_email
 from src.main import app
+from src.nlp.pipeline import NlpPipeline
 
 
 @pytest_asyncio.fixture
@@ -13,9 +14,17 @@ async def client() -> AsyncGenerator[TestClient, None]:
     scope = {"client": (host, port)}
 
     async with TestClient(app, scope=scope) as client:
+        # Wait for the NLP pipeline loaded in the background
+        await app.state.nlp_startup
         yield client
 
 
+@pytest_asyncio.fixture
+async def nlp_pipeline(client: TestClient) -> NlpPipeline:
+    # The pipeline loaded by the application at startup
+    return app.state.nlp_pipeline
+
+
 @pytest_asyncio.fixture
 async def user_cleanup():
     # No setup needed before yielding
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import pytest
+from async_asgi_testclient import TestClient
+from fastapi import status
+
+from src.auth import jwt
+from src.jobs.constants import ErrorCode
+
+
+def auth_headers(user_id: str) -> dict:
+    """Build the authorization headers of a test user."""
+
+    user = {"_id": user_id, "email": f"{user_id}@example.com", "is_admin": False}
+    return {"Authorization": f"Bearer {jwt.create_access_token(user=user)}"}
+
+
+@pytest.mark.asyncio
+async def test_job_lifecycle(client: TestClient):
+    """Tests that a submitted job is processed in the background and its results can be paged."""
+
+    lines = [
+        {"id": "first", "text": "Create a workflow for AWS and a express mongodb starter."},
+        {"id": "second", "body": "I want to use MySQL for my database."},
+        "No technologies are mentioned here.",
+    ]
+    payload = "\n".join(json.dumps(line) for line in lines)
+    headers = auth_headers("test_jobs_user")
+
+    response = await client.post("/jobs/", data=payload, headers=headers)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job = response.json()
+    assert job["total"] == 3
+
+    # Poll the job until the workers complete it
+    for _ in range(120):
+        job = (await client.get(f"/jobs/{job['id']}", headers=headers)).json()
+        if job["status"] in ("completed", "failed"):
+            break
+        await asyncio.sleep(0.5)
+    assert job["status"] == "completed"
+    assert job["processed"] == 3
+
+    first_page = (await client.get(f"/jobs/{job['id']}/results", query_string={"limit": 2}, headers=headers)).json()
+    assert [result["item_id"] for result in first_page["results"]] == ["first", "second"]
+    assert first_page["next_offset"] == 2
+
+    second_page = (await client.get(f"/jobs/{job['id']}/results", query_string={"offset": 2}, headers=headers)).json()
+    assert second_page["results"][0]["result"]["input_text"] == "No technologies are mentioned here."
+    assert second_page["next_offset"] is None
+
+
+@pytest.mark.asyncio
+async def test_job_not_found_for_other_user(client: TestClient):
+    """Tests that a job is not visible to other users."""
+
+    response = await client.post("/jobs/", data='"I want to use MySQL."', headers=auth_headers("test_jobs_owner"))
+    job_id = response.json()["id"]
+
+    response = await client.get(f"/jobs/{job_id}", headers=auth_headers("test_jobs_other"))
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == ErrorCode.JOB_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_job_invalid_payload(client: TestClient):
+    """Tests that a payload that is not JSON lines is rejected."""
+
+    response = await client.post("/jobs/", data="not json", headers=auth_headers("test_jobs_user"))
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == ErrorCode.INVALID_JOB_PAYLOAD
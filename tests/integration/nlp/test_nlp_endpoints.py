@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from async_asgi_testclient import TestClient
 from fastapi import status
@@ -27,6 +29,62 @@ async def test_process_endpoint(client: TestClient, auth_token: str):
     assert "extracted_entities" in response.json()[0]
 
 
+@pytest.mark.asyncio
+async def test_process_endpoint_multiple_texts(client: TestClient, auth_token: str):
+    """Test case for the /nlp/process/ endpoint with a batch of texts."""
+
+    texts = [
+        "Create a workflow for AWS and a express mongodb starter.",
+        "I want to use MySQL for my database.",
+        "No technologies are mentioned here.",
+    ]
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = await client.post("/nlp/process/", json={"texts": texts}, headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [result["input_text"] for result in response.json()] == texts
+    assert response.json()[2]["extracted_entities"] == []
+
+
+@pytest.mark.asyncio
+async def test_process_stream_endpoint(client: TestClient, auth_token: str):
+    """Test case for the /nlp/process/stream/ endpoint."""
+
+    texts = [
+        "Create a workflow for AWS and a express mongodb starter.",
+        "I want to use MySQL for my database.",
+        "No technologies are mentioned here.",
+    ]
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = await client.post("/nlp/process/stream/", json={"texts": texts}, headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert [line["input_text"] for line in lines] == texts
+
+
+@pytest.mark.asyncio
+async def test_process_stream_endpoint_reports_unexpected_error(client: TestClient, auth_token: str, nlp_pipeline, monkeypatch):
+    """Tests that an unexpected error after the stream started is written as the last line."""
+
+    async def stream(texts, chunk_size):
+        yield 0, {"input_text": texts[0], "predicted_topic_name": "", "extracted_entities": [], "recommendations": []}
+        raise RuntimeError("The model failed")
+
+    monkeypatch.setattr(nlp_pipeline, "stream", stream)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = await client.post("/nlp/process/stream/", json={"texts": ["First text.", "Second text."]}, headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["index"] == 0
+    assert lines[1] == {"index": 1, "error": "Server error"}
+
+
 @pytest.mark.asyncio
 async def test_match_blueprints_endpoint(client: TestClient, auth_token: str):
     """Test case for the /nlp/match-blueprints/ endpoint."""
@@ -51,6 +109,121 @@ async def test_match_blueprints_endpoint(client: TestClient, auth_token: str):
     assert len(response.json()[0]["matched_blueprints"]) > 0
 
 
+@pytest.mark.asyncio
+async def test_match_blueprints_endpoint_top_k(client: TestClient, auth_token: str):
+    """Test case for the top_k parameter of the /nlp/match-blueprints/ endpoint."""
+
+    recommendations = [
+        {
+            "input_text": "Create an express mongodb starter.",
+            "predicted_topic_name": "Web Development",
+            "extracted_entities": [{"category": "Backend", "entity_name": "Express.js", "score": 1.0}],
+            "recommendations": [{"category": "Backend", "recommendation": "Express.js"}],
+        }
+    ]
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    top_1 = await client.post("/nlp/match-blueprints/", json=recommendations, headers=headers)
+    top_3 = await client.post("/nlp/match-blueprints/?top_k=3", json=recommendations, headers=headers)
+    invalid = await client.post("/nlp/match-blueprints/?top_k=0", json=recommendations, headers=headers)
+
+    assert top_1.status_code == top_3.status_code == status.HTTP_200_OK
+    assert len(top_3.json()[0]["matched_blueprints"]) >= len(top_1.json()[0]["matched_blueprints"])
+    assert all("score" in blueprint for blueprint in top_3.json()[0]["matched_blueprints"])
+    assert invalid.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_process_and_match_endpoint(client: TestClient, auth_token: str):
+    """Test case for the /nlp/process-and-match/ endpoint, which returns the results of /nlp/process/ then /nlp/match-blueprints/."""
+
+    texts = ["Create a workflow for AWS and a express mongodb starter.", "A React frontend with a Django backend."]
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    response = await client.post("/nlp/process-and-match/?top_k=2", json={"texts": texts}, headers=headers)
+    processed = await client.post("/nlp/process/", json={"texts": texts}, headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    assert [result["input_text"] for result in results] == texts
+    assert [{key: value for key, value in result.items() if key != "matched_blueprints"} for result in results] == processed.json()
+    for result, recommendation in zip(results, processed.json()):
+        matched = await client.post("/nlp/match-blueprints/?top_k=2", json=[recommendation], headers=headers)
+        assert result["matched_blueprints"] == matched.json()[0]["matched_blueprints"]
+
+
+@pytest.mark.asyncio
+async def test_reload_catalog_endpoint(client: TestClient):
+    """Test case for the /nlp/catalog/reload/ endpoint."""
+
+    admin_user = {"_id": "test_admin_id", "email": "admin@example.com", "is_admin": True}
+    headers = {"Authorization": f"Bearer {jwt.create_access_token(user=admin_user)}"}
+    response = await client.post("/nlp/catalog/reload/", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["entities"] > 0
+
+
+@pytest.mark.asyncio
+async def test_reload_catalog_endpoint_invalid_file(client: TestClient, nlp_pipeline, monkeypatch, tmp_path):
+    """Tests that reloading a missing or invalid tech entities file returns a 400 and keeps the previous catalog."""
+
+    admin_user = {"_id": "test_admin_id", "email": "admin@example.com", "is_admin": True}
+    headers = {"Authorization": f"Bearer {jwt.create_access_token(user=admin_user)}"}
+    catalog = nlp_pipeline.entity_catalog
+    invalid_path = tmp_path / "tech_entities.json"
+    invalid_path.write_text('{"MySQL": {')
+
+    for path in [tmp_path / "missing.json", invalid_path]:
+        monkeypatch.setattr(catalog, "path", str(path))
+        response = await client.post("/nlp/catalog/reload/", headers=headers)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert nlp_pipeline.entity_catalog is catalog
+
+
+@pytest.mark.asyncio
+async def test_reload_catalog_endpoint_requires_admin(client: TestClient, auth_token: str):
+    """Tests that reloading the catalog is restricted to admin users."""
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = await client.post("/nlp/catalog/reload/", headers=headers)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_reload_blueprints_endpoint(client: TestClient):
+    """Test case for the /nlp/blueprints/reload/ endpoint."""
+
+    admin_user = {"_id": "test_admin_id", "email": "admin@example.com", "is_admin": True}
+    headers = {"Authorization": f"Bearer {jwt.create_access_token(user=admin_user)}"}
+    response = await client.post("/nlp/blueprints/reload/", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["blueprints"] > 0
+
+
+@pytest.mark.asyncio
+async def test_reload_blueprints_endpoint_invalid_file(client: TestClient, nlp_pipeline, monkeypatch, tmp_path):
+    """Tests that reloading a missing blueprints file returns a 404, an invalid one a 400, and both keep the previous catalog."""
+
+    admin_user = {"_id": "test_admin_id", "email": "admin@example.com", "is_admin": True}
+    headers = {"Authorization": f"Bearer {jwt.create_access_token(user=admin_user)}"}
+    catalog = nlp_pipeline.blueprint_catalog
+    invalid_path = tmp_path / "blueprints_metadata.json"
+    invalid_path.write_text("[{")
+
+    # A missing file, a file that is not a valid corpus, and a path that cannot be read as a file
+    cases = [(tmp_path / "missing.json", status.HTTP_404_NOT_FOUND), (invalid_path, status.HTTP_400_BAD_REQUEST), (tmp_path, status.HTTP_400_BAD_REQUEST)]
+    for path, status_code in cases:
+        monkeypatch.setattr(catalog, "path", str(path))
+        response = await client.post("/nlp/blueprints/reload/", headers=headers)
+
+        assert response.status_code == status_code
+        assert nlp_pipeline.blueprint_catalog is catalog
+
+
 @pytest.mark.asyncio
 async def test_protected_endpoint_unauthorized(client: TestClient):
     """Tests that a protected endpoint requires authentication."""
@@ -68,3 +241,14 @@ async def test_protected_endpoint_invalid_token(client: TestClient):
     response = await client.post("/nlp/match-blueprints/", headers=headers)
 
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_readiness_endpoint(client: TestClient):
+    """Test case for the /readiness endpoint once the NLP pipeline is loaded."""
+
+    response = await client.get("/readiness")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "ready"
+    assert all(component["status"] == "ready" for component in response.json()["components"].values())
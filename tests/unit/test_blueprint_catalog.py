@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+from src.nlp.config import nlp_config
+from src.nlp.services.blueprint_catalog import load_blueprint_catalog, reload_blueprint_catalog, validate_blueprints, watch_blueprint_catalog
+
+
+@pytest.fixture
+def blueprints_path(tmp_path):
+    """Fixture copying the blueprints file to a temporary path."""
+
+    path = tmp_path / "blueprints_metadata.json"
+    shutil.copy(nlp_config.BLUEPRINTS_DIR, path)
+    return str(path)
+
+
+def test_load_blueprint_catalog(blueprints_path):
+    """Tests that the catalog holds the validated blueprints and their index."""
+
+    catalog = load_blueprint_catalog(blueprints_path)
+
+    assert len(catalog) > 0
+    assert len(catalog.index) == len(catalog)
+    assert catalog.index.postings["MongoDB"]
+    assert not catalog.is_stale()
+
+
+@pytest.mark.parametrize(
+    "blueprints",
+    [
+        {"name": "Not a list"},
+        ["Not an object"],
+        [{"name": "Express", "path": "backend/express", "description": ""}],
+        [{"name": "Express", "path": "backend/express", "description": "", "tags": ["Node.js", 1]}],
+        [{"name": "Express", "path": "backend/express", "description": "", "tags": [], "type": 1}],
+    ],
+)
+def test_validate_blueprints_invalid(blueprints):
+    """Tests that malformed blueprints corpora are rejected."""
+
+    with pytest.raises(ValueError):
+        validate_blueprints(blueprints)
+
+
+@pytest.mark.asyncio
+async def test_reload_blueprint_catalog(blueprints_path):
+    """Tests that a reload swaps in the modified file, and keeps the previous catalog if the file is invalid."""
+
+    class Pipeline:
+        blueprint_catalog_lock = asyncio.Lock()
+
+    pipeline = Pipeline()
+    pipeline.blueprint_catalog = load_blueprint_catalog(blueprints_path)
+    previous_version = pipeline.blueprint_catalog.version
+
+    with open(blueprints_path) as file:
+        blueprints = json.load(file)
+    with open(blueprints_path, "w") as file:
+        json.dump(blueprints[:1], file)
+    stat = os.stat(blueprints_path)
+    os.utime(blueprints_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert pipeline.blueprint_catalog.is_stale()
+
+    catalog = await reload_blueprint_catalog(pipeline)
+    assert len(catalog) == 1
+    assert pipeline.blueprint_catalog.version != previous_version
+
+    with open(blueprints_path, "w") as file:
+        file.write("[{")
+    with pytest.raises(ValueError):
+        await reload_blueprint_catalog(pipeline)
+    assert pipeline.blueprint_catalog is catalog
+
+
+@pytest.mark.asyncio
+async def test_watch_blueprint_catalog_attempts_invalid_file_once(blueprints_path, monkeypatch):
+    """Tests that the watcher keeps the previous catalog on an invalid file, and loads the file only once until it is modified."""
+
+    class Pipeline:
+        blueprint_catalog_lock = asyncio.Lock()
+
+    pipeline = Pipeline()
+    catalog = pipeline.blueprint_catalog = load_blueprint_catalog(blueprints_path)
+
+    attempts = []
+
+    def load(path):
+        attempts.append(path)
+        return load_blueprint_catalog(path)
+
+    monkeypatch.setattr("src.nlp.services.blueprint_catalog.load_blueprint_catalog", load)
+    with open(blueprints_path, "w") as file:
+        file.write("[{")
+    stat = os.stat(blueprints_path)
+    os.utime(blueprints_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    watcher = asyncio.create_task(watch_blueprint_catalog(pipeline, 0.01))
+    await asyncio.sleep(0.2)
+    assert len(attempts) == 1
+    assert pipeline.blueprint_catalog is catalog
+    assert not catalog.is_stale()
+
+    # Once the file is fixed, the watcher loads it again
+    with open(blueprints_path, "w") as file:
+        json.dump([{"name": "Express", "path": "backend/express", "description": "", "tags": ["Express.js"]}], file)
+    os.utime(blueprints_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    await asyncio.sleep(0.2)
+    watcher.cancel()
+    await asyncio.gather(watcher, return_exceptions=True)
+
+    assert len(attempts) == 2
+    assert len(pipeline.blueprint_catalog) == 1
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from src.nlp.cache import LRUCache, normalize_text, text_cache_key
+from src.nlp.result_cache import ResultCache, result_nbytes
+
+
+def test_text_cache_key_normalizes_whitespace():
+    """Tests that texts differing only by whitespace share the same cache key."""
+
+    assert normalize_text("  MySQL\tversus \n MongoDB ") == "MySQL versus MongoDB"
+    assert text_cache_key("MySQL  versus MongoDB") == text_cache_key(" MySQL versus\nMongoDB")
+    assert text_cache_key("MySQL versus MongoDB") != text_cache_key("MySQL versus PostgreSQL")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Tests that the cache evicts the least recently used entries beyond its size bound."""
+
+    cache = LRUCache(max_bytes=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now the most recently used entry
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 1, "expirations": 0, "entries": 2, "bytes": 2, "max_bytes": 2}
+
+
+def test_lru_cache_bounds_total_size():
+    """Tests that the cache accounts for the size of each value."""
+
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.set("a", "12345")
+    cache.set("b", "123456")
+    cache.set("c", "12345678901")  # Larger than the whole cache, not cached
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "123456"
+    assert cache.get("c") is None
+    assert cache.stats()["bytes"] == 6
+
+
+def test_lru_cache_expires_entries():
+    """Tests that entries expire after the time to live."""
+
+    cache = LRUCache(max_bytes=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_result_cache_is_invalidated_by_fingerprint():
+    """Tests that cached results are only served for the fingerprint they were computed with."""
+
+    result_cache = ResultCache(LRUCache(max_bytes=1024 * 1024, sizeof=result_nbytes))
+    result = {"input_text": "I want to use MySQL.", "predicted_topic_name": "0_databases", "extracted_entities": [], "recommendations": []}
+
+    assert await result_cache.get_many(["I want to use MySQL."], "v1") == {}
+    await result_cache.set_many({"I want to use MySQL.": result}, "v1")
+    assert await result_cache.get_many(["I want to use MySQL.", "Something else."], "v1") == {"I want to use MySQL.": result}
+
+    # A new catalog or model version invalidates the cached results
+    assert await result_cache.get_many(["I want to use MySQL."], "v2") == {}
+    assert len(result_cache.memory) == 0
+
+    # Results computed with the previous version are not cached anymore
+    await result_cache.set_many({"I want to use MySQL.": result}, "v1")
+    assert len(result_cache.memory) == 0
@@ -0,0 +1,51 @@
+import pytest
+import typer
+
+from src.cli import read_chunks, read_items
+
+
+def test_read_items(tmp_path):
+    """Tests that JSON lines and plain text inputs are read line by line."""
+
+    jsonl_path = tmp_path / "input.jsonl"
+    jsonl_path.write_text('{"id": "a", "text": "I want to use MySQL."}\n\n{"request_id": "b", "body": "React and Express.js."}\n')
+    text_path = tmp_path / "input.txt"
+    text_path.write_text("I want to use MySQL.\n\nReact and Express.js.\n")
+
+    assert list(read_items(str(jsonl_path), plain_text=False)) == [{"id": "a", "text": "I want to use MySQL."}, {"id": "b", "text": "React and Express.js."}]
+    assert list(read_items(str(text_path), plain_text=True)) == [{"id": None, "text": "I want to use MySQL."}, {"id": None, "text": "React and Express.js."}]
+
+
+def test_read_items_crlf(tmp_path):
+    """Tests that plain text inputs with Windows line endings are read without the carriage returns."""
+
+    text_path = tmp_path / "input.txt"
+    text_path.write_bytes(b"I want to use MySQL.\r\n\r\nReact and Express.js.\r\n")
+
+    assert list(read_items(str(text_path), plain_text=True)) == [{"id": None, "text": "I want to use MySQL."}, {"id": None, "text": "React and Express.js."}]
+
+
+def test_read_items_invalid_line(tmp_path):
+    """Tests that a line without a text reports its line number."""
+
+    path = tmp_path / "input.jsonl"
+    path.write_text('{"text": "I want to use MySQL."}\n{"id": 2}\n')
+
+    with pytest.raises(typer.BadParameter, match="Line 2 .* has no `text` or `body` field"):
+        list(read_items(str(path), plain_text=False))
+
+
+def test_read_items_invalid_json(tmp_path):
+    """Tests that a line that is not valid JSON reports its line number and the parse error."""
+
+    path = tmp_path / "input.jsonl"
+    path.write_text('{"text": "I want to use MySQL."}\n{"text": "React\n')
+
+    with pytest.raises(typer.BadParameter, match="Line 2 .* is not valid JSON: .*column"):
+        list(read_items(str(path), plain_text=False))
+
+
+def test_read_chunks():
+    """Tests that items are grouped into chunks, the last one possibly smaller."""
+
+    assert list(read_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+import torch
+
+from src.nlp.backends import OnnxEmbeddingBackend, TorchEmbeddingBackend, export_onnx_model, quantize_onnx_model, write_model_atomically
+from src.nlp.constants import EmbeddingBackendKind
+from src.nlp.models import load_embeddings_model
+
+pytest.importorskip("onnxruntime")
+
+TEXTS = [
+    "I want to build a web application with React and a Node.js backend.",
+    "MySQL is a relational database.",
+    "Deploy the services on Kubernetes.",
+]
+
+
+def test_onnx_backends_match_torch_backend(tmp_path):
+    """Tests that the ONNX exports of the embeddings model produce the same embeddings as the PyTorch model."""
+
+    tokenizer, model = load_embeddings_model()
+    model_path = os.path.join(tmp_path, "model.onnx")
+    quantized_model_path = os.path.join(tmp_path, "model-int8.onnx")
+    export_onnx_model(tokenizer, model, model_path)
+    quantize_onnx_model(model_path, quantized_model_path)
+
+    expected = TorchEmbeddingBackend(tokenizer, model).encode(TEXTS, 2)
+    onnx_embeddings = OnnxEmbeddingBackend(tokenizer, model_path).encode(TEXTS, 2)
+    int8_embeddings = OnnxEmbeddingBackend(tokenizer, quantized_model_path, EmbeddingBackendKind.ONNX_INT8).encode(TEXTS, 2)
+
+    assert onnx_embeddings.shape == expected.shape
+    assert torch.allclose(onnx_embeddings, expected, atol=1e-4)
+    # Quantization to int8 only approximately preserves the direction of the embeddings
+    assert torch.all((int8_embeddings * expected).sum(dim=1) > 0.98)
+
+
+def test_write_model_atomically(tmp_path):
+    """Tests that a model file only appears once fully written, and a failed write leaves nothing behind."""
+
+    model_path = os.path.join(tmp_path, "onnx", "model.onnx")
+
+    def write(path):
+        with open(path, "wb") as file:
+            file.write(b"graph")
+
+    def write_and_fail(path):
+        write(path)
+        raise RuntimeError("Export failed")
+
+    with pytest.raises(RuntimeError):
+        write_model_atomically(write_and_fail, model_path)
+    assert os.listdir(os.path.dirname(model_path)) == []
+
+    write_model_atomically(write, model_path)
+    assert os.listdir(os.path.dirname(model_path)) == ["model.onnx"]
+    with open(model_path, "rb") as file:
+        assert file.read() == b"graph"
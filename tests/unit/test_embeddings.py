@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import torch
+
+from src.nlp.cache import LRUCache
+from src.nlp.embeddings import EmbeddingService, tensor_nbytes
+from src.nlp.pipeline import NlpPipeline
+
+
+@pytest.mark.asyncio
+async def test_embedding_service_coalesces_concurrent_requests(nlp_pipeline: NlpPipeline):
+    """Tests that concurrent requests are encoded together and each gets the embeddings of its own texts."""
+
+    texts = [["MySQL is a relational database."], ["MongoDB stores documents.", "React renders user interfaces."], ["Express.js is a web framework."]]
+    service = EmbeddingService(nlp_pipeline.embedding_backend, max_batch_size=64, max_wait_ms=50)
+    try:
+        with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+            results = list(pool.map(service.encode, texts))
+    finally:
+        service.close()
+
+    for request_texts, embeddings in zip(texts, results):
+        expected = nlp_pipeline.embedding_backend.encode(request_texts, 64)
+        assert embeddings.shape == expected.shape
+        assert torch.allclose(embeddings, expected, atol=1e-4)
+
+
+@pytest.mark.asyncio
+async def test_embedding_service_aencode(nlp_pipeline: NlpPipeline):
+    """Tests that the embedding service can be awaited from the event loop."""
+
+    service = EmbeddingService(nlp_pipeline.embedding_backend)
+    try:
+        embeddings = await service.aencode(["MySQL is a relational database."])
+        assert await service.aencode([]) is not None
+    finally:
+        service.close()
+
+    assert embeddings.shape[0] == 1
+    assert torch.linalg.norm(embeddings[0]).item() == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_embedding_service_cache(nlp_pipeline: NlpPipeline):
+    """Tests that cached embeddings are served without changing the results."""
+
+    cache = LRUCache(max_bytes=1024 * 1024, ttl=60, sizeof=tensor_nbytes)
+    service = EmbeddingService(nlp_pipeline.embedding_backend, cache=cache)
+    try:
+        first = service.encode(["MySQL is a relational database.", "MongoDB stores documents."])
+        second = service.encode(["MongoDB  stores documents.", "MySQL is a relational database.", "React renders user interfaces."])
+    finally:
+        service.close()
+
+    assert torch.allclose(second[0], first[1])
+    assert torch.allclose(second[1], first[0])
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["entries"] == 3
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from src.nlp.config import nlp_config
+from src.nlp.pipeline import NlpPipeline
+from src.nlp.services.entity_catalog import (
+    load_entity_catalog,
+    reload_entity_catalog,
+    reload_entity_catalog_if_stale,
+    validate_tech_entities,
+    watch_entity_catalog,
+)
+from src.nlp.services.entity_extraction import extract_tech_entities
+
+MYSQL_ENTITY = {
+    "type": "Database",
+    "category": "Relational Database",
+    "description": "An open-source relational database management system.",
+    "score": 0.9,
+    "patterns": [[{"LOWER": "mysql"}]],
+}
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    """Fixture copying the tech entities file to a temporary path."""
+
+    path = tmp_path / "tech_entities.json"
+    shutil.copy(nlp_config.CORPUS_DIR, path)
+    return str(path)
+
+
+@pytest.fixture
+def catalog_config(tmp_path):
+    """Fixture of the settings of a pipeline caching its entity index in a temporary directory."""
+
+    return nlp_config.model_copy(update={"ENTITY_INDEX_PATH": str(tmp_path / "entity_index.npz")})
+
+
+@pytest.mark.asyncio
+async def test_load_entity_catalog(nlp_pipeline: NlpPipeline, catalog_path):
+    """Tests that the catalog holds the entities, a working matcher and the entity embeddings."""
+
+    catalog = load_entity_catalog(nlp_pipeline.nlp, nlp_pipeline.embed, nlp_pipeline.embedding_model_id, catalog_path, nlp_pipeline.config.ENTITY_INDEX_PATH)
+
+    assert "MySQL" in catalog.tech_entities
+    assert "MySQL" in catalog.entity_index
+    entities = extract_tech_entities("I want to use MySQL for my database.", catalog.tech_entities, catalog.matcher, nlp_pipeline.nlp)
+    assert entities[0]["entity"] == "MySQL"
+    assert not catalog.is_stale()
+
+
+@pytest.mark.asyncio
+async def test_reload_entity_catalog_if_stale(nlp_pipeline: NlpPipeline, catalog_path, catalog_config):
+    """Tests that the catalog is reloaded only once its file is modified."""
+
+    class Pipeline:
+        nlp = nlp_pipeline.nlp
+        embed = staticmethod(nlp_pipeline.embed)
+        embedding_model_id = nlp_pipeline.embedding_model_id
+        config = catalog_config
+
+    pipeline = Pipeline()
+    pipeline.entity_catalog = load_entity_catalog(pipeline.nlp, pipeline.embed, pipeline.embedding_model_id, catalog_path, pipeline.config.ENTITY_INDEX_PATH)
+    assert not reload_entity_catalog_if_stale(pipeline)
+
+    stat = os.stat(catalog_path)
+    os.utime(catalog_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert reload_entity_catalog_if_stale(pipeline)
+    assert not pipeline.entity_catalog.is_stale()
+
+
+@pytest.mark.asyncio
+async def test_reload_entity_catalog_if_stale_keeps_previous_on_invalid_file(nlp_pipeline: NlpPipeline, catalog_path, catalog_config):
+    """Tests that an invalid catalog file keeps the previous catalog, and is not parsed again until it is modified."""
+
+    class Pipeline:
+        nlp = nlp_pipeline.nlp
+        embed = staticmethod(nlp_pipeline.embed)
+        embedding_model_id = nlp_pipeline.embedding_model_id
+        config = catalog_config
+
+    pipeline = Pipeline()
+    catalog = pipeline.entity_catalog = load_entity_catalog(
+        pipeline.nlp, pipeline.embed, pipeline.embedding_model_id, catalog_path, pipeline.config.ENTITY_INDEX_PATH
+    )
+
+    with open(catalog_path, "w") as file:
+        file.write('{"MySQL": {')
+    stat = os.stat(catalog_path)
+    os.utime(catalog_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert not reload_entity_catalog_if_stale(pipeline)
+    assert pipeline.entity_catalog is catalog
+    assert not catalog.is_stale()
+
+    with open(catalog_path, "w") as file:
+        json.dump({"MySQL": dict(MYSQL_ENTITY)}, file)
+    os.utime(catalog_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    assert reload_entity_catalog_if_stale(pipeline)
+    assert list(pipeline.entity_catalog.tech_entities) == ["MySQL"]
+
+
+@pytest.mark.asyncio
+async def test_watch_entity_catalog_attempts_invalid_file_once(nlp_pipeline: NlpPipeline, catalog_path, catalog_config, monkeypatch):
+    """Tests that the watcher keeps the previous catalog on an invalid file, and loads the file only once until it is modified."""
+
+    class Pipeline:
+        nlp = nlp_pipeline.nlp
+        embed = staticmethod(nlp_pipeline.embed)
+        embedding_model_id = nlp_pipeline.embedding_model_id
+        config = catalog_config
+        entity_catalog_lock = asyncio.Lock()
+
+    pipeline = Pipeline()
+    catalog = pipeline.entity_catalog = load_entity_catalog(
+        pipeline.nlp, pipeline.embed, pipeline.embedding_model_id, catalog_path, pipeline.config.ENTITY_INDEX_PATH
+    )
+
+    attempts = []
+
+    def load(*args):
+        attempts.append(args)
+        return load_entity_catalog(*args)
+
+    monkeypatch.setattr("src.nlp.services.entity_catalog.load_entity_catalog", load)
+    with open(catalog_path, "w") as file:
+        file.write('{"MySQL": {')
+    stat = os.stat(catalog_path)
+    os.utime(catalog_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    watcher = asyncio.create_task(watch_entity_catalog(pipeline, 0.01))
+    await asyncio.sleep(0.2)
+    watcher.cancel()
+    await asyncio.gather(watcher, return_exceptions=True)
+
+    assert len(attempts) == 1
+    assert pipeline.entity_catalog is catalog
+    assert not catalog.is_stale()
+
+
+@pytest.mark.asyncio
+async def test_reload_entity_catalog_waits_for_thread_when_cancelled(monkeypatch):
+    """Tests that a cancelled reload returns only once the thread loading the catalog is done."""
+
+    class Pipeline:
+        entity_catalog = None
+        entity_catalog_lock = asyncio.Lock()
+
+    done = threading.Event()
+
+    def rebuild_entity_catalog(pipeline):
+        time.sleep(0.2)
+        done.set()
+
+    monkeypatch.setattr("src.nlp.services.entity_catalog.rebuild_entity_catalog", rebuild_entity_catalog)
+    reload = asyncio.create_task(reload_entity_catalog(Pipeline()))
+    await asyncio.sleep(0.05)
+    reload.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await reload
+    assert done.is_set()
+
+
+@pytest.mark.parametrize(
+    "tech_entities",
+    [
+        ["MySQL"],
+        {"MySQL": "Not an object"},
+        {"MySQL": {}},
+        {"MySQL": {**MYSQL_ENTITY, "patterns": ["mysql"]}},
+        {"MySQL": {key: value for key, value in MYSQL_ENTITY.items() if key != "category"}},
+        {"MySQL": {**MYSQL_ENTITY, "description": None}},
+        {"MySQL": {**MYSQL_ENTITY, "score": "0.9"}},
+        {"MySQL": {**MYSQL_ENTITY, "score": True}},
+        {"MySQL": {**MYSQL_ENTITY, "relatedTechnologies": "MariaDB"}},
+    ],
+)
+def test_validate_tech_entities_invalid(tech_entities):
+    """Tests that malformed tech entities are rejected."""
+
+    with pytest.raises(ValueError):
+        validate_tech_entities(tech_entities)
+
+
+def test_validate_tech_entities_corpus():
+    """Tests that the tech entities file of the application is valid."""
+
+    with open(nlp_config.CORPUS_DIR) as file:
+        validate_tech_entities(json.load(file))
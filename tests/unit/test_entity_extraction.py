@@ -1,7 +1,9 @@
 import pytest
 
+from src.nlp.models import load_spacy_model
 from src.nlp.services.entity_extraction import (
     extract_tech_entities,
+    extract_tech_entities_batch,
     initialize_matcher_with_patterns,
     load_tech_entities,
 )
@@ -14,12 +16,19 @@ async def tech_entities():
     return await load_tech_entities()
 
 
+@pytest.fixture(scope="module")
+def nlp():
+    """Fixture to load the spaCy model once for the module."""
+
+    return load_spacy_model()
+
+
 @pytest.fixture
-def matcher(event_loop):
+def matcher(event_loop, nlp):
     """Fixture to initialize the Matcher with the patterns."""
 
     tech_entities = event_loop.run_until_complete(load_tech_entities())
-    return initialize_matcher_with_patterns(tech_entities)
+    return initialize_matcher_with_patterns(tech_entities, nlp.vocab)
 
 
 @pytest.mark.asyncio
@@ -37,34 +46,34 @@ def test_initialize_matcher_with_patterns(matcher):
 
 
 @pytest.mark.asyncio
-async def test_extract_tech_entities_single_entity(matcher, tech_entities):
+async def test_extract_tech_entities_single_entity(matcher, tech_entities, nlp):
     """Tests that the extract_tech_entities() function correctly extracts a single entity."""
 
     text = "I want to use MySQL for my database."
     # Only await tech_entities, as matcher is already awaited in the fixture
-    entities = extract_tech_entities(text, await tech_entities, matcher)
+    entities = extract_tech_entities(text, await tech_entities, matcher, nlp)
     assert len(entities) == 1
     assert entities[0]["entity"] == "MySQL"
 
 
 @pytest.mark.asyncio
-async def test_extract_tech_entities_multiple_entities(matcher, tech_entities):
+async def test_extract_tech_entities_multiple_entities(matcher, tech_entities, nlp):
     """Tests that the extract_tech_entities() function correctly extracts multiple entities."""
 
     text = "In comparing database management systems, we're evaluating the performance and features of MySQL versus MongoDB to determine the best fit."
     # Only await tech_entities, as matcher is already awaited in the fixture
-    entities = extract_tech_entities(text, await tech_entities, matcher)
+    entities = extract_tech_entities(text, await tech_entities, matcher, nlp)
     assert len(entities) == 2
     assert entities[0]["entity"] == "MySQL"
     assert entities[1]["entity"] == "MongoDB"
 
 
 @pytest.mark.asyncio
-async def test_extract_tech_entities_different_types(matcher, tech_entities):
+async def test_extract_tech_entities_different_types(matcher, tech_entities, nlp):
     """Tests extraction of entities with different types."""
 
     text = "I'm building a web app with React and NodeJS, using MongoDB for the database."
-    entities = extract_tech_entities(text, await tech_entities, matcher)
+    entities = extract_tech_entities(text, await tech_entities, matcher, nlp)
     assert len(entities) == 3
     assert entities[0]["type"] == "JavaScript Library"  # React
     assert entities[1]["type"] == "Runtime Environment"  # NodeJS
@@ -72,10 +81,25 @@ async def test_extract_tech_entities_different_types(matcher, tech_entities):
 
 
 @pytest.mark.asyncio
-async def test_extract_tech_entities_fuzzy_matching(matcher, tech_entities):
+async def test_extract_tech_entities_fuzzy_matching(matcher, tech_entities, nlp):
     """Tests fuzzy matching capabilities."""
 
     text = "I'm considering using Google Croud for my project."
-    entities = extract_tech_entities(text, await tech_entities, matcher)
+    entities = extract_tech_entities(text, await tech_entities, matcher, nlp)
     assert len(entities) == 1
     assert entities[0]["entity"] == "GoogleCloud"
+
+
+@pytest.mark.asyncio
+async def test_extract_tech_entities_batch(matcher, tech_entities, nlp):
+    """Tests that batch extraction returns the same entities as extracting each text on its own."""
+
+    texts = [
+        "I want to use MySQL for my database.",
+        "I'm building a web app with React and NodeJS, using MongoDB for the database.",
+        "No technologies are mentioned here.",
+    ]
+    entities = await tech_entities
+    batch_entities = extract_tech_entities_batch(texts, entities, matcher, nlp)
+    assert batch_entities == [extract_tech_entities(text, entities, matcher, nlp) for text in texts]
+    assert batch_entities[2] == []
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.nlp.exceptions import InferenceQueueFull
+from src.nlp.executor import InferenceExecutor
+
+
+@pytest.mark.asyncio
+async def test_inference_executor_runs_function():
+    """Tests that the inference executor returns the result of the submitted function."""
+
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+    try:
+        assert await executor.run(sum, [1, 2, 3]) == 6
+        assert executor.pending == 0
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_inference_executor_rejects_when_saturated():
+    """Tests that the inference executor rejects tasks once the workers and the queue are full."""
+
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+    release = threading.Event()
+    try:
+        # Start a blocking task, then submit a second one while it still holds the only slot
+        task = asyncio.ensure_future(executor.run(release.wait))
+        while executor.pending == 0:
+            await asyncio.sleep(0)
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(sum, [1])
+        release.set()
+        assert await task is True
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_inference_executor_keeps_slot_of_cancelled_request():
+    """Tests that a task keeps its slot until it is done, even when the request waiting for it is cancelled."""
+
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+    release = threading.Event()
+    try:
+        task = asyncio.ensure_future(executor.run(release.wait))
+        while executor.pending == 0:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The cancelled request's task still runs on the only worker
+        assert executor.pending == 1
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(sum, [1])
+
+        release.set()
+        while executor.pending:
+            await asyncio.sleep(0.01)
+        assert await executor.run(sum, [1, 2]) == 3
+    finally:
+        release.set()
+        executor.shutdown()
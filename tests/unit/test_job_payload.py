@@ -0,0 +1,63 @@
+import pytest
+
+from src.jobs.exceptions import EmptyJobPayload, InvalidJobPayload, JobItemTooLarge, JobPayloadTooLarge
+from src.jobs.service import parse_job_payload, split_chunks
+
+
+def test_parse_job_payload():
+    """Tests that strings, text and body lines are parsed and blank lines skipped."""
+
+    payload = b'"I want to use MySQL."\n\n{"id": 7, "text": "React and Express.js."}\n{"request_id": "user-001", "title": "Cache", "body": "Cache results."}\n'
+
+    items = parse_job_payload(payload)
+
+    assert items == [
+        {"id": None, "text": "I want to use MySQL."},
+        {"id": "7", "text": "React and Express.js."},
+        {"id": "user-001", "text": "Cache results."},
+    ]
+
+
+@pytest.mark.parametrize("payload", [b"not json\n", b'{"id": 1}\n', b"[1, 2]\n", b'{"text": "  "}\n', b"\xff\xfe"])
+def test_parse_job_payload_invalid(payload):
+    """Tests that lines without a text are rejected."""
+
+    with pytest.raises(InvalidJobPayload):
+        parse_job_payload(payload)
+
+
+def test_parse_job_payload_empty():
+    """Tests that an empty payload is rejected."""
+
+    with pytest.raises(EmptyJobPayload):
+        parse_job_payload(b"\n\n")
+
+
+def test_parse_job_payload_too_large():
+    """Tests that a payload with more texts than a job accepts is rejected, blank lines aside."""
+
+    payload = b'"I want to use MySQL."\n\n"React and Express.js."\n'
+
+    assert len(parse_job_payload(payload, max_items=2)) == 2
+    with pytest.raises(JobPayloadTooLarge):
+        parse_job_payload(payload, max_items=1)
+
+
+def test_parse_job_payload_item_too_large():
+    """Tests that a payload with a text larger than a job accepts is rejected, counting its ID and its UTF-8 encoding."""
+
+    payload = '{"id": "é", "text": "MySQL"}\n'.encode("utf-8")
+
+    assert len(parse_job_payload(payload, max_item_bytes=7)) == 1
+    with pytest.raises(JobItemTooLarge):
+        parse_job_payload(payload, max_item_bytes=6)
+
+
+def test_split_chunks():
+    """Tests that chunks are limited both in number of items and in bytes, and an oversized item gets its own chunk."""
+
+    items = [{"id": None, "text": text} for text in ["a" * 4, "b" * 4, "c" * 10, "d" * 2, "e" * 2, "f" * 2]]
+
+    assert split_chunks(items, chunk_size=2) == [(0, 2), (2, 4), (4, 6)]
+    assert split_chunks(items, chunk_size=3, max_chunk_bytes=8) == [(0, 2), (2, 3), (3, 6)]
+    assert split_chunks([], chunk_size=2) == []
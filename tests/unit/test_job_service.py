@@ -0,0 +1,87 @@
+import pytest
+from pymongo.errors import BulkWriteError
+
+from src.database import Database
+from src.jobs import service
+from src.jobs.constants import JobStatus
+
+
+class FakeCollection:
+    """An in-memory collection supporting the operations of the job service."""
+
+    def __init__(self, fail_inserts=False):
+        self.documents = []
+        self.fail_inserts = fail_inserts
+
+    async def insert_one(self, document):
+        document.setdefault("_id", len(self.documents) + 1)
+        self.documents.append(document)
+        return type("InsertOneResult", (), {"inserted_id": document["_id"]})()
+
+    async def insert_many(self, documents):
+        # Insert the first document, then fail as a bulk write interrupted midway would
+        self.documents.append(documents[0])
+        if self.fail_inserts:
+            raise BulkWriteError({"writeErrors": []})
+
+    async def find_one_and_update(self, query, update, return_document):
+        document = next(document for document in self.documents if matches(document, query))
+        for field, value in update.get("$inc", {}).items():
+            document[field] += value
+        document.update(update.get("$set", {}))
+        return document
+
+    async def update_one(self, query, update):
+        for document in self.documents:
+            if matches(document, query):
+                document.update(update["$set"])
+
+    async def delete_one(self, query):
+        await self.delete_many(query)
+
+    async def delete_many(self, query):
+        self.documents = [document for document in self.documents if not matches(document, query)]
+
+
+def matches(document, query):
+    """Check whether a document has the values of an equality query."""
+
+    return all(document.get(field) == value for field, value in query.items())
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Fixture of an in-memory database whose chunk inserts fail."""
+
+    class FakeDatabase(dict):
+        def __getitem__(self, name):
+            return self.setdefault(name, FakeCollection(fail_inserts=name == service.CHUNKS_COLLECTION))
+
+    database = FakeDatabase()
+    monkeypatch.setattr(Database, "db", database)
+    return database
+
+
+@pytest.mark.asyncio
+async def test_create_job_removes_job_when_chunks_fail(database):
+    """Tests that a job whose chunks cannot be inserted is removed with the chunks inserted before the failure."""
+
+    items = [{"id": None, "text": f"Text {position}."} for position in range(3)]
+
+    with pytest.raises(BulkWriteError):
+        await service.create_job("user", items, chunk_size=1)
+
+    assert database[service.JOBS_COLLECTION].documents == []
+    assert database[service.CHUNKS_COLLECTION].documents == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("processed, failed, expected", [(0, 3, JobStatus.FAILED), (1, 2, JobStatus.COMPLETED), (1, 1, JobStatus.QUEUED)])
+async def test_record_progress_status(database, processed, failed, expected):
+    """Tests that a job is failed once none of its items could be processed, and completed once all are accounted for."""
+
+    await database[service.JOBS_COLLECTION].insert_one({"_id": "job", "status": JobStatus.QUEUED.value, "total": 3, "processed": 0, "failed": 0})
+
+    await service._record_progress("job", processed=processed, failed=failed)
+
+    assert database[service.JOBS_COLLECTION].documents[0]["status"] == expected.value
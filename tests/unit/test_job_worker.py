@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from src.jobs import service
+from src.jobs.worker import process_chunk
+from src.nlp.exceptions import InferenceQueueFull
+
+
+class SaturatedPipeline:
+    """A pipeline whose inference executor is saturated for the first calls."""
+
+    def __init__(self, rejections):
+        self.rejections = rejections
+
+    async def process(self, texts):
+        if self.rejections:
+            self.rejections -= 1
+            raise InferenceQueueFull()
+        return [{"input_text": text} for text in texts]
+
+
+class SlowPipeline:
+    """A pipeline taking the given number of seconds to process a chunk."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def process(self, texts):
+        await asyncio.sleep(self.delay)
+        return [{"input_text": text} for text in texts]
+
+
+@pytest.fixture
+def chunk():
+    """Fixture of a chunk claimed by a worker."""
+
+    return {"_id": "chunk", "job_id": "job", "index": 0, "start": 0, "attempts": 1, "items": [{"id": None, "text": "I want to use MySQL."}]}
+
+
+@pytest.fixture
+def completed(monkeypatch):
+    """Fixture recording the results of the completed chunks."""
+
+    completed = []
+
+    async def complete_chunk(chunk, results, worker_id):
+        completed.append(results)
+
+    monkeypatch.setattr(service, "complete_chunk", complete_chunk)
+    return completed
+
+
+@pytest.mark.asyncio
+async def test_process_chunk_renews_lease_while_processing(monkeypatch, chunk, completed):
+    """Tests that the lease of a slow chunk is renewed while it is processed, and no longer once it is completed."""
+
+    renewals = []
+
+    async def renew_chunk_lease(chunk, worker_id, lease_seconds):
+        renewals.append(lease_seconds)
+        return True
+
+    monkeypatch.setattr(service, "renew_chunk_lease", renew_chunk_lease)
+
+    await process_chunk(SlowPipeline(0.2), chunk, "worker", max_attempts=3, retry_interval=0, lease_seconds=0.06)
+    renewal_count = len(renewals)
+    await asyncio.sleep(0.1)
+
+    assert renewal_count >= 3
+    assert len(renewals) == renewal_count
+    assert completed == [[{"input_text": "I want to use MySQL."}]]
+
+
+@pytest.mark.asyncio
+async def test_process_chunk_waits_while_saturated(monkeypatch, chunk, completed):
+    """Tests that a chunk is resubmitted until the inference executor has a free slot."""
+
+    pipeline = SaturatedPipeline(2)
+
+    await process_chunk(pipeline, chunk, "worker", max_attempts=3, retry_interval=0, lease_seconds=30)
+
+    assert pipeline.rejections == 0
+    assert completed == [[{"input_text": "I want to use MySQL."}]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [SlowPipeline(0.2), SaturatedPipeline(100)], ids=["processing", "saturated"])
+async def test_process_chunk_gives_up_on_lost_lease(monkeypatch, chunk, completed, pipeline):
+    """Tests that a chunk whose lease expired is left to the worker that claimed it next."""
+
+    async def renew_chunk_lease(chunk, worker_id, lease_seconds):
+        return False
+
+    monkeypatch.setattr(service, "renew_chunk_lease", renew_chunk_lease)
+
+    await asyncio.wait_for(process_chunk(pipeline, chunk, "worker", max_attempts=3, retry_interval=0.01, lease_seconds=0.03), timeout=1)
+
+    assert completed == []
@@ -1,6 +1,8 @@
+import math
+
 import pytest
 
-from src.nlp.services.blueprint_matching import load_blueprints_corpus, match_blueprints
+from src.nlp.services.blueprint_matching import BlueprintIndex, load_blueprints_corpus, rank_blueprints_batch, recommendation_weights
 
 
 @pytest.fixture
@@ -27,36 +29,110 @@ def nlp_output():
 
 
 @pytest.mark.asyncio
-async def test_match_blueprints(blueprints_corpus, nlp_output):
-    """Tests that the match_blueprints() function correctly matches recommendations."""
-    matched_blueprints = match_blueprints(nlp_output, await blueprints_corpus)
+async def test_rank_blueprints(blueprints_corpus, nlp_output):
+    """Tests that the blueprints ranked for the recommendations of a text match some of their tags."""
+    corpus = await blueprints_corpus
+    weight_sets = [recommendation_weights(output["recommendations"], output["extracted_entities"]) for output in nlp_output]
 
-    assert matched_blueprints is not None
-    assert isinstance(matched_blueprints, list)
+    (ranked_blueprints,) = rank_blueprints_batch(weight_sets, corpus)
 
-    for blueprint in matched_blueprints:
-        assert "matched_tags" in blueprint
-        matched_tags = set(blueprint["matched_tags"])
+    assert ranked_blueprints
+    tags = {blueprint["path"]: set(blueprint["tags"]) for blueprint in corpus}
+    for blueprint in ranked_blueprints:
+        assert blueprint["matched_tags"]
+        assert set(blueprint["matched_tags"]) <= tags[blueprint["path"]] & set(weight_sets[0])
+        assert blueprint["score"] > 0
 
-        # Approach 1: Using get() for flexibility
-        if matched_tags.issubset(set(blueprint.get("tags", []))):
-            pass  # Test passes if subset holds and 'tags' exists
 
-        # Approach 2: Explicitly checking for the 'tags' key
-        elif "tags" in blueprint:
-            assert matched_tags.issubset(set(blueprint["tags"]))
+@pytest.mark.asyncio
+async def test_rank_blueprints_no_matching_blueprints(blueprints_corpus):
+    """Tests that no blueprint is ranked for technologies no blueprint is tagged with."""
+    weight_sets = [recommendation_weights([{"recommendation": "Unknown Technology"}])]
 
+    assert rank_blueprints_batch(weight_sets, await blueprints_corpus) == [[]]
 
-@pytest.mark.asyncio
-async def test_match_blueprints_no_matching_blueprints(blueprints_corpus):
-    """Tests that the match_blueprints() function correctly handles no matching blueprints."""
-    nlp_output = [
-        {
-            "recommendations": [{"recommendation": "Unknown Technology"}],
-            "extracted_entities": [],
-        }
+
+def test_blueprint_index():
+    """Tests that the blueprint index keeps the postings, categories and tag counts of the blueprints."""
+    corpus = [
+        {"name": "Express", "path": "backend/express", "description": "", "tags": ["Node.js", "Express.js", "MongoDB"], "type": "backend"},
+        {"name": "Django", "path": "backend/django", "description": "", "tags": ["Python", "Django"], "type": "backend"},
+        {"name": "React", "path": "frontend/react", "description": "", "tags": ["React", "Node.js"], "type": "frontend"},
+    ]
+
+    index = BlueprintIndex(corpus)
+
+    assert len(index) == 3
+    assert index.postings["Node.js"] == [0, 2]
+    assert dict(index.blueprints_by_category) == {"backend": [0, 1], "frontend": [2]}
+    assert index.tag_counts == [3, 2, 2]
+    assert index.tag_matrix[index.tag_ids["Node.js"]].indices.tolist() == [0, 2]
+
+
+def test_rank_blueprints_prefers_fewer_tags():
+    """Tests that among the blueprints with the same score, the one with the fewest tags is ranked first, per category."""
+    corpus = [
+        {"name": "Full stack", "path": "backend/full", "description": "", "tags": ["Node.js", "Express.js", "MongoDB", "Redis"], "type": "backend"},
+        {"name": "Express", "path": "backend/express", "description": "", "tags": ["Node.js", "Express.js"], "type": "backend"},
+        {"name": "React", "path": "frontend/react", "description": "", "tags": ["React"], "type": "frontend"},
+    ]
+    weight_sets = [{"Express.js": 1.0, "Node.js": 1.0, "Vue": 1.0}]
+
+    ranked_blueprints = rank_blueprints_batch(weight_sets, BlueprintIndex(corpus), top_k=2)
+
+    # Node.js and Express.js are each the tag of 2 of the 3 blueprints
+    idf = math.log((1 + 3) / (1 + 2)) + 1
+    assert ranked_blueprints == [
+        [
+            {"name": "Express", "path": "backend/express", "description": "", "matched_tags": ["Node.js", "Express.js"], "score": pytest.approx(2 * idf)},
+            {"name": "Full stack", "path": "backend/full", "description": "", "matched_tags": ["Node.js", "Express.js"], "score": pytest.approx(2 * idf)},
+        ]
+    ]
+
+
+def test_recommendation_weights():
+    """Tests that the recommended technologies weigh at least 1, and the other extracted entities their score."""
+    recommendations = [{"category": "Backend", "recommendation": "Express.js"}]
+    extracted_entities = [
+        {"category": "Backend", "entity_name": "Express.js", "score": 1.0},
+        {"category": "Backend", "entity_name": "Django", "score": 0.4},
+        {"category": "Database", "entity_name": "MongoDB", "score": 0.6},
+        {"category": "Database", "entity_name": "MongoDB", "score": 0.2},
+        {"category": "Database", "entity_name": "Redis", "score": 0},
+    ]
+
+    assert recommendation_weights(recommendations, extracted_entities) == {"Express.js": 1.0, "Django": 0.4, "MongoDB": 0.6}
+    assert recommendation_weights(recommendations) == {"Express.js": 1.0}
+
+
+def test_rank_blueprints_batch_top_k():
+    """Tests that the blueprints of each category are ranked by weighted overlap, and the top k are kept."""
+    corpus = [
+        {"name": "Full stack", "path": "backend/full", "description": "", "tags": ["Node.js", "Express.js", "MongoDB", "Redis"], "type": "backend"},
+        {"name": "Express", "path": "backend/express", "description": "", "tags": ["Node.js", "Express.js"], "type": "backend"},
+        {"name": "Django", "path": "backend/django", "description": "", "tags": ["Python", "Django"], "type": "backend"},
+        {"name": "React", "path": "frontend/react", "description": "", "tags": ["React", "Node.js"], "type": "frontend"},
+    ]
+    weight_sets = [{"Express.js": 1.0, "MongoDB": 0.6, "Django": 0.4}, {}, {"Vue": 1.0}]
+
+    top_1, top_2 = rank_blueprints_batch(weight_sets, BlueprintIndex(corpus)), rank_blueprints_batch(weight_sets, BlueprintIndex(corpus), top_k=2)
+
+    assert [[blueprint["name"] for blueprint in ranked] for ranked in top_1] == [["Full stack"], [], []]
+    assert [[blueprint["name"] for blueprint in ranked] for ranked in top_2] == [["Full stack", "Express"], [], []]
+    assert top_2[0][0]["matched_tags"] == ["Express.js", "MongoDB"]
+    assert top_2[0][0]["score"] > top_2[0][1]["score"]
+
+
+def test_rank_blueprints_batch_weighs_rare_tags():
+    """Tests that a tag shared by fewer blueprints weighs more, and ties go to the blueprint with the fewest tags."""
+    corpus = [
+        {"name": "Node", "path": "backend/node", "description": "", "tags": ["Node.js", "Express.js"], "type": "backend"},
+        {"name": "Nest", "path": "backend/nest", "description": "", "tags": ["Node.js", "NestJS"], "type": "backend"},
+        {"name": "Fastify", "path": "backend/fastify", "description": "", "tags": ["Node.js", "Fastify", "Pino"], "type": "backend"},
+        {"name": "Minimal", "path": "backend/minimal", "description": "", "tags": ["Node.js"], "type": "backend"},
     ]
+    index = BlueprintIndex(corpus)
 
-    blueprints_data = await blueprints_corpus
-    matched_blueprints = match_blueprints(nlp_output, blueprints_data)
-    assert matched_blueprints is None
+    assert index.tag_idf[index.tag_ids["NestJS"]] > index.tag_idf[index.tag_ids["Node.js"]]
+    ranked = rank_blueprints_batch([{"Node.js": 1.0, "NestJS": 0.5}, {"Node.js": 1.0}], index, top_k=2)
+    assert [[blueprint["name"] for blueprint in blueprints] for blueprints in ranked] == [["Nest", "Minimal"], ["Minimal", "Node"]]
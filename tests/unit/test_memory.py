@@ -0,0 +1,23 @@
+from src.nlp.memory import current_rss, recommend_worker_count
+
+MB = 2**20
+
+
+def test_recommend_worker_count_shares_models_when_preloaded():
+    """Tests that preloaded models are counted once, and copied models once per worker."""
+
+    assert recommend_worker_count(4000 * MB, 1000 * MB, 300 * MB, max_workers=16, preload=True, headroom=0.1) == 8
+    assert recommend_worker_count(4000 * MB, 1000 * MB, 300 * MB, max_workers=16, preload=False, headroom=0.1) == 2
+
+
+def test_recommend_worker_count_bounds():
+    """Tests that the recommendation is capped by the number of cores and never below one worker."""
+
+    assert recommend_worker_count(64000 * MB, 1000 * MB, 300 * MB, max_workers=5) == 5
+    assert recommend_worker_count(500 * MB, 1000 * MB, 300 * MB, max_workers=5) == 1
+
+
+def test_current_rss():
+    """Tests that the resident memory of the process is measured."""
+
+    assert current_rss() > 0
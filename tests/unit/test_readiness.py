@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.nlp.constants import LoadStatus
+from src.nlp.readiness import LoadTracker
+
+
+@pytest.mark.asyncio
+async def test_load_tracker_reports_loaded_components():
+    """Tests that components are reported pending until they are loaded, and ready once all are loaded."""
+
+    tracker = LoadTracker(["spacy", "bertopic"])
+    assert not tracker.ready
+    assert tracker.report()["spacy"]["status"] == LoadStatus.PENDING
+
+    assert await tracker.run("spacy", lambda: "nlp") == "nlp"
+    assert not tracker.ready
+    assert await tracker.run("bertopic", lambda name: name, "model") == "model"
+
+    report = tracker.report()
+    assert tracker.ready
+    assert report["spacy"]["status"] == LoadStatus.READY
+    assert report["spacy"]["seconds"] is not None
+    assert report["spacy"]["started_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_load_tracker_records_failures():
+    """Tests that a component failing to load is reported with its error."""
+
+    def fail():
+        raise FileNotFoundError("missing model")
+
+    tracker = LoadTracker(["spacy"])
+    with pytest.raises(FileNotFoundError):
+        await tracker.run("spacy", fail)
+
+    assert tracker.failed
+    assert not tracker.ready
+    assert tracker.report()["spacy"]["status"] == LoadStatus.FAILED
+    assert tracker.report()["spacy"]["error"] == "missing model"
+
+
+@pytest.mark.asyncio
+async def test_load_tracker_waits_for_cancelled_load():
+    """Tests that a cancelled load only finishes once its thread is done, and is reported as failed."""
+
+    started, release = threading.Event(), threading.Event()
+    finished = []
+
+    def load():
+        started.set()
+        release.wait()
+        finished.append(True)
+
+    tracker = LoadTracker(["spacy"])
+    task = asyncio.ensure_future(tracker.run("spacy", load))
+    await asyncio.to_thread(started.wait)
+    task.cancel()
+    await asyncio.sleep(0.05)
+    assert not task.done()
+
+    release.set()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert finished == [True]
+    assert tracker.report()["spacy"]["status"] == LoadStatus.FAILED
@@ -1,10 +1,14 @@
 import pytest
-from async_asgi_testclient import TestClient
+import torch
 
+from src.nlp.pipeline import NlpPipeline
+from src.nlp.services.entity_index import build_entity_index, load_entity_index
 from src.nlp.services.recommendation_generation import (
     dynamic_score_entities,
     recommend_technologies,
+    score_entities,
 )
+from src.nlp.services.topic_index import build_topic_index, load_topic_index
 
 
 @pytest.fixture
@@ -18,7 +22,7 @@ async def tech_entities_fixture():
 
 
 @pytest.mark.asyncio
-async def test_dynamic_score_entities(client: TestClient, tech_entities_fixture):
+async def test_dynamic_score_entities(nlp_pipeline: NlpPipeline, tech_entities_fixture):
     """Test case for dynamic_score_entities function."""
 
     entities = [
@@ -28,11 +32,98 @@ async def test_dynamic_score_entities(client: TestClient, tech_entities_fixture)
     topic_keywords = ["databases", "schemas", "tables"]
     user_input = "In comparing database management systems, we're evaluating the performance and features of MySQL versus MongoDB to determine the best fit."
     tech_entities = await tech_entities_fixture
-    sorted_entities = dynamic_score_entities(entities, topic_keywords, user_input, tech_entities)
+    sorted_entities = dynamic_score_entities(entities, topic_keywords, user_input, tech_entities, nlp_pipeline.embed)
     assert sorted_entities[0]["entity_name"] == "MySQL"
     assert sorted_entities[1]["entity_name"] == "MongoDB"
 
 
+@pytest.mark.asyncio
+async def test_dynamic_score_entities_with_entity_index(nlp_pipeline: NlpPipeline, tech_entities_fixture):
+    """Tests that scoring with a precomputed entity index matches scoring with on-the-fly embeddings."""
+
+    entities = [
+        {"entity": "MySQL", "category": "Database"},
+        {"entity": "MongoDB", "category": "Database"},
+    ]
+    topic_keywords = ["databases", "schemas", "tables"]
+    user_input = "We're evaluating MySQL versus MongoDB for our database."
+    tech_entities = await tech_entities_fixture
+    entity_index = build_entity_index(tech_entities, nlp_pipeline.embed, nlp_pipeline.embedding_model_id)
+
+    expected = dynamic_score_entities(entities, topic_keywords, user_input, tech_entities, nlp_pipeline.embed)
+    indexed = dynamic_score_entities(entities, topic_keywords, user_input, tech_entities, nlp_pipeline.embed, entity_index)
+
+    assert [entity["entity_name"] for entity in indexed] == [entity["entity_name"] for entity in expected]
+    for indexed_entity, expected_entity in zip(indexed, expected):
+        assert indexed_entity["score"] == pytest.approx(expected_entity["score"], abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_load_entity_index_rebuilds_unreadable_file(tmp_path, tech_entities_fixture):
+    """Tests that a truncated entity index on disk is rebuilt and replaced, instead of failing the load."""
+
+    tech_entities = await tech_entities_fixture
+    index_path = tmp_path / "entity_index.npz"
+    index_path.write_bytes(b"PK\x03\x04truncated")
+
+    entity_index = load_entity_index(tech_entities, lambda texts: torch.ones(len(texts), 4), "model:torch", str(index_path))
+
+    assert entity_index.names == ["MySQL", "MongoDB"]
+    assert load_entity_index(tech_entities, None, "model:torch", str(index_path)).fingerprint == entity_index.fingerprint
+    assert [path.name for path in tmp_path.iterdir()] == ["entity_index.npz"]
+
+
+@pytest.mark.asyncio
+async def test_load_entity_index_rebuilds_for_other_embedding_model(tmp_path, tech_entities_fixture):
+    """Tests that an entity index on disk built with another embeddings model or runtime is rebuilt."""
+
+    tech_entities = await tech_entities_fixture
+    index_path = str(tmp_path / "entity_index.npz")
+    torch_index = load_entity_index(tech_entities, lambda texts: torch.ones(len(texts), 4), "model:torch", index_path)
+
+    int8_index = load_entity_index(tech_entities, lambda texts: torch.zeros(len(texts), 4), "model:onnx-int8", index_path)
+
+    assert int8_index.fingerprint != torch_index.fingerprint
+    assert torch.equal(int8_index.embeddings, torch.zeros(2, 4))
+    assert load_entity_index(tech_entities, None, "model:onnx-int8", index_path).fingerprint == int8_index.fingerprint
+
+
+@pytest.mark.asyncio
+async def test_dynamic_score_entities_with_topic_embedding(nlp_pipeline: NlpPipeline, tech_entities_fixture):
+    """Tests that scoring with a precomputed topic keyword embedding matches embedding the keywords."""
+
+    entities = [
+        {"entity": "MySQL", "category": "Database"},
+        {"entity": "MongoDB", "category": "Database"},
+    ]
+    topic_keywords = ["databases", "schemas", "tables"]
+    user_input = "We're evaluating MySQL versus MongoDB for our database."
+    tech_entities = await tech_entities_fixture
+    topic_index = build_topic_index({0: topic_keywords}, nlp_pipeline.embed, nlp_pipeline.embedding_model_id)
+
+    expected = dynamic_score_entities(entities, topic_keywords, user_input, tech_entities, nlp_pipeline.embed)
+    indexed = dynamic_score_entities(entities, topic_keywords, user_input, tech_entities, nlp_pipeline.embed, topic_embedding=topic_index.get_mean_embedding(0))
+
+    assert [entity["entity_name"] for entity in indexed] == [entity["entity_name"] for entity in expected]
+    for indexed_entity, expected_entity in zip(indexed, expected):
+        assert indexed_entity["score"] == pytest.approx(expected_entity["score"], abs=1e-5)
+
+
+def test_score_entities():
+    """Tests that score_entities() combines, boosts and normalizes the scores per category."""
+
+    input_embedding = torch.tensor([1.0, 0.0])
+    entity_embeddings = torch.tensor([[1.0, 0.0], [0.0, 1.0], [1.0, 0.0]])
+    keyword_embeddings = torch.tensor([[0.0, 1.0], [0.0, 1.0]])
+    boosts = torch.tensor([0.0, 0.2, 0.0])
+    category_ids = torch.tensor([0, 0, 1])
+
+    scores = score_entities(input_embedding, entity_embeddings, keyword_embeddings, boosts, category_ids)
+
+    # Combined scores are 1.0, 1.2 and 1.0, normalized by 1.2 in the first category and 1.0 in the second
+    assert scores.tolist() == pytest.approx([1.0 / 1.2, 1.0, 1.0])
+
+
 def test_recommend_technologies():
     """Test case for recommend_technologies function."""
 
@@ -43,3 +134,25 @@ def test_recommend_technologies():
     recommendations = recommend_technologies(entities)
     assert recommendations[0]["recommendation"] == "React"
     assert recommendations[1]["recommendation"] == "NodeJS"
+
+
+def test_load_topic_index_rebuilds_unreadable_file(tmp_path):
+    """Tests that a truncated topic index on disk is rebuilt and replaced, instead of failing the load."""
+
+    class TopicRegistry:
+        def get_all_keywords(self):
+            return {0: ["databases", "schemas"], 1: ["frontend", "schemas"]}
+
+    index_path = tmp_path / "topic_index.npz"
+    index_path.write_bytes(b"PK\x03\x04truncated")
+
+    topic_index = load_topic_index(TopicRegistry(), lambda texts: torch.ones(len(texts), 4), "model:torch", str(index_path))
+
+    assert topic_index.vocabulary == ["databases", "schemas", "frontend"]
+    assert load_topic_index(TopicRegistry(), None, "model:torch", str(index_path)).fingerprint == topic_index.fingerprint
+    assert [path.name for path in tmp_path.iterdir()] == ["topic_index.npz"]
+
+    # An index built with another embeddings model or runtime is rebuilt
+    int8_index = load_topic_index(TopicRegistry(), lambda texts: torch.zeros(len(texts), 4), "model:onnx-int8", str(index_path))
+    assert int8_index.fingerprint != topic_index.fingerprint
+    assert torch.equal(int8_index.embeddings, torch.zeros(3, 4))
@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.nlp.pipeline import NlpPipeline
+from src.nlp.services.topic_registry import build_topic_registry
+from src.nlp.topic_artifact import export_topic_artifact, load_topic_artifact
+
+
+@pytest.mark.asyncio
+async def test_topic_artifact_matches_topic_model(nlp_pipeline: NlpPipeline, tmp_path):
+    """Tests that the exported topic model artifact has the same topics and predictions as the topic model."""
+
+    topic_model = nlp_pipeline.bertopic_model
+    version = export_topic_artifact(topic_model, str(tmp_path))
+    artifact = load_topic_artifact(str(tmp_path))
+
+    texts = ["Create a workflow for AWS and a express mongodb starter.", "I want to use MySQL for my database."]
+    embeddings = nlp_pipeline.embed(texts).numpy()
+    expected_topics, _ = topic_model.transform(texts, embeddings=embeddings)
+    topics, _ = artifact.transform(texts, embeddings=embeddings)
+
+    assert artifact.version == version
+    assert isinstance(artifact.topic_embeddings_, np.memmap)
+    assert build_topic_registry(artifact).topics == build_topic_registry(topic_model).topics
+    assert topics == [int(topic_id) for topic_id in expected_topics]
+
+
+@pytest.mark.asyncio
+async def test_topic_artifact_reexport_keeps_mapped_files(nlp_pipeline: NlpPipeline, tmp_path):
+    """Tests that exporting over a memory-mapped artifact replaces its files instead of rewriting them in place."""
+
+    export_topic_artifact(nlp_pipeline.bertopic_model, str(tmp_path))
+    artifact = load_topic_artifact(str(tmp_path))
+    topic_embeddings = np.array(artifact.topic_embeddings_)
+    inode = os.stat(artifact.topic_embeddings_.filename).st_ino
+
+    export_topic_artifact(nlp_pipeline.bertopic_model, str(tmp_path))
+
+    assert os.stat(artifact.topic_embeddings_.filename).st_ino != inode
+    assert np.array_equal(artifact.topic_embeddings_, topic_embeddings)
+    assert not [file_name for file_name in os.listdir(tmp_path) if file_name.endswith(".tmp")]
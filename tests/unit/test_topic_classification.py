@@ -0,0 +1,89 @@
+import pytest
+import torch
+
+from src.nlp.pipeline import NlpPipeline
+from src.nlp.services.topic_centroids import TopicCentroids, build_topic_centroids
+from src.nlp.services.topic_classification import classify_embeddings, classify_text, classify_texts
+from src.nlp.services.topic_registry import Topic, TopicRegistry, build_topic_registry
+
+
+@pytest.mark.asyncio
+async def test_build_topic_registry(nlp_pipeline: NlpPipeline):
+    """Tests that the topic registry holds the names and keywords of the topic model."""
+
+    topic_model = nlp_pipeline.bertopic_model
+    topic_registry = build_topic_registry(topic_model)
+    topic_info = topic_model.get_topic_info()
+
+    assert len(topic_registry) == len(topic_info)
+    for topic_id, name in zip(topic_info["Topic"], topic_info["Name"]):
+        assert topic_registry.get_name(int(topic_id)) == name
+        assert topic_registry.get_keywords(int(topic_id)) == [word for word, _ in topic_model.get_topic(topic_id)]
+
+
+def test_topic_registry_lookups():
+    """Tests the topic registry lookups, including unknown topic IDs."""
+
+    topic_registry = TopicRegistry([Topic(id=-1, name="-1_outliers"), Topic(id=0, name="0_databases", keywords=["databases", "sql"], count=12)])
+
+    assert topic_registry.get(0).count == 12
+    assert topic_registry.get_name(0) == "0_databases"
+    assert topic_registry.get_keywords(0) == ["databases", "sql"]
+    assert topic_registry.get_all_keywords() == {-1: [], 0: ["databases", "sql"]}
+    assert topic_registry.get(1) is None
+    assert topic_registry.get_name(1) == "Unknown Topic"
+    assert topic_registry.get_keywords(1) == []
+
+
+@pytest.mark.asyncio
+async def test_classify_texts(nlp_pipeline: NlpPipeline):
+    """Tests that classifying a batch of texts matches classifying each text on its own."""
+
+    texts = ["Create a workflow for AWS and a express mongodb starter.", "I want to use MySQL for my database."]
+    topic_model = nlp_pipeline.bertopic_model
+    topic_registry = nlp_pipeline.topic_registry
+
+    assert classify_texts(texts, topic_model, topic_registry) == [classify_text(text, topic_model, topic_registry) for text in texts]
+
+
+def test_classify_embeddings():
+    """Tests that embeddings are classified into the topic with the nearest centroid."""
+
+    topic_registry = TopicRegistry(
+        [Topic(id=-1, name="-1_outliers"), Topic(id=0, name="0_databases", keywords=["databases", "sql"]), Topic(id=1, name="1_web")]
+    )
+    topic_centroids = TopicCentroids([-1, 0, 1], torch.tensor([[1.0, 1.0, 0.0], [0.0, 2.0, 0.0], [0.0, 0.0, 3.0]]))
+    embeddings = torch.tensor([[0.0, 1.0, 0.0], [0.0, 0.6, 0.8], [0.8, 0.6, 0.0]])
+
+    assert classify_embeddings(embeddings, topic_centroids, topic_registry) == [
+        (0, "0_databases", ["databases", "sql"]),
+        (1, "1_web", []),
+        (-1, "-1_outliers", []),
+    ]
+    assert classify_embeddings(torch.empty(0, 3), topic_centroids, topic_registry) == []
+
+
+@pytest.mark.asyncio
+async def test_build_topic_centroids(nlp_pipeline: NlpPipeline):
+    """Tests that the topic centroids cover every topic of the topic model."""
+
+    topic_centroids = build_topic_centroids(nlp_pipeline.bertopic_model)
+    topic_ids, _ = topic_centroids.nearest(nlp_pipeline.embed(["I want to use MySQL for my database."]))
+
+    assert len(topic_centroids) == len(nlp_pipeline.topic_registry)
+    assert topic_ids[0] in nlp_pipeline.topic_registry
+
+
+@pytest.mark.asyncio
+async def test_run_embeds_each_text_once(nlp_pipeline: NlpPipeline, monkeypatch):
+    """Tests that the input embeddings are reused by the topic model instead of embedding the texts again."""
+
+    texts = ["Create a workflow for AWS and a express mongodb starter.", "I want to use MySQL for my database."]
+    embedded = []
+    embed = nlp_pipeline.embed
+    monkeypatch.setattr(nlp_pipeline, "embed", lambda batch: embedded.append(list(batch)) or embed(batch))
+
+    results = nlp_pipeline.run(texts)
+
+    assert embedded == [texts]
+    assert [result["input_text"] for result in results] == texts